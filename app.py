@@ -1,21 +1,13 @@
 import streamlit as st
 import os
-import tempfile    # Import tempfile
-import atexit      # Import atexit for cleanup
-import shutil      # Import shutil to remove directories
-import yt_dlp
-import pandas as pd
+from artifact_store import ArtifactStore
+from media import MediaStore
+from feedback_store import FeedbackStore
+from jobs import JobManager
+from tracing import tracer, start_metrics_server
 
 # Import functions from your custom modules
-from summary import (
-    transcribe_audio,
-    summarize_text,
-    text_to_audio,
-    detect_scenes_fast,
-    select_key_scenes,
-    create_video_summary_ffmpeg
-
-)
+from summary import get_artifact_cache, warm_up_models
 
 # --- Streamlit App Config ---
 st.set_page_config(
@@ -24,34 +16,19 @@ st.set_page_config(
     page_icon="🎬"
 )
 
-# NEW: Setup Session-Wide Temporary Directory
 @st.cache_resource
-def get_temp_dir():
-    """
-    Creates a single temporary directory for the entire app session.
-    This directory will be cleaned up when the app server stops.
-    """
-    temp_dir = tempfile.mkdtemp()
-    print(f"Created temp directory: {temp_dir}")
-    
-    # Register the cleanup function to run when the app exits
-    atexit.register(cleanup_dir, temp_dir=temp_dir)
-    return temp_dir
-
-def cleanup_dir(temp_dir):
+def get_artifact_store():
     """
-    Recursively deletes the temporary directory.
+    Disk-bounded store for job outputs and downloaded media, shared by all sessions.
     """
-    if os.path.exists(temp_dir):
-        print(f"Cleaning up temp directory: {temp_dir}")
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    store = ArtifactStore()
+    store.evict()
+    return store
 
-# Get or create the session's temp directory
-temp_dir = get_temp_dir()
 
 # Re-add your save function (no longer in utils.py) 
 def save_uploaded_file(uploaded_file, temp_dir):
-    """Saves uploaded file to the session's temp directory."""
+    """Saves uploaded file to the given directory (e.g. a job's artifact namespace)."""
     if uploaded_file:
         file_path = os.path.join(temp_dir, uploaded_file.name)
         with open(file_path, 'wb') as f:
@@ -61,58 +38,148 @@ def save_uploaded_file(uploaded_file, temp_dir):
 
 
 
-def download_video_from_url(url, save_dir):
+@st.cache_resource
+def get_media_store():
+    """
+    Shared media store: each source is downloaded once and reused across sessions.
+    """
+    return MediaStore(get_artifact_store())
+
+
+@st.cache_resource
+def get_job_manager():
+    """
+    Background workers that run the summary pipeline outside the script thread.
+    """
+    return JobManager(get_media_store(), get_artifact_store())
+
+
+@st.cache_resource
+def start_model_warmup():
+    """
+    Loads Whisper in the background once per server, while the page is already usable.
+    """
+    return warm_up_models()
+
+
+start_model_warmup()
+
+
+@st.cache_resource
+def get_metrics_server():
+    """
+    Prometheus /metrics endpoint, started once if METRICS_PORT is set.
+    """
+    return start_metrics_server()
+
+
+get_metrics_server()
+
+
+@st.cache_data(ttl=30)
+def load_disk_stats():
+    """
+    Artifact store usage and media stats for the sidebar. Both walk the
+    disk, so reruns reuse the figures for up to 30 seconds.
+    """
+    return get_artifact_store().usage(), get_media_store().stats()
+
+
+SUMMARY_KINDS = {"📝": "text", "🎧": "audio", "🎬": "video"}
+
+
+def show_job_progress(job_id):
     """
-    Downloads the best audio-only stream from a URL to the specified directory
-    using yt-dlp. Returns the file path of the downloaded audio.
+    Polled view of a running job. Triggers a full rerun once it finishes.
     """
-    try:
-        st.info(f"Accessing link with yt-dlp...")
-        
-        file_path_template = os.path.join(save_dir, '%(title)s.%(ext)s')
-
-        ydl_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio/best',
-            'outtmpl': file_path_template,
-            'quiet': True,
-            'noplaylist': True,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
-
-        st.success(f"Download complete: {info.get('title')}")
-        return filename
-        
-    except Exception as e:
-        st.error(f"Error downloading with yt-dlp: {e}")
-        return None
-    
-
-def download_full_video(url, save_dir):
-    try:
-        st.info("Downloading full video for visual summary...")
-        file_template = os.path.join(save_dir, "%(title)s.%(ext)s")
-
-        ydl_opts = {
-            'format': 'bestvideo+bestaudio/best',
-            'merge_output_format': 'mp4',
-            'outtmpl': file_template,
-            'quiet': True,
-            'noplaylist': True
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
-
-        st.success("Full video downloaded.")
-        return filename
-
-    except Exception as e:
-        st.error(f"Error downloading full video: {e}")
-        return None
+    job = get_job_manager().get(job_id)
+    if job is None or not job.active:
+        st.rerun()
+
+    snapshot = job.snapshot()
+    queued, running = get_job_manager().queue_depth()
+    st.progress(snapshot["percent"], snapshot["stage"])
+    st.caption(f"Job `{snapshot['id']}` · {running} running · {queued} queued")
+    for level, message in snapshot["messages"][-3:]:
+        getattr(st, level)(message)
+
+    if snapshot["partial_transcript"]:
+        tab1, tab2 = st.tabs(["✨ Summary so far", "📜 Transcription so far"])
+        with tab1:
+            if snapshot["partial_summary"]:
+                st.write(snapshot["partial_summary"])
+            elif snapshot["chunk_summaries"]:
+                for i, chunk_summary in enumerate(snapshot["chunk_summaries"], 1):
+                    st.caption(f"Part {i}")
+                    st.write(chunk_summary)
+            else:
+                st.caption("The first part is summarized once enough audio is transcribed...")
+        with tab2:
+            with st.container(height=300):
+                st.write(snapshot["partial_transcript"])
+
+    if snapshot["audio_parts"]:
+        # One player per sentence: a player whose audio changed would restart on every poll.
+        st.subheader("🔊 Audio so far")
+        st.caption("Later sentences are still being generated...")
+        with st.container(height=300):
+            for part in snapshot["audio_parts"]:
+                st.audio(part, format="audio/mpeg")
+
+
+def show_job_result(snapshot):
+    for level, message in snapshot["messages"]:
+        if level != "info":
+            getattr(st, level)(message)
+
+    if snapshot["status"] == "failed":
+        st.error(f"🚨 {snapshot['error']}")
+        return
+
+    result = snapshot["result"]
+    if snapshot["kind"] == "text":
+        st.success("🎉 Summary Generated Successfully!")
+
+        tab1, tab2 = st.tabs(["✨ Final Summary", "📜 Full Transcription"])
+        with tab1:
+            st.write(result["summary"])
+        with tab2:
+            st.write(result["transcript"])
+
+    elif snapshot["kind"] == "audio":
+        st.success("Audio Summary Generated Successfully! 🎉")
+
+        st.subheader("🔊 Audio Summary")
+        st.audio(result["audio_path"])
+
+        with st.expander("Show Summary Text"):
+            st.write(result["summary"])
+
+    elif snapshot["kind"] == "video":
+        st.success("🎬 Video Summary Created Successfully!")
+        st.video(result["video_path"])
+
+    first_content = snapshot["first_content"]
+    if "summary" in first_content:
+        st.caption(f"⚡ First transcript text after {first_content.get('transcript', 0):.1f}s, "
+                   f"first summary text after {first_content['summary']:.1f}s")
+
+    spans = tracer.spans_for(snapshot["id"])
+    if show_timings and spans:
+        with st.expander("⏱️ Timing breakdown"):
+            st.dataframe([{
+                "stage": span["name"],
+                "wall (s)": span["wall_seconds"],
+                "cpu (s)": span["cpu_seconds"],
+                "ffmpeg cpu (s)": span["child_cpu_seconds"],
+                "RSS (MB)": round(span["rss_bytes"] / (1024 * 1024)) if span["rss_bytes"] is not None else None,
+                "RSS change (MB)": round(span["rss_delta_bytes"] / (1024 * 1024))
+                if span["rss_delta_bytes"] is not None else None,
+                "in (KB)": round(span["bytes_in"] / 1024),
+                "out (KB)": round(span["bytes_out"] / 1024),
+                "media (s)": span["media_seconds"],
+                "RTF": span["real_time_factor"],
+            } for span in spans], use_container_width=True)
 
 
 
@@ -126,6 +193,31 @@ with st.sidebar:
     st.divider()
     st.info("💡 Tip: Longer videos may take more time to process.")
     st.success("⚡ Optimized for ML/AI Projects")
+    stream_ingest = st.checkbox(
+        "⚡ Streaming ingest",
+        help="Transcribe text/audio summaries while the audio is still downloading."
+    )
+    show_timings = st.checkbox("⏱️ Show timing breakdown")
+
+    cache_stats = get_artifact_cache().stats()
+    st.caption(
+        f"🗄️ Cache: {sum(cache_stats['hits'].values())} hits / "
+        f"{sum(cache_stats['misses'].values())} misses · "
+        f"{cache_stats['bytes'] / (1024 * 1024):.1f} MB"
+    )
+    store_usage, media_stats = load_disk_stats()
+    st.caption(
+        f"📦 Media: {media_stats['bytes_downloaded'] / (1024 * 1024):.1f} MB downloaded · "
+        f"{media_stats['bytes_saved'] / (1024 * 1024):.1f} MB saved"
+    )
+    st.caption(
+        f"💾 Disk: {store_usage['bytes'] / (1024 ** 3):.2f} / "
+        f"{store_usage['max_bytes'] / (1024 ** 3):.0f} GB · "
+        f"{store_usage['pinned']} in use · "
+        f"{store_usage['evicted_bytes'] / (1024 * 1024):.0f} MB evicted"
+    )
+    jobs_queued, jobs_running = get_job_manager().queue_depth()
+    st.caption(f"🧵 Jobs: {jobs_running} running · {jobs_queued} queued")
 
 
 st.markdown(
@@ -158,114 +250,84 @@ if video_url:
         key="my_radio"
     )
 
+    if summary_choice.startswith("🎬"):
+        scene_threshold = st.slider(
+            "Scene change threshold",
+            min_value=0.05, max_value=0.95, value=0.4, step=0.05,
+            help="Lower finds more scene cuts. Re-tuning reuses the saved scene index, no re-decode."
+        )
+
     st.divider()
 
     # Generate Button 
     if st.button(f"🚀 Generate {summary_choice}", use_container_width=True):
-        progress = st.progress(0, "Starting...")
-        with st.spinner("⚡ Working hard... This may take a few minutes ⏳"):
-
-            # Download Step 
-            progress.progress(10, "Downloading video audio...")
-            temp_video_path = download_video_from_url(video_url, temp_dir)
-
-            if temp_video_path is None:
-                st.stop() 
-            
-            st.divider()
-
-            # Text Summary 
-            if summary_choice.startswith("📝"):
-                progress.progress(25, "1/2 - Transcribing audio...")
-                
-                # Now captures language 
-                transcribed_text, detected_lang = transcribe_audio(temp_video_path, temp_dir)
-                
-                if transcribed_text:
-
-                    progress.progress(75, "3/3 - Processing summary...") 
-            
-                    summary_text = summarize_text(transcribed_text, source_lang=detected_lang)
-                    
-                    if summary_text:
-                        progress.progress(100, "Done!")
-                        st.success("🎉 Summary Generated Successfully!")
-                        
-                        tab1, tab2 = st.tabs(["✨ Final Summary", "📜 Full Transcription"])
-                        with tab1:
-                            st.write(summary_text)
-                        with tab2:
-                            st.write(transcribed_text)
-
-            # --- Audio Summary Logic ---
-            elif summary_choice.startswith("🎧"):
-                progress.progress(25, "1/3 - Transcribing audio...")
-                
-                transcribed_text, detected_lang = transcribe_audio(temp_video_path, temp_dir)
-                
-                if transcribed_text:
-                    
-                    progress.progress(60, "2/3 - Processing summary...")
-                    
-                    summary_text = summarize_text(transcribed_text, source_lang=detected_lang)
-                    
-                    if summary_text:
-                        progress.progress(80, "3/3 - Converting summary to audio...")
-                        temp_audio_path = os.path.join(temp_dir, "summary.mp3")
-                        
-                        if text_to_audio(summary_text, temp_audio_path):
-                            progress.progress(100, "Done!")
-                            st.success("Audio Summary Generated Successfully! 🎉")
-                            
-                            st.subheader("🔊 Audio Summary")
-                            st.audio(temp_audio_path)
-                            
-                            with st.expander("Show Summary Text"):
-                                st.write(summary_text)
-                        else:
-                            st.error("Could not generate audio file. Check logs for details.")
-
-            # --- VIDEO SUMMARY OPTION ---
-            elif summary_choice.startswith("🎬"):
-                progress.progress(10, "Downloading full video...")
-                full_video_path = download_full_video(video_url, temp_dir)
-
-                if full_video_path is None:
-                    st.error("🚨 Could not download full video.")
-                    st.stop()
-
-                progress.progress(40, "Detecting scenes...")
-                scenes = detect_scenes_fast(full_video_path)
-
-                if not scenes:
-                    st.error("⚠ No scenes detected. Try increasing threshold.")
-                    st.stop()
-
-                progress.progress(60, "Selecting best scenes...")
-                key_scenes = select_key_scenes(scenes, max_scenes=5)
-
-                progress.progress(80, "Creating summary video...")
-                summary_video_path = os.path.join(temp_dir, "video_summary.mp4")
-                final_path = create_video_summary_ffmpeg(full_video_path, key_scenes, summary_video_path)
-
-                progress.progress(100, "Done 🎉")
-                st.success("🎬 Video Summary Created Successfully!")
-                st.video(final_path)
+        kind = SUMMARY_KINDS[summary_choice[0]]
+        if kind == "video":
+            options = {"threshold": scene_threshold}
+        else:
+            # Streaming ingest downloads and transcribes in one step
+            options = {"stream": stream_ingest}
+
+        job_id = get_job_manager().submit(kind, video_url, options)
+        st.session_state["job_id"] = job_id
+        # Keep the job in the URL so a browser refresh re-attaches to it.
+        st.query_params["job"] = job_id
+
+
+# Current job (survives reruns and page refreshes)
+current_job_id = st.session_state.get("job_id") or st.query_params.get("job")
+
+if current_job_id:
+    st.divider()
+    current_job = get_job_manager().get(current_job_id)
+
+    if current_job is None:
+        st.warning("That job is no longer available. Please generate the summary again.")
+    elif current_job.active:
+        st.fragment(run_every=1.0)(show_job_progress)(current_job_id)
+    else:
+        show_job_result(current_job.snapshot())
 
 
 
 ###FeedBacks#######
 
 COMMENTS_FILE = "comments.csv"
+COMMENTS_PER_PAGE = 10
 
-# Create comments file if it doesn't exist
-if not os.path.exists(COMMENTS_FILE):
-    df = pd.DataFrame(columns=["Name", "Comment"])
-    df.to_csv(COMMENTS_FILE, index=False)
+
+@st.cache_resource
+def get_feedback_store():
+    """
+    Shared feedback database; comments.csv from older versions is imported once.
+    """
+    store = FeedbackStore()
+    store.import_csv(COMMENTS_FILE)
+    return store
+
+
+@st.cache_data(max_entries=32)
+def load_comments_page(page, per_page, version):
+    """
+    One page of comments. `version` changes when a comment is added, so
+    reruns reuse the cached page until then.
+    """
+    return get_feedback_store().page(page, per_page)
+
+
+@st.cache_data(max_entries=4)
+def count_comments(version):
+    """
+    Number of comments, cached like load_comments_page.
+    """
+    return get_feedback_store().count()
+
+
+feedback_store = get_feedback_store()
 
 st.write("## 💬 User Feedback & Comments")
 
-with st.form("comment_form"):
+with st.form("comment_form", clear_on_submit=True):
     name = st.text_input("Your Name")
     comment = st.text_area("Your Comment about this website")
     submit_comment = st.form_submit_button("Submit")
@@ -274,19 +336,18 @@ if submit_comment:
     if name.strip() == "" or comment.strip() == "":
         st.warning("⚠ Please fill all fields before submitting.")
     else:
-        df = pd.read_csv(COMMENTS_FILE)
-        new_row = pd.DataFrame({"Name": [name], "Comment": [comment]})
-        df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(COMMENTS_FILE, index=False)
+        feedback_store.add(name.strip(), comment.strip())
         st.success("🎉 Thank you! Your comment has been submitted.")
 
 st.write("---")
 st.write("### ⭐ User Comments")
 
-# Display all comments
-comments_df = pd.read_csv(COMMENTS_FILE)
-
-for index, row in comments_df.iterrows():
-    st.info(f"**{row['Name']}** says:\n\n{row['Comment']}")
+comments_version = feedback_store.version()
+total_comments = count_comments(comments_version)
+pages = max(1, -(-total_comments // COMMENTS_PER_PAGE))
+page = 1
+if pages > 1:
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
 
-            
+for row_name, row_comment, _ in load_comments_page(page, COMMENTS_PER_PAGE, comments_version):
+    st.info(f"**{row_name}** says:\n\n{row_comment}")
@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+
+
+STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", os.path.join(os.getcwd(), "artifact_store"))
+STORE_MAX_BYTES = int(os.getenv("ARTIFACT_STORE_MAX_BYTES", 20 * 1024 ** 3))
+# Unpinned namespaces untouched for this long are removed even under budget.
+STORE_TTL_SECONDS = int(os.getenv("ARTIFACT_STORE_TTL_SECONDS", 24 * 3600))
+
+
+def _dir_bytes(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass    # removed while we were walking
+    return total
+
+
+class ArtifactStore:
+    """
+    Disk space for job outputs and downloaded media, split into
+    namespaces ("jobs/<job id>", "media/<media id>"), one directory each.
+
+    The store keeps its total size under `max_bytes`: namespaces untouched
+    for `ttl_seconds` go first, then the least recently used ones. A
+    namespace that is pinned (a job still running or showing its result,
+    a download in progress) is never removed. Directory mtimes record
+    recency, so the LRU order survives restarts.
+    """
+
+    def __init__(self, root=STORE_DIR, max_bytes=STORE_MAX_BYTES, ttl_seconds=STORE_TTL_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evicted_bytes = 0
+        self._pins = {}         # namespace -> set of owners
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, namespace):
+        return os.path.join(self.root, *namespace.split("/"))
+
+    def namespace(self, namespace):
+        """
+        Returns the directory for `namespace`, creating it and marking it
+        as recently used.
+        """
+        path = self.path(namespace)
+        os.makedirs(path, exist_ok=True)
+        os.utime(path, None)
+        return path
+
+    def touch(self, namespace):
+        try:
+            os.utime(self.path(namespace), None)
+        except OSError:
+            pass
+
+    def pin(self, namespace, owner):
+        with self._lock:
+            self._pins.setdefault(namespace, set()).add(owner)
+
+    def unpin(self, namespace, owner):
+        with self._lock:
+            owners = self._pins.get(namespace)
+            if owners is not None:
+                owners.discard(owner)
+                if not owners:
+                    del self._pins[namespace]
+
+    def release(self, owner):
+        """
+        Drops every pin held by `owner`.
+        """
+        with self._lock:
+            for namespace in list(self._pins):
+                self._pins[namespace].discard(owner)
+                if not self._pins[namespace]:
+                    del self._pins[namespace]
+
+    @contextmanager
+    def in_use(self, namespace):
+        """
+        Pins `namespace` for the duration of the block.
+        """
+        owner = object()
+        self.pin(namespace, owner)
+        try:
+            yield self.namespace(namespace)
+        finally:
+            self.unpin(namespace, owner)
+
+    def _namespaces(self):
+        """
+        Returns [(namespace, mtime, bytes)] for every namespace on disk.
+        """
+        found = []
+        for kind in sorted(os.listdir(self.root)):
+            kind_dir = os.path.join(self.root, kind)
+            if not os.path.isdir(kind_dir):
+                continue
+            for name in os.listdir(kind_dir):
+                path = os.path.join(kind_dir, name)
+                if os.path.isdir(path):
+                    found.append((f"{kind}/{name}", os.path.getmtime(path), _dir_bytes(path)))
+        return found
+
+    def _remove(self, namespace, size):
+        shutil.rmtree(self.path(namespace), ignore_errors=True)
+        self.evicted_bytes += size
+        print(f"🧹 Evicted {namespace} ({size / (1024 * 1024):.1f} MB)")
+
+    def evict(self):
+        """
+        Removes expired namespaces, then least recently used ones until
+        the store fits its byte budget. Returns the bytes freed.
+        """
+        namespaces = sorted(self._namespaces(), key=lambda item: item[1])
+        total = sum(size for _, _, size in namespaces)
+        cutoff = time.time() - self.ttl_seconds
+        freed = 0
+
+        with self._lock:
+            for namespace, mtime, size in namespaces:
+                if namespace in self._pins:
+                    continue
+                if mtime < cutoff or total > self.max_bytes:
+                    self._remove(namespace, size)
+                    total -= size
+                    freed += size
+
+        if total > self.max_bytes:
+            print(f"⚠️ Artifact store is {total / (1024 * 1024):.0f} MB, over budget, "
+                  f"but everything left is in use.")
+        sys.stdout.flush()
+        return freed
+
+    def usage(self):
+        """
+        Returns disk usage per namespace kind, pin and eviction counters.
+        """
+        namespaces = self._namespaces()
+        by_kind = {}
+        for namespace, _, size in namespaces:
+            kind = namespace.split("/", 1)[0]
+            by_kind[kind] = by_kind.get(kind, 0) + size
+        with self._lock:
+            pinned = len(self._pins)
+        return {
+            "bytes": sum(by_kind.values()),
+            "max_bytes": self.max_bytes,
+            "by_kind": by_kind,
+            "namespaces": len(namespaces),
+            "pinned": pinned,
+            "evicted_bytes": self.evicted_bytes,
+        }
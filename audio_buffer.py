@@ -0,0 +1,133 @@
+import os
+import sys
+import subprocess
+import threading
+import numpy as np
+
+from streaming import SAMPLE_RATE
+from tracing import tracer
+
+
+# Not "audio.*": MediaStore treats those names as downloaded audio.
+PCM_FILENAME = "pcm16k.f32"
+# Samples scanned per step by the analysis passes, so none of them holds
+# more than a few MB of the buffer in memory at once.
+SCAN_BLOCK_SAMPLES = 60 * SAMPLE_RATE
+# Frames quieter than this (dBFS) count as silence.
+SILENCE_DB = -50.0
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_lock:
+        return _locks.setdefault(path, threading.Lock())
+
+
+def decode_to_file(source, path):
+    """
+    Decodes any ffmpeg-readable file to raw 16 kHz mono float32 at `path`.
+    ffmpeg writes straight to disk, so memory use doesn't grow with the
+    length of the recording.
+    """
+    tmp_path = f"{path}.tmp"
+    result = subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", source,
+         "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", tmp_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode != 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"ffmpeg could not decode {source}: {result.stderr.strip()}")
+    os.replace(tmp_path, path)
+
+
+def frame_energy(audio, frame):
+    """
+    Mean square of each `frame`-sample frame of `audio` (a trailing
+    partial frame is dropped), computed block by block so a memory-mapped
+    buffer is never copied whole.
+    """
+    n_frames = audio.size // frame
+    energy = np.empty(n_frames, dtype=np.float32)
+    frames_per_block = max(1, SCAN_BLOCK_SAMPLES // frame)
+    for first in range(0, n_frames, frames_per_block):
+        last = min(first + frames_per_block, n_frames)
+        block = np.asarray(audio[first * frame:last * frame], dtype=np.float32)
+        energy[first:last] = np.square(block).reshape(last - first, frame).mean(axis=1)
+    return energy
+
+
+class AudioBuffer:
+    """
+    One source's audio, decoded once to 16 kHz mono float32 in a file
+    next to it and memory-mapped. Whisper, the silence segmenter and the
+    loudness analysis all read `samples` without copying it, and later
+    requests for the same source reuse the file.
+    """
+
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source
+        self._samples = None
+        self._loudness = {}
+
+    @classmethod
+    def prepare(cls, source, directory):
+        """
+        Returns the buffer for `source` stored in `directory`, decoding it
+        unless an up-to-date one is already there. Concurrent callers for
+        the same file wait for a single decode.
+        """
+        path = os.path.join(directory, PCM_FILENAME)
+        with _lock_for(path):
+            if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+                print(f"♻️ Reusing decoded audio for {source}")
+                sys.stdout.flush()
+                return cls(path, source)
+
+            with tracer.span("decode_audio") as span:
+                decode_to_file(source, path)
+                span.set(bytes_in=os.path.getsize(source), bytes_out=os.path.getsize(path),
+                         media_seconds=os.path.getsize(path) / (4 * SAMPLE_RATE))
+            print(f"🎧 Decoded {source} to {path}")
+            sys.stdout.flush()
+            return cls(path, source)
+
+    @property
+    def samples(self):
+        if self._samples is None:
+            if os.path.getsize(self.path) == 0:
+                self._samples = np.zeros(0, dtype=np.float32)     # mmap can't map an empty file
+            else:
+                self._samples = np.memmap(self.path, dtype=np.float32, mode="r")
+        return self._samples
+
+    @property
+    def duration(self):
+        return os.path.getsize(self.path) / (4 * SAMPLE_RATE)
+
+    def loudness(self, frame_seconds=0.5):
+        """
+        Level of each `frame_seconds` frame in dBFS (0 = full scale).
+        """
+        if frame_seconds not in self._loudness:
+            energy = frame_energy(self.samples, max(1, int(frame_seconds * SAMPLE_RATE)))
+            self._loudness[frame_seconds] = 10 * np.log10(energy + 1e-10)
+        return self._loudness[frame_seconds]
+
+    def mean_loudness(self, spans, frame_seconds=0.5):
+        """
+        Mean dBFS of each (start, end) span in seconds, or SILENCE_DB for
+        spans outside the audio.
+        """
+        levels = self.loudness(frame_seconds)
+        cumulative = np.concatenate([[0.0], np.cumsum(levels, dtype=np.float64)])
+        bounds = np.asarray(spans, dtype=np.float64).reshape(-1, 2) / frame_seconds
+        lo = np.clip(bounds[:, 0].astype(np.int64), 0, len(levels))
+        hi = np.clip(np.ceil(bounds[:, 1]).astype(np.int64), 0, len(levels))
+        frames = hi - lo
+        means = (cumulative[hi] - cumulative[lo]) / np.maximum(frames, 1)
+        return np.where(frames > 0, means, SILENCE_DB)
@@ -0,0 +1,285 @@
+"""
+Headless batch summarizer for many videos.
+
+    python batch.py urls.txt --kinds text audio --output results.jsonl
+    python batch.py https://youtu.be/abc lecture.mp4 --kinds video --threshold 0.3
+    python batch.py urls.txt --workers 8 --transcribe-workers 2 --llm-workers 6
+
+Inputs are URLs or local files, given directly or one per line in a text
+file (blank lines and lines starting with # are skipped). All items run in
+one process, so the Whisper and translation models are loaded once and
+shared. Each (source, kind) result is appended to the JSONL output as soon
+as it finishes; rerunning with the same output skips what is already done.
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import traceback
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+from media import MediaStore
+from audio_buffer import AudioBuffer
+from scene_index import SceneIndex
+from tracing import tracer
+from streaming import is_url
+from summary import (
+    transcribe_audio,
+    summarize_text,
+    text_to_audio,
+    select_key_scenes,
+    create_video_summary_ffmpeg
+)
+
+
+KINDS = ("text", "audio", "video")
+OUTPUT_DIR = os.path.join(os.getcwd(), "batch_output")
+
+
+class BatchFailed(Exception):
+    pass
+
+
+def read_sources(inputs):
+    """
+    Expands the positional inputs: a path to a .txt file is read as a
+    list of sources, anything else is a source itself.
+    """
+    sources = []
+    for item in inputs:
+        if not is_url(item) and item.endswith(".txt") and os.path.isfile(item):
+            with open(item) as f:
+                sources += [line.strip() for line in f
+                            if line.strip() and not line.lstrip().startswith("#")]
+        else:
+            sources.append(item)
+    # Keep the first occurrence of each source.
+    return list(dict.fromkeys(sources))
+
+
+def load_done(output_path):
+    """
+    Returns the set of (source, kind) pairs already finished in the output file.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue    # a line cut short by an interrupted run
+            if record.get("status") == "done":
+                done.add((record["source"], record["kind"]))
+    return done
+
+
+def item_dir(root, source):
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", os.path.basename(source.rstrip("/")))[:40]
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:10]
+    path = os.path.join(root, f"{name}-{digest}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BatchRunner:
+    """
+    Runs text / audio / video summaries for many sources on a thread pool.
+    Each stage has its own concurrency limit, so e.g. many downloads and
+    LLM calls can be in flight while only one transcription runs at a time.
+    """
+
+    def __init__(self, output_path, out_dir=OUTPUT_DIR, workers=4, limits=None,
+                 threshold=0.4, media_store=None):
+        self.output_path = output_path
+        self.out_dir = out_dir
+        self.workers = workers
+        self.threshold = threshold
+        self.media_store = media_store or MediaStore()
+        self.limits = {stage: threading.BoundedSemaphore(n) for stage, n in (limits or {}).items()}
+        self._write_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.finished = 0
+        self.total = 0
+
+    def stage(self, name):
+        return self.limits.get(name) or nullcontext()
+
+    def write(self, record):
+        with self._write_lock:
+            with open(self.output_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def get_audio(self, source, work_dir):
+        """
+        Returns (AudioBuffer, title). Local files are decoded into the
+        item's own directory.
+        """
+        if not is_url(source):
+            return AudioBuffer.prepare(source, work_dir), os.path.basename(source)
+        with self.stage("download"):
+            return self.media_store.get_audio_buffer(source, owner=source)
+
+    def get_video(self, source):
+        if not is_url(source):
+            return source, os.path.basename(source)
+        with self.stage("download"):
+            return self.media_store.get_video(source, owner=source)
+
+    def run_text(self, source, work_dir):
+        """
+        Transcribes and summarizes once for both the text and audio kinds.
+        """
+        audio, title = self.get_audio(source, work_dir)
+        with self.stage("transcribe"):
+            transcript, language = transcribe_audio(audio.source, work_dir, audio=audio)
+        if not transcript:
+            raise BatchFailed("Transcription failed.")
+
+        with self.stage("llm"):
+            summary = summarize_text(transcript, source_lang=language)
+        if not summary:
+            raise BatchFailed("Summarization failed.")
+
+        summary_path = os.path.join(work_dir, "summary.txt")
+        with open(summary_path, "w") as f:
+            f.write(summary)
+        return {"title": title, "language": language,
+                "summary": summary, "summary_path": summary_path}
+
+    def run_audio(self, text, work_dir):
+        """
+        Speaks the summary run_text produced.
+        """
+        audio_out = os.path.join(work_dir, "summary.mp3")
+        with self.stage("tts"):
+            if not text_to_audio(text["summary"], audio_out):
+                raise BatchFailed("Text-to-speech failed.")
+        return {"title": text["title"], "language": text["language"],
+                "summary_path": text["summary_path"], "audio_path": audio_out}
+
+    def run_video(self, source, work_dir):
+        video_path, title = self.get_video(source)
+        with self.stage("video"):
+            # A local input's directory may be read-only or shared; keep its index with the outputs.
+            index_dir = None if is_url(source) else work_dir
+            index = SceneIndex.load_or_build(video_path, directory=index_dir)
+            scenes = index.scenes(self.threshold)
+            if not scenes:
+                raise BatchFailed("No scenes detected. Try lowering --threshold.")
+            key_scenes = select_key_scenes(scenes, max_scenes=5, index=index)
+            output = create_video_summary_ffmpeg(
+                video_path, key_scenes, os.path.join(work_dir, "summary.mp4")
+            )
+        return {"title": title, "video_path": output, "scenes": key_scenes}
+
+    def process(self, source, kinds):
+        """
+        Produces every requested kind for one source and writes one
+        record per kind. A failing kind doesn't stop the others.
+        """
+        work_dir = item_dir(self.out_dir, source)
+        results = {}
+
+        with tracer.trace(os.path.basename(work_dir)):
+            start = time.perf_counter()
+            if {"text", "audio"} & set(kinds):
+                try:
+                    results["text"] = self.run_text(source, work_dir)
+                except Exception as e:
+                    results["text"] = results["audio"] = e
+                else:
+                    if "audio" in kinds:
+                        try:
+                            results["audio"] = self.run_audio(results["text"], work_dir)
+                        except Exception as e:
+                            results["audio"] = e
+            if "video" in kinds:
+                try:
+                    results["video"] = self.run_video(source, work_dir)
+                except Exception as e:
+                    results["video"] = e
+            elapsed = round(time.perf_counter() - start, 2)
+        self.media_store.store.release(source)
+
+        for kind in kinds:
+            outcome = results.get(kind)
+            record = {"source": source, "kind": kind, "seconds": elapsed,
+                      "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            if isinstance(outcome, Exception):
+                if not isinstance(outcome, BatchFailed):
+                    traceback.print_exception(type(outcome), outcome, outcome.__traceback__)
+                record.update(status="failed", error=str(outcome))
+            else:
+                record.update(status="done", **outcome)
+            self.write(record)
+
+        with self._counter_lock:
+            self.finished += 1
+            finished = self.finished
+        failed = [kind for kind in kinds if isinstance(results.get(kind), Exception)]
+        marker = f"⚠️ failed: {', '.join(failed)}" if failed else "✅"
+        print(f"[{finished}/{self.total}] {marker} {source} ({elapsed}s)")
+        sys.stdout.flush()
+
+    def run(self, sources, kinds):
+        """
+        Processes every source that still has kinds left to do.
+        """
+        done = load_done(self.output_path)
+        pending = []
+        for source in sources:
+            todo = [kind for kind in kinds if (source, kind) not in done]
+            if todo:
+                pending.append((source, todo))
+
+        skipped = len(sources) - len(pending)
+        if skipped:
+            print(f"⏭️ Skipping {skipped} source(s) already done in {self.output_path}")
+        self.total = len(pending)
+        print(f"🚀 Processing {self.total} source(s) with {self.workers} workers...")
+        sys.stdout.flush()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            list(pool.map(lambda item: self.process(*item), pending))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="URLs, local files, or .txt files listing them.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=["text"])
+    parser.add_argument("--output", default="batch_results.jsonl")
+    parser.add_argument("--out-dir", default=OUTPUT_DIR, help="Where summary files are written.")
+    parser.add_argument("--threshold", type=float, default=0.4, help="Scene threshold for video.")
+    parser.add_argument("--workers", type=int, default=4, help="Sources processed at once.")
+    parser.add_argument("--download-workers", type=int, default=2)
+    parser.add_argument("--transcribe-workers", type=int, default=1)
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--tts-workers", type=int, default=2)
+    parser.add_argument("--video-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    runner = BatchRunner(
+        args.output, out_dir=args.out_dir, workers=args.workers, threshold=args.threshold,
+        limits={
+            "download": args.download_workers,
+            "transcribe": args.transcribe_workers,
+            "llm": args.llm_workers,
+            "tts": args.tts_workers,
+            "video": args.video_workers,
+        }
+    )
+    runner.run(read_sources(args.inputs), args.kinds)
+
+
+if __name__ == "__main__":
+    main()
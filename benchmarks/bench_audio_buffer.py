@@ -0,0 +1,70 @@
+"""
+Peak memory and time of preparing audio for transcription and analysis:
+decoding into memory (the old decode_audio) against decoding once to a
+memory-mapped AudioBuffer, and reusing that buffer.
+
+    python -m benchmarks.bench_audio_buffer --minutes 60 120
+
+Each case runs in a fresh interpreter, decodes the audio, finds the
+silence cut points and computes the loudness profile, then reports its
+own peak RSS. "reuse" runs after "buffer" and finds the file decoded.
+Mapped pages that were read count toward RSS, but they are file-backed:
+the kernel can drop them under memory pressure instead of swapping.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+
+from benchmarks.fixtures import tone_audio
+
+
+CASE_SCRIPT = """
+import json, time, resource
+import numpy as np
+from parallel_transcribe import decode_audio, split_at_silence
+from audio_buffer import AudioBuffer
+start = time.perf_counter()
+if {mode!r} == "memory":
+    audio = decode_audio({path!r})
+    energy = np.square(audio[:audio.size // 8000 * 8000]).reshape(-1, 8000).mean(axis=1)
+    loudness = 10 * np.log10(energy + 1e-10)
+else:
+    buffer = AudioBuffer.prepare({path!r}, {work_dir!r})
+    audio = buffer.samples
+    loudness = buffer.loudness()
+cuts = split_at_silence(audio)
+print(json.dumps({{"seconds": time.perf_counter() - start, "cuts": len(cuts),
+                  "frames": len(loudness),
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def run_case(mode, path, work_dir):
+    script = CASE_SCRIPT.format(mode=mode, path=path, work_dir=work_dir)
+    result = subprocess.run([sys.executable, "-c", script], stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60])
+    args = parser.parse_args()
+
+    work_dir = os.path.join(os.getcwd(), "bench_media", "audio_buffer")
+    print(f"{'audio':>8} {'mode':<8} {'seconds':>8} {'peak RSS (MB)':>14}")
+    for minutes in args.minutes:
+        path = os.path.abspath(tone_audio(minutes * 60))
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.makedirs(work_dir)
+        for mode in ("memory", "buffer", "reuse"):
+            stats = run_case(mode, path, work_dir)
+            print(f"{minutes:6g}m {mode:<8} {stats['seconds']:8.2f} {stats['peak_rss_mb']:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+LLM requests, latency and summary quality with and without the local
+extractive pre-reduction (SUMMARY_EXTRACT_TOKENS).
+
+    python -m benchmarks.bench_extractive --transcript lecture.txt --budgets 4000 8000
+    python -m benchmarks.bench_extractive --mock --words 9000 --repeats 0.3
+
+The full-text summary is the reference: each budget's summary is scored
+against it with ROUGE-1/2/L F1 (rouge-score). Without --transcript a
+pseudo-transcript of --words words is used, with --repeats of its
+sentences said again to mimic filler and repetition. --mock answers from
+a local chat server instead of Groq, which makes the request counts and
+timings meaningful but the ROUGE figures only a sanity check.
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+
+from benchmarks.fixtures import transcript_text
+from benchmarks.mock_services import MockChatServer
+
+
+def padded_transcript(words, repeats, seed=0):
+    """
+    transcript_text with a share of its sentences repeated at random places.
+    """
+    text = transcript_text(words, seed).replace("THE TRANSCRIPT IS:", "").strip()
+    sentences = [s if s.endswith(".") else s + "." for s in text.split(". ")]
+    rng = random.Random(seed)
+    for sentence in rng.sample(sentences, int(len(sentences) * repeats)):
+        sentences.insert(rng.randrange(len(sentences) + 1), sentence)
+    return "\nTHE TRANSCRIPT IS:\n\n" + " ".join(sentences)
+
+
+def run(summary, text, budget, chat_server):
+    """
+    Returns (summary, seconds, LLM requests) for one cold summarization.
+    """
+    summary.get_artifact_cache().clear()
+    before = chat_server.requests if chat_server else 0
+    start = time.perf_counter()
+    result = summary.summarize_text(text, "en", extract_tokens=budget)
+    elapsed = time.perf_counter() - start
+    assert result, f"summarization failed (budget {budget})"
+    requests = chat_server.requests - before if chat_server else None
+    return result, elapsed, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcript", help="Text file with a real transcript.")
+    parser.add_argument("--words", type=int, default=9000)
+    parser.add_argument("--repeats", type=float, default=0.3)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[3000, 6000])
+    parser.add_argument("--mock", action="store_true", help="Use a local mock chat server.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock response latency.")
+    args = parser.parse_args()
+
+    from rouge_score import rouge_scorer
+
+    os.environ["ARTIFACT_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_extractive_")
+    chat_server = MockChatServer(latency=args.latency).__enter__() if args.mock else None
+    if chat_server:
+        os.environ["GROQ_BASE_URL"] = chat_server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "mock-key")
+        os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+
+    try:
+        import summary
+        from chunking import chunk_text, counter_for
+
+        if args.transcript:
+            with open(args.transcript) as f:
+                text = "\nTHE TRANSCRIPT IS:\n\n" + f.read()
+        else:
+            text = padded_transcript(args.words, args.repeats)
+        counter = counter_for(summary.LLM_TOKENIZER)
+        print(f"📝 {len(text.split())} words, "
+              f"{len(chunk_text(text, counter, summary.SUMMARY_CHUNK_TOKENS))} chunks at "
+              f"{summary.SUMMARY_CHUNK_TOKENS} tokens")
+
+        scorer = rouge_scorer.RougeScorer(["rouge1", "rouge2", "rougeL"], use_stemmer=True)
+        reference, full_seconds, full_requests = run(summary, text, 0, chat_server)
+
+        print(f"\n{'budget':>7} {'seconds':>8} {'requests':>9} {'R-1':>6} {'R-2':>6} {'R-L':>6}")
+        print(f"{'full':>7} {full_seconds:8.2f} {str(full_requests or '-'):>9} "
+              f"{1:6.3f} {1:6.3f} {1:6.3f}")
+        for budget in args.budgets:
+            result, seconds, requests = run(summary, text, budget, chat_server)
+            scores = scorer.score(reference, result)
+            print(f"{budget:>7} {seconds:8.2f} {str(requests or '-'):>9} "
+                  f"{scores['rouge1'].fmeasure:6.3f} {scores['rouge2'].fmeasure:6.3f} "
+                  f"{scores['rougeL'].fmeasure:6.3f}")
+    finally:
+        if chat_server:
+            chat_server.__exit__(None, None, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares full-resolution scene detection with the proxy decode modes and
+the scene index built in 1..N time shards: wall time, ffmpeg peak RSS and
+boundary accuracy against the full decode.
+
+    python -m benchmarks.bench_scenes --scenes 12 --size 1920x1080
+    python -m benchmarks.bench_scenes --video lecture.mp4 --shards 1 2 4 8
+
+Sharding needs ffprobe for the duration; without it every index build
+is a single pass.
+"""
+import os
+import time
+import resource
+import argparse
+
+from benchmarks.fixtures import scene_video
+from scene_index import SceneIndex, build_index_sharded, probe_duration
+from summary import detect_scenes_fast
+
+
+MODES = [
+    ("proxy+keyframes", dict(proxy=True, keyframes_only=True)),
+    ("proxy", dict(proxy=True)),
+]
+
+
+def boundary_accuracy(reference, candidate, tolerance):
+    """
+    Precision/recall of candidate cut times against reference cut times,
+    matching each reference cut to at most one candidate within tolerance.
+    """
+    unmatched = list(candidate)
+    matched, offsets = 0, []
+    for ref in reference:
+        nearest = min(unmatched, key=lambda c: abs(c - ref), default=None)
+        if nearest is not None and abs(nearest - ref) <= tolerance:
+            unmatched.remove(nearest)
+            matched += 1
+            offsets.append(abs(nearest - ref))
+    precision = matched / len(candidate) if candidate else 1.0
+    recall = matched / len(reference) if reference else 1.0
+    mean_offset = sum(offsets) / len(offsets) if offsets else 0.0
+    return precision, recall, mean_offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="Existing video; default is a synthetic fixture.")
+    parser.add_argument("--scenes", type=int, default=12)
+    parser.add_argument("--scene-seconds", type=float, default=5.0)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--threshold", type=float, default=0.4)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="Shard counts to build the scene index with.")
+    parser.add_argument("--min-shard-seconds", type=float, default=10,
+                        help="Shortest shard; the fixture is too short for the default 60 s.")
+    args = parser.parse_args()
+
+    if args.video:
+        video = args.video
+    else:
+        video, _ = scene_video(args.scenes, args.scene_seconds, args.size)
+
+    if probe_duration(video) is None:
+        print("⚠️ ffprobe can't read the duration; index builds will not be sharded.")
+
+    runs = [(name, lambda options=options: detect_scenes_fast(video, threshold=args.threshold, **options))
+            for name, options in MODES]
+    runs += [(f"index x{shards}",
+              lambda shards=shards: SceneIndex(build_index_sharded(
+                  video, shards=shards, min_shard_seconds=args.min_shard_seconds
+              )).scenes(args.threshold))
+             for shards in args.shards]
+    runs.append(("full", lambda: detect_scenes_fast(video, threshold=args.threshold)))
+
+    results = {}
+    # Lightest first: ru_maxrss for children only ever grows.
+    for name, run in runs:
+        start = time.perf_counter()
+        scenes = run()
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        results[name] = ([end for _, end in scenes], elapsed, peak_mb)
+
+    reference, full_time, _ = results["full"]
+    print(f"{'mode':<17}{'time':>9}{'speedup':>9}{'ffmpeg RSS':>12}"
+          f"{'precision':>11}{'recall':>8}{'offset':>8}")
+    for name, (cuts, elapsed, peak_mb) in results.items():
+        precision, recall, offset = boundary_accuracy(reference, cuts, args.tolerance)
+        print(f"{name:<17}{elapsed:8.2f}s{full_time / elapsed:8.1f}x{peak_mb:10.0f}MB"
+              f"{precision:11.2f}{recall:8.2f}{offset:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures cold start: how long `import summary` takes and how long the
+first transcription request waits, each in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --audio lecture.m4a --warmup-delay 10
+
+"eager" first imports every heavy dependency summary.py used to load at
+module level (the old behaviour); "lazy" imports summary.py alone. For the
+first request, "cold" transcribes right after import and "warm" starts the
+background warm-up, waits `--warmup-delay` seconds (a user reading the
+page) and then transcribes.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+from benchmarks.fixtures import speech_audio
+
+
+# What summary.py imported at module level before the imports went lazy.
+EAGER_MODULES = ["faster_whisper", "torch", "moviepy.editor", "PIL.Image",
+                 "transformers", "groq", "elevenlabs.client", "yt_dlp"]
+
+IMPORT_SCRIPT = """
+import sys, json, time, importlib
+start = time.perf_counter()
+for name in {eager!r}:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+import summary
+print(json.dumps({{"import_seconds": time.perf_counter() - start,
+                  "modules": len(sys.modules)}}))
+"""
+
+REQUEST_SCRIPT = """
+import json, time, tempfile
+start = time.perf_counter()
+import summary
+imported = time.perf_counter()
+if {warm!r}:
+    summary.warm_up_models()
+    time.sleep({delay!r})
+summary.get_artifact_cache().clear()
+request = time.perf_counter()
+summary.transcribe_audio({audio!r}, tempfile.mkdtemp())
+print(json.dumps({{"import_seconds": imported - start,
+                  "first_request_seconds": time.perf_counter() - request}}))
+"""
+
+
+def run_fresh(script, env):
+    """
+    Runs `script` in a new interpreter and returns the JSON it prints last.
+    """
+    result = subprocess.run([sys.executable, "-c", script], env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def describe(values):
+    return f"median {statistics.median(values):7.3f}s  min {min(values):7.3f}s  max {max(values):7.3f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--audio", help="Audio for the first request (default: a speech fixture).")
+    parser.add_argument("--warmup-delay", type=float, default=5.0)
+    parser.add_argument("--skip-request", action="store_true", help="Only measure import time.")
+    args = parser.parse_args()
+
+    env = dict(os.environ, WHISPER_WARMUP="1",
+               ARTIFACT_CACHE_DIR=os.path.join(os.getcwd(), "bench_media", "startup_cache"))
+
+    print("📦 import summary")
+    for label, eager in [("eager", EAGER_MODULES), ("lazy", [])]:
+        runs = [run_fresh(IMPORT_SCRIPT.format(eager=eager), env) for _ in range(args.runs)]
+        print(f"  {label:<6} {describe([r['import_seconds'] for r in runs])}  "
+              f"({runs[-1]['modules']} modules loaded)")
+
+    if args.skip_request:
+        return
+
+    audio = os.path.abspath(args.audio or speech_audio(30)[0])
+    print(f"🎤 first transcription request ({os.path.basename(audio)})")
+    for label, warm in [("cold", False), ("warm", True)]:
+        script = REQUEST_SCRIPT.format(warm=warm, delay=args.warmup_delay, audio=audio)
+        runs = [run_fresh(script, env) for _ in range(args.runs)]
+        print(f"  {label:<6} {describe([r['first_request_seconds'] for r in runs])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Time to first summary text and total time, summarizing after the whole
+transcript is ready ("batch") against summarizing chunks while the
+transcript is still arriving ("incremental").
+
+    python -m benchmarks.bench_streaming --words 6000 --rtf 0.05
+    python -m benchmarks.bench_streaming --chunk-tokens 800 --latency 1.0
+
+Whisper is simulated: a pseudo-transcript is cut into segments that
+arrive at `--rtf` times their speaking duration. Chat completions come
+from a local streaming mock, so only the pipeline's scheduling is
+measured.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from benchmarks.fixtures import transcript_text
+from benchmarks.mock_services import MockChatServer
+
+
+WORDS_PER_SECOND = 2.5      # speaking rate of the simulated audio
+
+
+class SimulatedStream:
+    """
+    Stands in for summary.TranscriptStream: yields (start, end, text)
+    segments with the delay a transcriber at `rtf` would need for them.
+    """
+
+    cached = None
+
+    def __init__(self, text, rtf, segment_words=20):
+        words = text.replace("THE TRANSCRIPT IS:", "").split()
+        self.pieces = [" ".join(words[i:i + segment_words]) for i in range(0, len(words), segment_words)]
+        self.segment_seconds = segment_words / WORDS_PER_SECOND
+        self.rtf = rtf
+        self.language = "en"
+        self.segments = []
+        self.transcript = None
+
+    def __iter__(self):
+        for i, piece in enumerate(self.pieces):
+            time.sleep(self.segment_seconds * self.rtf)
+            segment = [i * self.segment_seconds, (i + 1) * self.segment_seconds, piece]
+            self.segments.append(segment)
+            yield segment
+        self.transcript = "\nTHE TRANSCRIPT IS:\n\n" + " ".join(self.pieces)
+
+
+def run(summary, mode, text, rtf):
+    """
+    Returns (seconds to first summary text, total seconds, chunks).
+    """
+    first = []
+    chunks = set()
+    start = time.perf_counter()
+
+    def on_partial(kind, index, partial):
+        if kind != "transcript" and not first:
+            first.append(time.perf_counter() - start)
+        if kind == "chunk":
+            chunks.add(index)
+
+    stream = SimulatedStream(text, rtf)
+    if mode == "batch":
+        for _ in stream:
+            pass
+        result = summary.summarize_text(stream.transcript, "en", on_partial=on_partial)
+    else:
+        result = summary.summarize_incremental(stream, on_partial=on_partial)
+    total = time.perf_counter() - start
+    assert result, f"{mode} summarization failed"
+    return first[0], total, len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--rtf", type=float, default=0.02,
+                        help="Simulated transcription time per second of audio.")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock time to first token.")
+    parser.add_argument("--token-interval", type=float, default=0.02)
+    parser.add_argument("--chunk-tokens", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    with MockChatServer(latency=args.latency, token_interval=args.token_interval) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ["ARTIFACT_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_streaming_")
+        os.environ["SUMMARY_CHUNK_TOKENS"] = str(args.chunk_tokens)
+        os.environ.setdefault("GROQ_API_KEY", "mock-key")
+        os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+
+        import summary
+
+        audio_seconds = args.words / WORDS_PER_SECOND
+        print(f"📝 {args.words} words (~{audio_seconds:.0f}s of audio), transcribed in "
+              f"~{audio_seconds * args.rtf:.1f}s, {args.chunk_tokens}-token chunks")
+        print(f"\n{'mode':<12} {'first text (s)':>15} {'total (s)':>10} {'chunks':>7}")
+        for mode in ("batch", "incremental"):
+            for seed in range(args.repeat):
+                # Cold every time, so the summary cache never answers.
+                summary.get_artifact_cache().clear()
+                first, total, chunks = run(summary, mode, transcript_text(args.words, seed), args.rtf)
+                print(f"{mode:<12} {first:15.2f} {total:10.2f} {chunks:7d}")
+
+        print(f"\nmock served {server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures the speedup of concurrent chunk summarization against a local
+mock of the chat-completions endpoint.
+
+    python -m benchmarks.bench_summarize --chunks 24 --latency 0.5
+"""
+import os
+import time
+import argparse
+
+from benchmarks.mock_services import MockChatServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Answer every N-th request with 429.")
+    args = parser.parse_args()
+
+    with MockChatServer(latency=args.latency, rate_limit_every=args.rate_limit_every) as server:
+        os.environ["GROQ_BASE_URL"] = server.base_url
+        os.environ.setdefault("GROQ_API_KEY", "mock-key")
+
+        import llm
+
+        # Don't let the production rate limit dominate the measurement.
+        limiter = llm.RateLimiter(requests_per_minute=6000, burst=max(args.workers))
+        # Each chunk has a distinct word count so result order can be checked.
+        chunks = ["lorem ipsum " * 250 + "x " * i for i in range(args.chunks)]
+
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            results = llm.map_ordered(
+                lambda chunk: llm.chat(chunk, "llama-3.3-70b-versatile", limiter=limiter),
+                chunks, max_workers=workers
+            )
+            elapsed = time.perf_counter() - start
+
+            word_counts = [int(r.split(" of ")[1].split()[0]) for r in results]
+            assert word_counts == sorted(word_counts), "results out of order"
+            baseline = baseline or elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f}s  speedup x{baseline / elapsed:4.1f}")
+
+        print(f"mock served {server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
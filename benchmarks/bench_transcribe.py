@@ -0,0 +1,72 @@
+"""
+Compares single-stream transcription with the parallel segmented path.
+
+    python -m benchmarks.bench_transcribe lecture.m4a --workers 2 4 8 --threads 1 2
+
+Reports wall time, real-time factor and word error rate of each parallel
+configuration against the single-stream transcript.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from parallel_transcribe import transcribe_parallel, get_worker_pool
+from audio_buffer import AudioBuffer
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h))
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    from faster_whisper import WhisperModel
+
+    download_root = os.path.join(os.getcwd(), "models_cache")
+    audio = AudioBuffer.prepare(args.audio, tempfile.mkdtemp(prefix="bench_transcribe_"))
+    duration = audio.duration
+    print(f"🎧 {args.audio}: {duration:.1f}s of audio")
+
+    model = WhisperModel(args.model, device="cpu", compute_type="int8", download_root=download_root)
+    start = time.perf_counter()
+    segments, info = model.transcribe(audio.samples, beam_size=args.beam_size)
+    reference = " ".join(segment.text for segment in segments)
+    elapsed = time.perf_counter() - start
+    print(f"{'single-stream':<22} {elapsed:8.2f}s  RTF {elapsed / duration:.3f}")
+
+    for workers in args.workers:
+        for threads in args.threads:
+            # Warm the pool so model loading isn't counted as transcription time.
+            pool = get_worker_pool(args.model, workers, threads, download_root)
+            list(pool.map(time.sleep, [0.5] * workers))
+
+            start = time.perf_counter()
+            words, _, _ = transcribe_parallel(
+                args.audio, model_size=args.model, beam_size=args.beam_size,
+                language=info.language, workers=workers, threads_per_worker=threads,
+                download_root=download_root, audio=audio
+            )
+            elapsed = time.perf_counter() - start
+            hypothesis = "".join(text for _, _, text in words)
+            print(f"{f'{workers} workers x {threads} thr':<22} {elapsed:8.2f}s  "
+                  f"RTF {elapsed / duration:.3f}  WER vs single {word_error_rate(reference, hypothesis):.3f}")
+
+
+if __name__ == "__main__":
+    main()
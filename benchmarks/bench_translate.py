@@ -0,0 +1,66 @@
+"""
+Speed and quality of the translation backends on fixed sentence pairs:
+the transformers pipeline ("torch") against CTranslate2 ("ct2").
+
+    python -m benchmarks.bench_translate
+    python -m benchmarks.bench_translate --languages de --repeat 10 --intra-threads 4
+
+Each backend translates every fixture as one batch (after an untimed
+warm-up run). WER is measured against the reference translations and,
+for ct2, against the torch output, which shows how much quantization
+changes the result. The first ct2 run converts the models into
+models_cache/ct2.
+"""
+import os
+import time
+import argparse
+import statistics
+
+from benchmarks.bench_transcribe import word_error_rate
+from benchmarks.fixtures import TRANSLATION_PAIRS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", nargs="+", default=sorted(TRANSLATION_PAIRS))
+    parser.add_argument("--backends", nargs="+", default=["torch", "ct2"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--inter-threads", type=int, default=1)
+    parser.add_argument("--intra-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["CT2_INTER_THREADS"] = str(args.inter_threads)
+    os.environ["CT2_INTRA_THREADS"] = str(args.intra_threads)
+
+    from translation import TranslationRegistry
+
+    print(f"{'lang':<5} {'backend':<10} {'model':<36} {'median (s)':>10} {'words/s':>8} "
+          f"{'WER ref':>8} {'WER torch':>9}")
+    for language in args.languages:
+        sources = [source for source, _ in TRANSLATION_PAIRS[language]]
+        reference = " ".join(target for _, target in TRANSLATION_PAIRS[language])
+        words = sum(len(source.split()) for source in sources)
+        torch_output = None
+
+        for backend in args.backends:
+            model = TranslationRegistry(backend=backend).get(language, "en")
+            model.translate(sources, language, "en")    # warm-up
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output = " ".join(model.translate(sources, language, "en"))
+                timings.append(time.perf_counter() - start)
+
+            if model.backend == "torch":
+                torch_output = output
+            median = statistics.median(timings)
+            versus_torch = (f"{word_error_rate(torch_output, output):9.3f}"
+                            if torch_output is not None and model.backend != "torch" else f"{'-':>9}")
+            print(f"{language:<5} {model.backend:<10} {model.name:<36} {median:10.3f} "
+                  f"{words / median:8.1f} {word_error_rate(reference, output):8.3f} {versus_torch}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Real-time factor and accuracy of Whisper engine configurations.
+
+    python -m benchmarks.bench_whisper lecture.m4a --reference lecture.txt
+    python -m benchmarks.bench_whisper lecture.m4a --models tiny base small --beams 1 5 --batches 0 8
+
+Every combination of model, beam width, batch size and VAD is run on the
+same audio. WER is measured against --reference if given, otherwise
+against the first configuration's output. Also prints what choose_config
+would pick for this audio on this machine.
+"""
+import os
+import time
+import argparse
+import itertools
+
+from benchmarks.bench_transcribe import word_error_rate
+from parallel_transcribe import decode_audio
+from streaming import SAMPLE_RATE
+from whisper_engine import WhisperEngine, WhisperConfig, choose_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("--reference", help="Text file with the correct transcript.")
+    parser.add_argument("--models", nargs="+", default=["small", "base", "tiny"])
+    parser.add_argument("--beams", type=int, nargs="+", default=[5, 1])
+    parser.add_argument("--batches", type=int, nargs="+", default=[0, 8])
+    parser.add_argument("--vad", choices=["on", "off", "both"], default="on")
+    parser.add_argument("--cpu-threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    audio = decode_audio(args.audio)
+    duration = audio.size / SAMPLE_RATE
+    print(f"🎧 {args.audio}: {duration:.1f}s of audio, {os.cpu_count()} cores")
+    print(f"🤖 choose_config would pick: {choose_config(duration)}")
+
+    reference = None
+    if args.reference:
+        with open(args.reference) as f:
+            reference = f.read()
+
+    vad_options = {"on": [True], "off": [False], "both": [True, False]}[args.vad]
+    engine = WhisperEngine()
+
+    print(f"\n{'model':<7} {'beam':>4} {'batch':>5} {'vad':>4} {'seconds':>8} {'RTF':>6} {'WER':>6}")
+    for model_size, beam, batch, vad in itertools.product(args.models, args.beams, args.batches, vad_options):
+        config = WhisperConfig(model_size, beam, batch, vad, cpu_threads=args.cpu_threads, num_workers=1)
+        engine.model(config)    # load outside the timed region
+
+        start = time.perf_counter()
+        result = engine.transcribe(audio, config)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = result.text
+            print(f"   (reference transcript: {model_size} beam {beam} batch {batch} vad {vad})")
+        print(f"{model_size:<7} {beam:>4} {batch:>5} {'on' if vad else 'off':>4} {elapsed:8.2f} "
+              f"{elapsed / duration:6.3f} {word_error_rate(reference, result.text):6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Reproducible synthetic media for the benchmarks, generated with ffmpeg
+lavfi sources so no test files need to be checked in.
+"""
+import os
+import random
+import subprocess
+
+
+FIXTURE_DIR = os.path.join(os.getcwd(), "bench_media")
+
+# Named resolutions the suite sweeps over.
+SIZES = {
+    "360p": "640x360",
+    "720p": "1280x720",
+    "1080p": "1920x1080",
+}
+
+SPEECH_TEXT = (
+    "Welcome to this short lecture. Today we look at how video summaries are built. "
+    "First the audio is transcribed. Then the transcript is split into chunks. "
+    "Each chunk is summarized, and the partial summaries are merged into one. "
+    "Finally the summary can be read aloud or turned into a short video."
+)
+
+# Fixed parallel sentences for translation benchmarks: source text and an
+# English reference, per language.
+TRANSLATION_PAIRS = {
+    "de": [
+        ("Willkommen zu dieser kurzen Vorlesung.", "Welcome to this short lecture."),
+        ("Heute sehen wir uns an, wie Videozusammenfassungen erstellt werden.",
+         "Today we look at how video summaries are built."),
+        ("Zuerst wird der Ton transkribiert.", "First the audio is transcribed."),
+        ("Dann wird das Transkript in Abschnitte aufgeteilt.",
+         "Then the transcript is split into chunks."),
+        ("Jeder Abschnitt wird zusammengefasst, und die Teilzusammenfassungen werden zusammengeführt.",
+         "Each chunk is summarized, and the partial summaries are merged."),
+        ("Zum Schluss kann die Zusammenfassung vorgelesen werden.",
+         "Finally the summary can be read aloud."),
+        ("Das Modell läuft auf der CPU und braucht wenig Speicher.",
+         "The model runs on the CPU and needs little memory."),
+        ("Die Ergebnisse werden zwischengespeichert, damit spätere Anfragen schneller sind.",
+         "The results are cached so that later requests are faster."),
+    ],
+    "fr": [
+        ("Bienvenue dans ce court cours.", "Welcome to this short lecture."),
+        ("Aujourd'hui, nous regardons comment les résumés vidéo sont construits.",
+         "Today we look at how video summaries are built."),
+        ("D'abord, l'audio est transcrit.", "First the audio is transcribed."),
+        ("Ensuite, la transcription est découpée en morceaux.",
+         "Then the transcript is split into chunks."),
+        ("Chaque morceau est résumé, puis les résumés partiels sont fusionnés.",
+         "Each chunk is summarized, then the partial summaries are merged."),
+        ("Enfin, le résumé peut être lu à voix haute.", "Finally the summary can be read aloud."),
+        ("Le modèle tourne sur le processeur et utilise peu de mémoire.",
+         "The model runs on the processor and uses little memory."),
+        ("Les résultats sont mis en cache pour que les requêtes suivantes soient plus rapides.",
+         "The results are cached so that later requests are faster."),
+    ],
+}
+
+# Stand-in for speech when ffmpeg has no flite: a 220 Hz voice-band tone with
+# a 4 Hz syllable envelope, talking for 2.2s out of every 3s.
+SPEECH_LIKE_EXPR = "0.4*sin(2*PI*220*t)*(0.5+0.5*sin(2*PI*4*t))*lt(mod(t\\,3)\\,2.2)"
+
+_VOCABULARY = (
+    "the model audio video scene summary transcript chunk speaker lecture frame "
+    "result token request cache latency quality budget stage worker minute "
+    "explains shows compares measures reduces improves builds splits merges reads"
+).split()
+
+# Visually distinct lavfi sources; alternating them gives hard scene cuts.
+SCENE_SOURCES = [
+    "testsrc2=size={size}:rate={fps}",
+    "smptebars=size={size}:rate={fps}",
+    "mandelbrot=size={size}:rate={fps}",
+    "color=c=navy:size={size}:rate={fps}",
+    "rgbtestsrc=size={size}:rate={fps}",
+    "cellauto=size={size}:rate={fps}",
+]
+
+
+def _run(cmd):
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+
+def scene_video(scenes=8, scene_seconds=5.0, size="1280x720", fps=30, out_dir=FIXTURE_DIR):
+    """
+    Builds an H.264 video with a 440 Hz tone whose picture hard-cuts to a
+    different source every `scene_seconds`. Returns (path, cut_times).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"scenes_{scenes}x{scene_seconds:g}s_{size}_{fps}fps.mp4")
+    cuts = [round(i * scene_seconds, 3) for i in range(1, scenes)]
+    if os.path.exists(path):
+        return path, cuts
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    for i in range(scenes):
+        source = SCENE_SOURCES[i % len(SCENE_SOURCES)].format(size=size, fps=fps)
+        cmd += ["-f", "lavfi", "-t", str(scene_seconds), "-i", source]
+    total = scenes * scene_seconds
+    cmd += ["-f", "lavfi", "-t", str(total), "-i", "sine=frequency=440:sample_rate=44100"]
+
+    inputs = "".join(f"[{i}:v]format=yuv420p,setsar=1[v{i}];" for i in range(scenes))
+    concat = "".join(f"[v{i}]" for i in range(scenes)) + f"concat=n={scenes}:v=1:a=0[v]"
+    cmd += [
+        "-filter_complex", inputs + concat,
+        "-map", "[v]", "-map", f"{scenes}:a",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", str(fps * 2),
+        "-c:a", "aac", "-shortest", path
+    ]
+    _run(cmd)
+    return path, cuts
+
+
+def tone_audio(seconds=60, frequency=440, out_dir=FIXTURE_DIR):
+    """
+    A mono 16 kHz WAV sine tone. Returns its path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"tone_{seconds:g}s_{frequency}hz.wav")
+    if not os.path.exists(path):
+        _run([
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-t", str(seconds), "-i", f"sine=frequency={frequency}:sample_rate=16000",
+            "-ac", "1", path
+        ])
+    return path
+
+
+def _flite_available():
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-filters"],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return any(line.split()[1:2] == ["flite"] for line in result.stdout.splitlines())
+
+
+def speech_audio(seconds=60, out_dir=FIXTURE_DIR):
+    """
+    A mono 16 kHz WAV of `seconds` of spoken English, looping SPEECH_TEXT
+    through ffmpeg's flite source. Without flite, falls back to a
+    speech-like tone with regular pauses.
+    Returns (path, has_words).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if _flite_available():
+        base = os.path.join(out_dir, "speech_base.wav")
+        if not os.path.exists(base):
+            text_path = os.path.join(out_dir, "speech_base.txt")
+            with open(text_path, "w") as f:
+                f.write(SPEECH_TEXT)
+            _run([
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "lavfi", "-i", f"flite=textfile={text_path}:voice=slt",
+                "-ar", "16000", "-ac", "1", base
+            ])
+        path = os.path.join(out_dir, f"speech_{seconds:g}s.wav")
+        if not os.path.exists(path):
+            _run(["ffmpeg", "-y", "-loglevel", "error",
+                  "-stream_loop", "-1", "-i", base, "-t", str(seconds), path])
+        return path, True
+
+    path = os.path.join(out_dir, f"speechlike_{seconds:g}s.wav")
+    if not os.path.exists(path):
+        _run([
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "lavfi", "-t", str(seconds), "-i", f"aevalsrc={SPEECH_LIKE_EXPR}:s=16000",
+            "-ac", "1", path
+        ])
+    return path, False
+
+
+def transcript_text(words=3000, seed=0):
+    """
+    Deterministic pseudo-transcript of `words` words, in sentences, with
+    the same prefix the transcription stage produces.
+    """
+    rng = random.Random(seed)
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        sentence = " ".join(rng.choice(_VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+    return "\nTHE TRANSCRIPT IS:\n\n" + " ".join(sentences)
@@ -0,0 +1,204 @@
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    server_version = "MockGroq/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, count, request, content):
+        """
+        Server-sent events, one chat.completion.chunk per word, spaced
+        `token_interval` apart, then [DONE]. Without a Content-Length the
+        connection is closed at the end.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {
+                "id": f"chatcmpl-mock-{count}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for i, word in enumerate(content.split(" ")):
+            if i:
+                time.sleep(self.server.mock.token_interval)
+            event({"content": word if i == 0 else " " + word})
+        event({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        mock = self.server.mock
+
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+
+        count = mock.record_request()
+        if mock.rate_limit_every and count % mock.rate_limit_every == 0:
+            self._send_json(
+                429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                headers={"Retry-After": str(mock.retry_after)}
+            )
+            return
+
+        time.sleep(mock.latency)
+
+        prompt = request["messages"][-1]["content"]
+        words = prompt.split()
+        content = f"- mock summary of {len(words)} words: " + " ".join(words[-mock.reply_words:])
+        if request.get("stream"):
+            self._send_stream(count, request, content)
+            return
+        self._send_json(200, {
+            "id": f"chatcmpl-mock-{count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": len(words), "completion_tokens": mock.reply_words,
+                      "total_tokens": len(words) + mock.reply_words},
+        })
+
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz, 417 bytes, ~26 ms).
+MP3_FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+TTS_PATH = re.compile(r"^/v1/text-to-speech/[^/?]+(/stream)?(\?.*)?$")
+
+
+class _TTSHandler(BaseHTTPRequestHandler):
+    server_version = "MockElevenLabs/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        mock = self.server.mock
+
+        if not TTS_PATH.match(self.path):
+            self.send_error(404)
+            return
+
+        mock.record_request()
+        time.sleep(mock.latency)
+
+        # Roughly the length real speech of this text would have.
+        seconds = len(request.get("text", "").split()) / mock.words_per_second
+        body = MP3_FRAME * max(1, int(seconds / MP3_FRAME_SECONDS))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _MockServer:
+    """
+    Runs a handler class on a local port in a background thread.
+    """
+
+    handler = None
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return False
+
+
+class MockChatServer(_MockServer):
+    """
+    Local stand-in for the Groq (OpenAI-compatible) chat-completions API.
+
+    `latency` is added to every successful response. If `rate_limit_every`
+    is N, every N-th request gets a 429 with a Retry-After header. With
+    "stream": true the reply comes as server-sent events, one word every
+    `token_interval` seconds after the first.
+
+        with MockChatServer(latency=0.5) as server:
+            os.environ["GROQ_BASE_URL"] = server.base_url
+    """
+
+    handler = _ChatHandler
+
+    def __init__(self, latency=0.5, rate_limit_every=0, retry_after=0.2, reply_words=40,
+                 token_interval=0.02):
+        super().__init__(latency)
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.reply_words = reply_words
+        self.token_interval = token_interval
+
+
+class MockTTSServer(_MockServer):
+    """
+    Local stand-in for the ElevenLabs text-to-speech API. Answers after
+    `latency` seconds with silent MP3 audio about as long as the text
+    would take to read at `words_per_second`.
+
+        with MockTTSServer(latency=0.5) as server:
+            os.environ["ELEVENLABS_BASE_URL"] = server.base_url
+    """
+
+    handler = _TTSHandler
+
+    def __init__(self, latency=0.5, words_per_second=2.5):
+        super().__init__(latency)
+        self.words_per_second = words_per_second
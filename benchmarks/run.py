@@ -0,0 +1,243 @@
+"""
+Offline benchmark suite for the summary pipeline.
+
+Generates synthetic media with ffmpeg lavfi sources, points Groq and
+ElevenLabs at local mock servers, and times each stage over several
+input lengths and resolutions:
+
+    transcribe   transcribe_audio on speech fixtures
+    scenes       detect_scenes_fast on scene-cut videos
+    select       select_key_scenes on the detected scenes
+    assemble     create_video_summary_ffmpeg of the selected scenes
+    summarize    summarize_text on pseudo-transcripts (mock chat API)
+    tts          text_to_audio of a summary (mock text-to-speech API)
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --compare baseline.json --tolerance 0.15
+    python -m benchmarks.run --stages scenes assemble --sizes 720p 1080p --repeat 5
+
+Every repetition runs cold: the artifact cache lives in a temporary
+directory and is cleared before each run. Peak RSS is a process-wide
+high-water mark, so a stage's value includes every stage before it;
+the ffmpeg column is the largest finished subprocess so far.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import numpy as np
+
+from benchmarks.fixtures import SIZES, scene_video, speech_audio, transcript_text
+from benchmarks.mock_services import MockChatServer, MockTTSServer
+
+
+STAGES = ["transcribe", "scenes", "select", "assemble", "summarize", "tts"]
+PERCENTILES = (50, 90, 99)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux.
+    self_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    child_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return round(self_peak, 1), round(child_peak, 1)
+
+
+def measure(run, repeat, warmup, before=None):
+    """
+    Calls `run()` warmup + repeat times; `before()` runs untimed ahead of
+    every call. Returns the timed latencies and the last return value.
+    """
+    latencies, result = [], None
+    for i in range(warmup + repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            latencies.append(elapsed)
+    return latencies, result
+
+
+def summarize_latencies(latencies, units=None, unit_name=None):
+    """
+    Percentiles and throughput for one benchmark case. `units` is the
+    amount of work per run (media seconds, words, scenes).
+    """
+    values = np.asarray(latencies)
+    stats = {f"p{p}": round(float(np.percentile(values, p)), 4) for p in PERCENTILES}
+    stats["mean"] = round(float(values.mean()), 4)
+    stats["runs"] = len(latencies)
+    if units:
+        stats["throughput"] = round(units / float(np.median(values)), 3)
+        stats["throughput_unit"] = f"{unit_name}/s"
+    stats["peak_rss_mb"], stats["ffmpeg_peak_rss_mb"] = peak_rss_mb()
+    return stats
+
+
+def run_suite(args, work_dir):
+    import summary
+    from scene_index import SceneIndex
+
+    cache = summary.get_artifact_cache()
+    results = {}
+
+    def record(name, latencies, units=None, unit_name=None):
+        results[name] = summarize_latencies(latencies, units, unit_name)
+        stats = results[name]
+        throughput = f"{stats['throughput']:>9.2f} {stats['throughput_unit']}" if units else ""
+        print(f"{name:<28} p50 {stats['p50']:8.3f}s  p90 {stats['p90']:8.3f}s  "
+              f"p99 {stats['p99']:8.3f}s  {throughput:<22} "
+              f"RSS {stats['peak_rss_mb']:7.1f} MB  ffmpeg {stats['ffmpeg_peak_rss_mb']:7.1f} MB")
+        sys.stdout.flush()
+
+    if "transcribe" in args.stages:
+        for seconds in args.lengths:
+            path, has_words = speech_audio(seconds)
+            latencies, _ = measure(
+                lambda: summary.transcribe_audio(path, work_dir),
+                args.repeat, args.warmup, before=cache.clear
+            )
+            kind = "speech" if has_words else "speechlike"
+            record(f"transcribe[{kind} {seconds:g}s]", latencies, seconds, "media-s")
+
+    video_stages = {"scenes", "select", "assemble"} & set(args.stages)
+    for size_name in args.sizes if video_stages else []:
+        for seconds in args.lengths:
+            scenes_count = max(2, int(seconds / args.scene_seconds))
+            video, _ = scene_video(scenes_count, args.scene_seconds, SIZES[size_name])
+            duration = scenes_count * args.scene_seconds
+            label = f"{size_name} {duration:g}s"
+
+            latencies, scenes = measure(
+                lambda: summary.detect_scenes_fast(video, proxy=args.proxy),
+                args.repeat if "scenes" in args.stages else 1,
+                args.warmup if "scenes" in args.stages else 0
+            )
+            if "scenes" in args.stages:
+                record(f"scenes[{label}]", latencies, duration, "media-s")
+
+            index = SceneIndex.load_or_build(video)
+            latencies, key_scenes = measure(
+                lambda: summary.select_key_scenes(scenes, max_scenes=5, index=index),
+                args.repeat * 20, args.warmup
+            )
+            if "select" in args.stages:
+                record(f"select[{label}]", latencies, len(scenes), "scenes")
+
+            if "assemble" in args.stages:
+                output = os.path.join(work_dir, "assembled.mp4")
+                latencies, _ = measure(
+                    lambda: summary.create_video_summary_ffmpeg(video, key_scenes, output),
+                    args.repeat, args.warmup
+                )
+                kept = sum(end - start for start, end in key_scenes)
+                record(f"assemble[{label}]", latencies, kept, "media-s")
+
+    if "summarize" in args.stages:
+        for words in args.words:
+            text = transcript_text(words)
+            latencies, _ = measure(
+                lambda: summary.summarize_text(text, source_lang="en"),
+                args.repeat, args.warmup, before=cache.clear
+            )
+            record(f"summarize[{words} words]", latencies, words, "words")
+
+    if "tts" in args.stages:
+        text = transcript_text(200).split("\n\n", 1)[1]
+        output = os.path.join(work_dir, "summary.mp3")
+        latencies, _ = measure(
+            lambda: summary.text_to_audio(text, output),
+            args.repeat, args.warmup, before=cache.clear
+        )
+        record("tts[200 words]", latencies, 200, "words")
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints p50 changes against a saved baseline. Returns the names of the
+    cases that got slower by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    print(f"\n{'case':<28} {'baseline p50':>13} {'now p50':>10} {'change':>9}")
+    for name, stats in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<28} {'-':>13} {stats['p50']:>9.3f}s {'new':>9}")
+            continue
+        change = (stats["p50"] - before["p50"]) / before["p50"] if before["p50"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  ⚠️ regression"
+        print(f"{name:<28} {before['p50']:>12.3f}s {stats['p50']:>9.3f}s {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--lengths", type=float, nargs="+", default=[30, 120],
+                        help="Audio/video fixture lengths in seconds.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["360p", "720p"])
+    parser.add_argument("--scene-seconds", type=float, default=5.0)
+    parser.add_argument("--proxy", action="store_true", help="Use proxy decode for scene detection.")
+    parser.add_argument("--words", type=int, nargs="+", default=[1500, 6000],
+                        help="Transcript lengths for the summarize stage.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--save", metavar="JSON", help="Write the results as a baseline.")
+    parser.add_argument("--compare", metavar="JSON", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed p50 slowdown before a case counts as a regression.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_") as work_dir, \
+            MockChatServer(latency=args.llm_latency) as chat_server, \
+            MockTTSServer(latency=args.tts_latency) as tts_server:
+        # Must be set before summary / llm / cache are imported.
+        os.environ["GROQ_BASE_URL"] = chat_server.base_url
+        os.environ["ELEVENLABS_BASE_URL"] = tts_server.base_url
+        os.environ["ARTIFACT_CACHE_DIR"] = os.path.join(work_dir, "artifact_cache")
+        os.environ.setdefault("GROQ_API_KEY", "mock-key")
+        os.environ.setdefault("ELEVENLABS_API_KEY", "mock-key")
+        os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "6000")
+
+        results = run_suite(args, work_dir)
+        print(f"\nmock chat API served {chat_server.requests} requests, "
+              f"mock TTS API {tts_server.requests}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "args": vars(args),
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} case(s) slower than baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
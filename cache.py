@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(os.getcwd(), "artifact_cache"))
+DEFAULT_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
+
+def file_hash(path, block_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text):
+    """
+    Returns the SHA-256 hex digest of a string.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(stage, content_hash, **params):
+    """
+    Builds a cache key from a pipeline stage, the hash of its input and
+    the parameters that influence its output (model names, beam size, ...).
+    """
+    payload = json.dumps(
+        {"stage": stage, "content": content_hash, "params": params},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Persistent, content-addressed cache for pipeline artifacts
+    (transcripts, translations, summaries).
+
+    Entries are stored as files under `root`. When the total size goes over
+    `max_bytes`, the least recently used entries are removed. File mtimes
+    record recency, so the LRU order survives restarts.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> size, oldest first
+        self._total_bytes = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _load_index(self):
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(dirpath, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _count(self, counter, stage):
+        counter[stage] = counter.get(stage, 0) + 1
+
+    def get_bytes(self, stage, key):
+        """
+        Returns the cached bytes for `key`, or None on a miss.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._count(self.misses, stage)
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path, None)
+            except OSError:
+                # Removed behind our back (another process evicted it).
+                self._total_bytes -= self._entries.pop(key)
+                self._count(self.misses, stage)
+                return None
+
+            self._entries.move_to_end(key)
+            self._count(self.hits, stage)
+            return data
+
+    def put_bytes(self, stage, key, data):
+        """
+        Stores `data` under `key` and evicts old entries if over budget.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def get(self, stage, key):
+        """
+        Returns the cached JSON value for `key`, or None on a miss.
+        """
+        data = self.get_bytes(stage, key)
+        if data is None:
+            return None
+        return json.loads(data.decode("utf-8"))
+
+    def put(self, stage, key, value):
+        """
+        Stores a JSON-serializable value under `key`.
+        """
+        self.put_bytes(stage, key, json.dumps(value).encode("utf-8"))
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            print(f"🧹 Evicted cached artifact {key[:12]} ({size} bytes)")
+
+    def clear(self):
+        """
+        Removes every entry (the hit/miss counters are kept).
+        """
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters per stage and the current cache size.
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
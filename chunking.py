@@ -0,0 +1,239 @@
+import os
+import re
+import threading
+import numpy as np
+
+
+# Sentence end: . ! ? (optionally followed by closing quotes/brackets), then whitespace.
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|(?<=[.!?][\"')\]])\s+")
+ENDS_SENTENCE = re.compile(r"[.!?][\"')\]]?\s*$")
+# Tokens held back from every budget for special tokens and tokenizer drift
+# between counting sentences alone and counting them joined.
+SAFETY_MARGIN = 0.05
+
+
+def split_sentences(text):
+    """
+    Splits text at sentence ends, collapsing whitespace. Text without
+    punctuation (raw ASR output often has none) comes back as one piece.
+    """
+    text = " ".join(text.split())
+    return [s for s in SENTENCE_END.split(text) if s]
+
+
+class EstimateCounter:
+    """
+    Token counts without a tokenizer: the larger of a per-word and a
+    per-character estimate, computed for the whole batch at once.
+    """
+
+    name = "estimate"
+
+    def __init__(self, tokens_per_word=1.3, chars_per_token=4.0):
+        self.tokens_per_word = tokens_per_word
+        self.chars_per_token = chars_per_token
+
+    def count_batch(self, texts):
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+        array = np.asarray(texts, dtype=str)
+        words = np.char.count(array, " ") + (np.char.str_len(array) > 0)
+        chars = np.char.str_len(array)
+        estimate = np.maximum(words * self.tokens_per_word, chars / self.chars_per_token)
+        return np.ceil(estimate).astype(np.int64)
+
+
+class TokenizerCounter:
+    """
+    Exact token counts from a Hugging Face tokenizer. A fast tokenizer
+    encodes the whole batch in one call.
+    """
+
+    def __init__(self, tokenizer, name=None):
+        self.tokenizer = tokenizer
+        self.name = name or getattr(tokenizer, "name_or_path", "tokenizer")
+
+    def count_batch(self, texts):
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+        ids = self.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(ids))
+
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def counter_for(tokenizer_name=None):
+    """
+    Returns a (cached) counter for a Hugging Face tokenizer repo, or the
+    estimate when no name is given or the tokenizer can't be loaded.
+    """
+    if not tokenizer_name:
+        return EstimateCounter()
+    with _counters_lock:
+        if tokenizer_name not in _counters:
+            try:
+                from transformers import AutoTokenizer
+
+                tokenizer = AutoTokenizer.from_pretrained(
+                    tokenizer_name, token=os.getenv("HUGGINGFACE_ACCESS_TOKEN")
+                )
+                _counters[tokenizer_name] = TokenizerCounter(tokenizer, tokenizer_name)
+            except Exception as e:
+                print(f"⚠️ Could not load tokenizer '{tokenizer_name}', estimating tokens: {e}")
+                _counters[tokenizer_name] = EstimateCounter()
+        return _counters[tokenizer_name]
+
+
+def _prefix_that_fits(words, counter, budget):
+    """
+    Number of leading `words` whose text fits `budget` tokens (at least
+    one). Every word is at least one token, so no more than `budget`
+    words are ever counted.
+    """
+    lo, hi = 1, min(len(words), budget)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if counter.count_batch([" ".join(words[:mid])])[0] <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _split_long(sentence, counter, budget):
+    """
+    Cuts a sentence that alone exceeds `budget` into the longest word runs
+    that fit, so only the last piece is short. The cuts depend only on the
+    words from the previous cut on, which keeps ChunkAccumulator's pieces
+    the same as chunk_text's however the text arrives.
+    """
+    words = sentence.split()
+    pieces = []
+    while words:
+        if len(words) <= budget and counter.count_batch([" ".join(words)])[0] <= budget:
+            pieces.append(" ".join(words))
+            break
+        n = _prefix_that_fits(words, counter, budget)
+        pieces.append(" ".join(words[:n]))
+        words = words[n:]
+    return pieces
+
+
+def pack(counts, budget, overlap=0):
+    """
+    Greedy packing of consecutive items with token `counts` into chunks of
+    at most `budget` tokens. Each chunk after the first repeats up to
+    `overlap` tokens of whole items from the end of the previous one.
+    Returns [(start, end)] index ranges.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    ranges = []
+    start = 0
+    n = len(counts)
+    while start < n:
+        # Furthest end whose running total stays inside the budget (at least one item).
+        end = int(np.searchsorted(cumulative, cumulative[start] + budget, side="right")) - 1
+        end = min(max(end, start + 1), n)
+        ranges.append((start, end))
+        if end >= n:
+            break
+        next_start = end
+        if overlap > 0:
+            # Step back over whole items while the repeated tail fits the overlap
+            # and leaves room for progress.
+            first = int(np.searchsorted(cumulative, cumulative[end] - overlap, side="left"))
+            next_start = max(first, start + 1)
+        start = next_start
+    return ranges
+
+
+def _fit(sentences, counter, budget):
+    """
+    Counts sentences, splitting any that exceed `budget` into word runs
+    that fit. Returns (sentences, counts).
+    """
+    counts = counter.count_batch(sentences)
+    if (counts > budget).any():
+        pieces = []
+        for sentence, count in zip(sentences, counts):
+            pieces.extend(_split_long(sentence, counter, budget) if count > budget else [sentence])
+        sentences = pieces
+        counts = counter.count_batch(sentences)
+    return sentences, counts
+
+
+def chunk_text(text, counter, budget, overlap=0):
+    """
+    Splits text into chunks of at most `budget` tokens (as counted by
+    `counter`), cutting only at sentence boundaries unless a single
+    sentence is over budget.
+    """
+    budget = max(1, int(budget * (1 - SAFETY_MARGIN)))
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    sentences, counts = _fit(sentences, counter, budget)
+    return [" ".join(sentences[start:end]) for start, end in pack(counts, budget, overlap)]
+
+
+class ChunkAccumulator:
+    """
+    Online version of chunk_text for text that arrives piece by piece
+    (transcript segments). `feed` returns the chunks completed so far and
+    `finish` the rest. For punctuated text they match chunk_text on the
+    whole text, because greedy packing never revisits a finished chunk,
+    and for unpunctuated text because over-long runs are cut the same way.
+    """
+
+    def __init__(self, counter, budget, overlap=0):
+        self.counter = counter
+        self.budget = max(1, int(budget * (1 - SAFETY_MARGIN)))
+        self.overlap = overlap
+        self._sentences = []
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._pending = ""      # text after the last sentence end
+
+    def _add(self, sentences):
+        if sentences:
+            sentences, counts = _fit(sentences, self.counter, self.budget)
+            self._sentences.extend(sentences)
+            self._counts = np.concatenate([self._counts, counts])
+
+    def _take(self, final):
+        ranges = pack(self._counts, self.budget, self.overlap) if self._sentences else []
+        if not final:
+            ranges = ranges[:-1]    # the last chunk may still grow
+        if not ranges:
+            return []
+        chunks = [" ".join(self._sentences[start:end]) for start, end in ranges]
+        keep = len(self._sentences) if final else ranges[-1][1]
+        if not final and self.overlap > 0:
+            # The next chunk starts where pack() would continue.
+            keep = pack(self._counts, self.budget, self.overlap)[len(ranges)][0]
+        self._sentences = self._sentences[keep:]
+        self._counts = self._counts[keep:]
+        return chunks
+
+    def feed(self, text):
+        sentences = split_sentences(f"{self._pending} {text}")
+        self._pending = ""
+        if sentences and not ENDS_SENTENCE.search(text):
+            self._pending = sentences.pop()
+            # Unpunctuated speech never ends a sentence; cut it once it alone fills a chunk.
+            count = int(self.counter.count_batch([self._pending])[0])
+            if count > self.budget:
+                pieces = _split_long(self._pending, self.counter, self.budget)
+                self._pending = pieces.pop()
+                sentences.extend(pieces)
+        self._add(sentences)
+        return self._take(final=False)
+
+    def finish(self):
+        if self._pending:
+            self._add([self._pending])
+            self._pending = ""
+        return self._take(final=True)
@@ -0,0 +1,134 @@
+import re
+import numpy as np
+
+from chunking import split_sentences
+
+
+# Unpunctuated ASR text comes back from split_sentences as one piece; it is
+# cut into windows of this many words so there is something to rank.
+MAX_SENTENCE_WORDS = 60
+# Sentences whose TF-IDF cosine similarity to an earlier one is above this
+# are treated as repetitions and dropped.
+DUPLICATE_THRESHOLD = 0.8
+# Terms used by more than this share of sentences carry no signal.
+MAX_DOCUMENT_FREQUENCY = 0.5
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 100
+
+WORD = re.compile(r"[^\W\d_]{2,}")
+
+
+def sentence_units(text):
+    """
+    Sentences of `text`, with over-long ones cut into word windows.
+    """
+    units = []
+    for sentence in split_sentences(text):
+        words = sentence.split()
+        if len(words) <= MAX_SENTENCE_WORDS:
+            units.append(sentence)
+        else:
+            units.extend(" ".join(words[i:i + MAX_SENTENCE_WORDS])
+                         for i in range(0, len(words), MAX_SENTENCE_WORDS))
+    return units
+
+
+def tfidf_matrix(sentences):
+    """
+    Row-normalized TF-IDF vectors, one row per sentence (float32,
+    sentences x terms). Terms in most sentences are left out.
+    """
+    tokens = [WORD.findall(sentence.lower()) for sentence in sentences]
+    lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=len(tokens))
+    if lengths.sum() == 0:
+        return np.zeros((len(sentences), 0), dtype=np.float32)
+
+    vocabulary, term_ids = np.unique(np.concatenate([np.asarray(t, dtype=str) for t in tokens if t]),
+                                     return_inverse=True)
+    rows = np.repeat(np.arange(len(sentences)), lengths)
+    counts = np.zeros((len(sentences), len(vocabulary)), dtype=np.float32)
+    np.add.at(counts, (rows, term_ids), 1.0)
+
+    document_frequency = (counts > 0).sum(axis=0)
+    keep = document_frequency <= max(1, MAX_DOCUMENT_FREQUENCY * len(sentences))
+    counts, document_frequency = counts[:, keep], document_frequency[keep]
+
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    weights = counts * idf.astype(np.float32)
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.maximum(norms, 1e-12)
+
+
+def near_duplicates(similarity, threshold=DUPLICATE_THRESHOLD):
+    """
+    Boolean mask of sentences that repeat an earlier kept sentence.
+    """
+    n = len(similarity)
+    duplicate = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if duplicate[i]:
+            continue
+        later = similarity[i, i + 1:] > threshold
+        duplicate[i + 1:] |= later
+    return duplicate
+
+
+def textrank(similarity, damping=TEXTRANK_DAMPING, iterations=TEXTRANK_ITERATIONS, tol=1e-6):
+    """
+    PageRank over the sentence similarity graph: a sentence scores high
+    when it is similar to many other high-scoring sentences.
+    """
+    n = len(similarity)
+    if n == 0:
+        return np.zeros(0)
+    weights = similarity.astype(np.float64)
+    np.fill_diagonal(weights, 0.0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # Sentences with no similar neighbour spread their score evenly.
+    transition = np.where(out_degree > 0, weights / np.maximum(out_degree, 1e-12), 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < tol:
+            return updated
+        scores = updated
+    return scores
+
+
+def extract(text, counter, budget, duplicate_threshold=DUPLICATE_THRESHOLD):
+    """
+    Shrinks `text` to at most `budget` tokens (as counted by `counter`):
+    drops near-duplicate sentences, then keeps the highest TextRank
+    sentences that fit, in their original order. Text already within the
+    budget is returned unchanged. Returns (text, stats).
+    """
+    sentences = sentence_units(text)
+    counts = counter.count_batch(sentences)
+    stats = {"sentences": len(sentences), "tokens_in": int(counts.sum()), "duplicates": 0}
+    if stats["tokens_in"] <= budget:
+        stats.update(kept=len(sentences), tokens_out=stats["tokens_in"])
+        return text, stats
+
+    vectors = tfidf_matrix(sentences)
+    similarity = vectors @ vectors.T
+    duplicate = near_duplicates(similarity, duplicate_threshold)
+    similarity[duplicate, :] = 0.0
+    similarity[:, duplicate] = 0.0
+
+    scores = textrank(similarity)
+    scores[duplicate] = -1.0
+
+    # Best first; a sentence that doesn't fit is skipped so shorter ones can still fill the budget.
+    order = np.argsort(-scores, kind="stable")
+    order = order[~duplicate[order]]
+    fits = np.zeros(len(sentences), dtype=bool)
+    used = 0
+    for i in order:
+        if used + counts[i] <= budget:
+            fits[i] = True
+            used += int(counts[i])
+
+    kept = np.flatnonzero(fits)
+    stats.update(duplicates=int(duplicate.sum()), kept=len(kept), tokens_out=used)
+    return " ".join(sentences[i] for i in kept), stats
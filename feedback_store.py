@@ -0,0 +1,117 @@
+import os
+import csv
+import sys
+import time
+import sqlite3
+import threading
+
+
+FEEDBACK_DB = os.getenv("FEEDBACK_DB", os.path.join(os.getcwd(), "feedback.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    comment TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    imported REAL NOT NULL
+);
+"""
+
+
+class FeedbackStore:
+    """
+    User comments in SQLite. WAL mode lets readers and the single writer
+    run side by side, so concurrent sessions never lose a submission, and
+    every insert is an append instead of a rewrite of the whole file.
+    Reads are by page, newest first, so their cost doesn't grow with the
+    number of comments.
+    """
+
+    def __init__(self, path=FEEDBACK_DB):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """
+        One connection per thread; sqlite3 connections can't be shared.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def import_csv(self, csv_path):
+        """
+        Imports a Name,Comment CSV once; later calls for the same file are
+        no-ops. Returns the number of rows imported.
+        """
+        source = os.path.abspath(csv_path)
+        if not os.path.exists(source):
+            return 0
+
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+            return 0
+
+        with open(source, newline="", encoding="utf-8") as f:
+            rows = [(row.get("Name") or "", row.get("Comment") or "")
+                    for row in csv.DictReader(f)]
+
+        now = time.time()
+        with conn:
+            # Re-check inside the write transaction in case another process got here first.
+            if conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+                return 0
+            conn.executemany(
+                "INSERT INTO comments (name, comment, created) VALUES (?, ?, ?)",
+                [(name, comment, now) for name, comment in rows]
+            )
+            conn.execute("INSERT INTO imports (source, rows, imported) VALUES (?, ?, ?)",
+                         (source, len(rows), now))
+
+        print(f"📥 Imported {len(rows)} comments from {csv_path}")
+        sys.stdout.flush()
+        return len(rows)
+
+    def add(self, name, comment):
+        """
+        Appends one comment and returns its id.
+        """
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO comments (name, comment, created) VALUES (?, ?, ?)",
+                (name, comment, time.time())
+            )
+        return cursor.lastrowid
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+    def version(self):
+        """
+        Id of the newest comment; changes whenever a comment is added, so
+        it can key a read cache.
+        """
+        return self._connect().execute("SELECT MAX(id) FROM comments").fetchone()[0] or 0
+
+    def page(self, number=1, per_page=10):
+        """
+        Returns page `number` (1-based) of (name, comment, created) rows,
+        newest first.
+        """
+        offset = max(0, number - 1) * per_page
+        return self._connect().execute(
+            "SELECT name, comment, created FROM comments ORDER BY id DESC LIMIT ? OFFSET ?",
+            (per_page, offset)
+        ).fetchall()
@@ -0,0 +1,289 @@
+import os
+import sys
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from scene_index import SceneIndex
+from tracing import tracer
+from summary import (
+    TranscriptStream,
+    WHISPER_PARALLEL,
+    transcribe_audio,
+    summarize_text,
+    summarize_incremental,
+    text_to_audio,
+    select_key_scenes,
+    create_video_summary_ffmpeg
+)
+
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+# Finished jobs are kept this long so a refreshed page can still show them.
+JOB_RETENTION_SECONDS = 3600
+
+
+class JobFailed(Exception):
+    pass
+
+
+class Job:
+    """
+    One summary request: its stage, progress, messages and results.
+    Written by a worker thread and read by the UI; the UI reads
+    `snapshot()`, never the live fields.
+    """
+
+    def __init__(self, kind, url, options):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind                # "text" | "audio" | "video"
+        self.url = url
+        self.options = options
+        self.status = "queued"          # queued | running | done | failed
+        self.percent = 0
+        self.stage = "Waiting for a free worker..."
+        self.messages = []
+        self.result = {}
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        # Transcript and summaries while they are being generated.
+        self.transcript_parts = []
+        self.chunk_summaries = {}       # chunk index -> text so far
+        self.partial_summary = ""
+        self.first_content = {}         # "transcript" / "summary" -> seconds after submission
+        self.audio_parts = []           # MP3 of each summary sentence synthesized so far
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def update(self, percent, stage):
+        with self._lock:
+            self.percent = percent
+            self.stage = stage
+
+    def log(self, level, message):
+        """
+        Progress callback handed to the backend functions.
+        """
+        with self._lock:
+            self.messages.append((level, message))
+
+    def set_partial(self, kind, index, text):
+        """
+        Partial-result callback handed to the summarizers: a transcript
+        segment, or the text so far of a chunk summary or the final one.
+        The first of each kind is recorded as time to first content.
+        """
+        first = "transcript" if kind == "transcript" else "summary"
+        with self._lock:
+            if kind == "transcript":
+                self.transcript_parts.append(text.strip())
+            elif kind == "chunk":
+                self.chunk_summaries[index] = text
+            else:
+                self.partial_summary = text
+            if first in self.first_content:
+                return
+            seconds = time.time() - self.created
+            self.first_content[first] = seconds
+        tracer.observe(f"first_{first}", seconds, trace_id=self.id, kind=self.kind)
+
+    def add_audio(self, index, audio):
+        """
+        Sentence callback handed to text_to_audio; sentences arrive in order.
+        """
+        with self._lock:
+            self.audio_parts.append(audio)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "url": self.url,
+                "status": self.status,
+                "percent": self.percent,
+                "stage": self.stage,
+                "messages": list(self.messages),
+                "result": dict(self.result),
+                "error": self.error,
+                "partial_transcript": " ".join(self.transcript_parts),
+                "chunk_summaries": [self.chunk_summaries[i] for i in sorted(self.chunk_summaries)],
+                "partial_summary": self.partial_summary,
+                "first_content": dict(self.first_content),
+                "audio_parts": list(self.audio_parts),
+            }
+
+
+def run_pipeline(job, media_store, work_dir):
+    """
+    Runs the download / transcribe / summarize / TTS / scene stages for
+    one job, reporting through job.update and job.log. Outputs go to
+    `work_dir`, the job's own artifact namespace.
+    """
+    if job.kind in ("text", "audio"):
+        audio = None
+        if not job.options.get("stream"):
+            job.update(10, "Downloading and decoding video audio...")
+            audio, title = media_store.get_audio_buffer(job.url, owner=job)
+            job.log("info", f"Audio ready: {title}")
+
+        if audio is not None and WHISPER_PARALLEL:
+            # Parallel transcription returns the whole transcript at once.
+            job.update(25, "1/3 - Transcribing audio...")
+            transcript, language = transcribe_audio(audio.source, work_dir, audio=audio)
+            if not transcript:
+                raise JobFailed("Transcription failed. Check logs for details.")
+            job.result["transcript"] = transcript
+
+            job.update(60, "2/3 - Processing summary...")
+            summary = summarize_text(transcript, source_lang=language, progress=job.log,
+                                     on_partial=job.set_partial)
+        else:
+            # Chunks are summarized while the rest of the audio is still being transcribed.
+            if audio is None:
+                job.update(10, "Streaming, transcribing and summarizing audio...")
+                source = job.url
+            else:
+                job.update(25, "1/3 - Transcribing and summarizing audio...")
+                source = audio.source
+            try:
+                stream = TranscriptStream(source, stream=audio is None, audio=audio)
+                summary = summarize_incremental(stream, progress=job.log, on_partial=job.set_partial)
+            except Exception as e:
+                print(f"❌ Error during transcription: {e}")
+                sys.stdout.flush()
+                raise JobFailed("Transcription failed. Check logs for details.")
+            job.result["transcript"] = stream.transcript
+
+        if not summary:
+            raise JobFailed("Summarization failed.")
+        job.result["summary"] = summary
+
+        if job.kind == "audio":
+            job.update(80, "3/3 - Converting summary to audio...")
+            audio_out = os.path.join(work_dir, "summary.mp3")
+            if not text_to_audio(summary, audio_out, progress=job.log, on_sentence=job.add_audio):
+                raise JobFailed("Could not generate audio file. Check logs for details.")
+            job.result["audio_path"] = audio_out
+
+    elif job.kind == "video":
+        job.update(10, "Downloading full video...")
+        video_path, title = media_store.get_video(job.url, owner=job)
+        job.log("info", f"Full video ready: {title}")
+
+        job.update(40, "Detecting scenes...")
+        scene_index = SceneIndex.load_or_build(video_path)
+        scenes = scene_index.scenes(job.options.get("threshold", 0.4))
+        if not scenes:
+            raise JobFailed("⚠ No scenes detected. Try lowering the threshold.")
+
+        job.update(60, "Selecting best scenes...")
+        try:
+            # Reuses the decoded audio of an earlier text/audio summary of this source.
+            audio, _ = media_store.get_audio_buffer(job.url, owner=job)
+        except Exception as e:
+            job.log("warning", f"Audio not available for scene selection: {e}")
+            audio = None
+        key_scenes = select_key_scenes(scenes, max_scenes=5, index=scene_index, audio=audio)
+
+        job.update(80, "Creating summary video...")
+        output = os.path.join(work_dir, "video_summary.mp4")
+        job.result["video_path"] = create_video_summary_ffmpeg(video_path, key_scenes, output)
+
+    else:
+        raise JobFailed(f"Unknown summary type: {job.kind}")
+
+
+class JobManager:
+    """
+    Runs summary jobs on a bounded pool of worker threads. A request that
+    matches a job already queued or running returns that job's id.
+
+    Each job writes to its own "jobs/<job id>" namespace of the artifact
+    store. The namespace stays pinned until the job is pruned, and the
+    media it reads is pinned while it runs.
+    """
+
+    def __init__(self, media_store, store, workers=JOB_WORKERS, runner=run_pipeline):
+        self.media_store = media_store
+        self.store = store
+        self.workers = workers
+        self.runner = runner
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}             # job id -> Job
+        self._inflight = {}         # request key -> job id
+        self._lock = threading.Lock()
+
+    def _key(self, kind, url, options):
+        return (kind, url, tuple(sorted(options.items())))
+
+    def submit(self, kind, url, options=None):
+        """
+        Queues a job and returns its id (or the id of the identical
+        in-flight job it was merged into).
+        """
+        options = options or {}
+        key = self._key(kind, url, options)
+
+        with self._lock:
+            self._prune()
+            existing = self._inflight.get(key)
+            if existing is not None:
+                print(f"🔗 Coalesced request into in-flight job {existing}")
+                sys.stdout.flush()
+                return existing
+
+            job = Job(kind, url, options)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+
+        self._pool.submit(self._run, job, key)
+        return job.id
+
+    def _run(self, job, key):
+        job.status = "running"
+        namespace = f"jobs/{job.id}"
+        self.store.pin(namespace, job.id)
+        try:
+            with tracer.trace(job.id), tracer.span("job", kind=job.kind):
+                self.runner(job, self.media_store, self.store.namespace(namespace))
+            job.update(100, "Done!")
+            job.status = "done"
+        except JobFailed as e:
+            job.error = str(e)
+            job.status = "failed"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = f"Unexpected error: {e}"
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._inflight.pop(key, None)
+            self.store.release(job)
+            self.store.evict()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+            self.store.release(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self):
+        """
+        Returns (queued, running) job counts.
+        """
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return queued, running
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import tracer
+
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 30))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+# Status codes worth retrying: rate limiting, conflicts and server-side hiccups.
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread that talks to the API.
+    `acquire` blocks until a request may be sent; `pause` holds everyone
+    back, e.g. after the server answered 429 with a Retry-After.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1.0, min(requests_per_minute, MAX_CONCURRENCY))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the shared Groq client. One client means one HTTP connection
+    pool for all concurrent requests. Set GROQ_BASE_URL to point it at a
+    local mock server. The SDK's own retries are disabled because `chat`
+    does its own retrying.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from groq import Groq
+
+            _client = Groq(
+                api_key=os.getenv("GROQ_API_KEY"),
+                base_url=os.getenv("GROQ_BASE_URL") or None,
+                max_retries=0
+            )
+        return _client
+
+
+def _retry_delay(error, attempt):
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+    return min(delay, BACKOFF_MAX_SECONDS) * random.uniform(0.5, 1.0)
+
+
+def _with_retries(request, limiter):
+    """
+    Calls request() under the rate limiter, retrying with exponential
+    backoff on 429, 5xx and connection errors.
+    """
+    import groq
+
+    limiter = limiter or _limiter
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return request()
+
+        except (groq.APIConnectionError, groq.APIStatusError) as e:
+            status = getattr(e, "status_code", None)
+            if isinstance(e, groq.APIStatusError) and status not in TRANSIENT_STATUS:
+                raise
+            if attempt == MAX_RETRIES:
+                raise
+
+            delay = _retry_delay(e, attempt)
+            if status == 429:
+                limiter.pause(delay)
+            print(f"⏳ LLM request failed ({status or type(e).__name__}), "
+                  f"retrying in {delay:.1f}s [{attempt + 1}/{MAX_RETRIES}]")
+            sys.stdout.flush()
+            time.sleep(delay)
+
+
+def chat(prompt, model, limiter=None):
+    """
+    Sends one chat-completions request and returns the stripped reply.
+    Retries with exponential backoff on 429, 5xx and connection errors.
+    """
+    def request():
+        response = get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content.strip()
+
+    return _with_retries(request, limiter)
+
+
+def chat_stream(prompt, model, on_text, limiter=None):
+    """
+    Like `chat`, but streams the reply: on_text(text_so_far) is called as
+    tokens arrive. A retried request starts over, and its first call to
+    on_text replaces the earlier partial text. Returns the stripped reply.
+    """
+    def request():
+        parts = []
+        stream = get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_text("".join(parts))
+        return "".join(parts).strip()
+
+    return _with_retries(request, limiter)
+
+
+def map_ordered(fn, items, max_workers=MAX_CONCURRENCY):
+    """
+    Runs `fn` over `items` on a bounded thread pool and returns the results
+    in input order. The first exception raised by any call propagates.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(tracer.bind(fn), items))
@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import glob
+import subprocess
+import threading
+from concurrent.futures import Future
+
+from tracing import tracer
+from artifact_store import ArtifactStore
+from audio_buffer import AudioBuffer
+
+
+AUDIO_FORMAT = "bestaudio[ext=m4a]/bestaudio/best"
+VIDEO_FORMAT = "bestvideo+bestaudio/best"
+# Only "<kind><ext>" with these extensions counts as downloaded media;
+# other files in the namespace (decoded PCM, scene indexes, partial or
+# per-format downloads) are ignored.
+MEDIA_EXTENSIONS = {
+    "audio": (".m4a", ".webm", ".mp3", ".opus", ".ogg", ".wav", ".aac", ".flac"),
+    "video": (".mp4", ".mkv", ".webm", ".mov"),
+}
+
+
+def _safe_id(text):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", text)
+
+
+class MediaStore:
+    """
+    Downloads each source once, keyed on its yt-dlp id, and reuses the
+    files on disk across requests and sessions.
+
+    - If the full video is already on disk, the audio track is extracted
+      from it with ffmpeg instead of being downloaded again.
+    - The decoded PCM (see audio_buffer.AudioBuffer) is stored next to the
+      files, so transcription and analysis decode each source only once.
+    - Concurrent requests for the same media wait for the download that
+      is already running instead of starting their own.
+    - bytes_downloaded / bytes_saved record how much traffic was avoided.
+
+    Files live in the "media/<media id>" namespaces of an ArtifactStore,
+    which evicts them under its byte budget. get_audio / get_video pin the
+    namespace while acquiring it, and for `owner` until the store's
+    release(owner) is called.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or ArtifactStore()
+        self.root = self.store.path("media")
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self._ids = {}              # url -> (media_id, title)
+        self._infos = {}            # url -> yt-dlp info from identify, until a download uses it
+        self._inflight = {}         # (media_id, kind) -> Future
+        self._lock = threading.Lock()
+
+    def identify(self, url):
+        """
+        Returns (media_id, title) for a URL without downloading it. The
+        resolved info is kept for the download that usually follows, so
+        the site is only queried once.
+        """
+        with self._lock:
+            if url in self._ids:
+                return self._ids[url]
+
+        import yt_dlp
+
+        with yt_dlp.YoutubeDL({"quiet": True, "noplaylist": True}) as ydl:
+            info = ydl.extract_info(url, download=False)
+
+        media_id = _safe_id(f"{info.get('extractor_key', 'media')}-{info['id']}")
+        with self._lock:
+            self._ids[url] = (media_id, info.get("title"))
+            self._infos[url] = info
+        return self._ids[url]
+
+    def _media_dir(self, media_id):
+        return self.store.namespace(f"media/{media_id}")
+
+    def _existing(self, media_id, kind):
+        for ext in MEDIA_EXTENSIONS[kind]:
+            path = os.path.join(self.root, media_id, f"{kind}{ext}")
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                return path
+        return None
+
+    def _add(self, counter, amount):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _once(self, key, fn):
+        """
+        Runs fn() for `key` unless a call for the same key is in flight,
+        in which case it waits for that call's result.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            print(f"⏳ Waiting for in-flight download of {key[0]} ({key[1]})")
+            sys.stdout.flush()
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def _acquire(self, media_id, kind, fn, owner):
+        """
+        Runs fn() through _once with the media namespace pinned, then lets
+        the store evict other entries if the new file pushed it over budget.
+        """
+        namespace = f"media/{media_id}"
+        if owner is not None:
+            self.store.pin(namespace, owner)
+        with self.store.in_use(namespace):
+            path = self._once((media_id, kind), fn)
+            self.store.evict()
+        return path
+
+    def _download(self, url, media_id, kind):
+        """
+        Downloads under a temporary name and renames the finished file to
+        "<kind><ext>", so an interrupted download or merge never looks
+        like cached media.
+        """
+        target_dir = self._media_dir(media_id)
+        partial = f".{kind}-partial"
+        for leftover in glob.glob(os.path.join(target_dir, f"{partial}.*")):
+            os.remove(leftover)
+        ydl_opts = {
+            "format": VIDEO_FORMAT if kind == "video" else AUDIO_FORMAT,
+            "outtmpl": os.path.join(target_dir, f"{partial}.%(ext)s"),
+            "quiet": True,
+            "noplaylist": True,
+        }
+        if kind == "video":
+            ydl_opts["merge_output_format"] = "mp4"
+
+        import yt_dlp
+
+        with self._lock:
+            info = self._infos.pop(url, None)
+        with tracer.span("download", kind=kind, media_id=media_id) as span:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                if info is None:
+                    info = ydl.extract_info(url, download=True)
+                else:
+                    # Re-runs format selection with these options on the info identify resolved.
+                    info = ydl.process_ie_result(info, download=True)
+                downloads = info.get("requested_downloads") or []
+                downloaded = downloads[0]["filepath"] if downloads else ydl.prepare_filename(info)
+            filename = os.path.join(target_dir, kind + os.path.splitext(downloaded)[1])
+            os.replace(downloaded, filename)
+            span.set(bytes_in=os.path.getsize(filename), media_seconds=info.get("duration"))
+
+        self._add("bytes_downloaded", os.path.getsize(filename))
+        print(f"⬇️ Downloaded {kind} for {media_id}: {filename}")
+        sys.stdout.flush()
+        return filename
+
+    def _extract_audio(self, video_path, media_id):
+        """
+        Copies the audio track out of a downloaded video, re-encoding to
+        AAC only if the stream can't be copied into an m4a container.
+        """
+        audio_path = os.path.join(self._media_dir(media_id), "audio.m4a")
+        tmp_path = os.path.join(os.path.dirname(audio_path), ".audio-partial.m4a")
+        for codec in (["-c:a", "copy"], ["-c:a", "aac", "-b:a", "128k"]):
+            with tracer.span("extract_audio", codec=codec[1]) as span:
+                result = subprocess.run(
+                    ["ffmpeg", "-y", "-loglevel", "error", "-i", video_path, "-vn", *codec, tmp_path],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+                )
+                span.set(bytes_in=os.path.getsize(video_path))
+            if result.returncode == 0:
+                os.replace(tmp_path, audio_path)
+                return audio_path
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"ffmpeg could not extract audio: {result.stderr.strip()}")
+
+    def get_audio(self, url, owner=None):
+        """
+        Returns (audio_path, title), reusing or deriving it when possible.
+        """
+        media_id, title = self.identify(url)
+
+        def acquire():
+            existing = self._existing(media_id, "audio")
+            if existing:
+                self._add("bytes_saved", os.path.getsize(existing))
+                print(f"♻️ Reusing audio for {media_id}")
+                sys.stdout.flush()
+                return existing
+
+            video = self._existing(media_id, "video")
+            if video:
+                audio = self._extract_audio(video, media_id)
+                self._add("bytes_saved", os.path.getsize(audio))
+                print(f"♻️ Derived audio for {media_id} from the downloaded video")
+                sys.stdout.flush()
+                return audio
+
+            return self._download(url, media_id, "audio")
+
+        return self._acquire(media_id, "audio", acquire, owner), title
+
+    def get_video(self, url, owner=None):
+        """
+        Returns (video_path, title), downloading the full video only once.
+        """
+        media_id, title = self.identify(url)
+
+        def acquire():
+            existing = self._existing(media_id, "video")
+            if existing:
+                self._add("bytes_saved", os.path.getsize(existing))
+                print(f"♻️ Reusing video for {media_id}")
+                sys.stdout.flush()
+                return existing
+            return self._download(url, media_id, "video")
+
+        return self._acquire(media_id, "video", acquire, owner), title
+
+    def get_audio_buffer(self, url, owner=None):
+        """
+        Returns (AudioBuffer, title): the source's audio decoded once to
+        16 kHz float32 in its media namespace. Decodes from the downloaded
+        audio, or from the video if only that is on disk.
+        """
+        media_id, title = self.identify(url)
+
+        def acquire():
+            source = self._existing(media_id, "audio") or self._existing(media_id, "video")
+            if source is None:
+                source = self._once((media_id, "audio"), lambda: self._download(url, media_id, "audio"))
+            return AudioBuffer.prepare(source, self._media_dir(media_id))
+
+        return self._acquire(media_id, "pcm", acquire, owner), title
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_saved": self.bytes_saved,
+                "in_flight": len(self._inflight),
+                "disk_bytes": sum(
+                    os.path.getsize(path)
+                    for path in glob.glob(os.path.join(self.root, "*", "*"))
+                    if os.path.isfile(path)
+                ),
+            }
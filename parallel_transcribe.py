@@ -0,0 +1,177 @@
+import os
+import sys
+import subprocess
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from streaming import SAMPLE_RATE
+from audio_buffer import AudioBuffer, frame_energy
+
+
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+WHISPER_THREADS_PER_WORKER = int(os.getenv("WHISPER_THREADS_PER_WORKER", 2))
+TARGET_SEGMENT_SECONDS = 120
+SILENCE_SEARCH_SECONDS = 10
+# Audio after each cut that a segment also sees, so its last word isn't clipped.
+EDGE_PAD_SECONDS = 1.0
+
+_pools = {}
+_pools_lock = threading.Lock()
+_worker_model = None
+
+
+def decode_audio(path):
+    """
+    Decodes any ffmpeg-readable file to 16 kHz mono float32 samples.
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", path,
+         "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    )
+    return np.frombuffer(result.stdout, dtype=np.float32)
+
+
+def split_at_silence(audio, target_seconds=TARGET_SEGMENT_SECONDS,
+                     search_seconds=SILENCE_SEARCH_SECONDS, frame_ms=30):
+    """
+    Returns sample offsets [0, cut_1, ..., len(audio)] where each cut is the
+    quietest frame within `search_seconds` of every `target_seconds` mark.
+    """
+    frame = SAMPLE_RATE * frame_ms // 1000
+    n_frames = audio.size // frame
+    if n_frames == 0:
+        return [0, audio.size]
+
+    energy = frame_energy(audio, frame)
+    target = int(target_seconds * 1000 / frame_ms)
+    search = int(search_seconds * 1000 / frame_ms)
+
+    bounds = [0]
+    pos = 0
+    while pos + target + search < n_frames:
+        lo, hi = pos + target - search, pos + target + search
+        pos = lo + int(np.argmin(energy[lo:hi]))
+        bounds.append(pos * frame)
+    bounds.append(audio.size)
+    return bounds
+
+
+def _init_worker(model_size, cpu_threads, download_root):
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                 cpu_threads=cpu_threads, download_root=download_root)
+
+
+def _transcribe_segment(task):
+    """
+    Runs in a worker process. Returns (language, words) where words are
+    (global_start, global_end, text) tuples.
+    """
+    offset, (path, first, length), beam_size, language = task
+    # Each worker maps its own slice of the PCM file; only the location crosses the process boundary.
+    if length:
+        samples = np.memmap(path, dtype=np.float32, mode="r", offset=first * 4, shape=(length,))
+    else:
+        samples = np.zeros(0, dtype=np.float32)     # mmap can't map zero bytes
+    segments, info = _worker_model.transcribe(
+        samples, beam_size=beam_size, word_timestamps=True, language=language
+    )
+    words = []
+    for segment in segments:
+        for word in segment.words or []:
+            words.append((offset + word.start, offset + word.end, word.word))
+    return info.language, words
+
+
+def get_worker_pool(model_size, workers=WHISPER_WORKERS,
+                    threads_per_worker=WHISPER_THREADS_PER_WORKER, download_root=None):
+    """
+    Returns a persistent process pool whose workers each hold a warm
+    Whisper model. Uses 'spawn' so workers don't inherit the parent's
+    threads and native runtime state.
+    """
+    key = (model_size, workers, threads_per_worker, download_root)
+    with _pools_lock:
+        if key not in _pools:
+            print(f"🔄 Starting {workers} Whisper workers x {threads_per_worker} threads...")
+            sys.stdout.flush()
+            _pools[key] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_size, threads_per_worker, download_root)
+            )
+        return _pools[key]
+
+
+def merge_words(bounds, results):
+    """
+    Keeps only the words each segment owns (start inside its own bounds),
+    then drops a repeated word straddling a cut.
+    """
+    merged = []
+    for i, (_, words) in enumerate(results):
+        lo, hi = bounds[i] / SAMPLE_RATE, bounds[i + 1] / SAMPLE_RATE
+        for start, end, text in words:
+            if not lo <= start < hi:
+                continue
+            if merged:
+                prev_start, prev_end, prev_text = merged[-1]
+                if start < prev_end - 0.05 or (
+                    text.strip().lower() == prev_text.strip().lower() and start - prev_start < 0.3
+                ):
+                    continue
+            merged.append((start, end, text))
+    return merged
+
+
+def transcribe_parallel(audio_path, model_size="tiny", beam_size=5, language=None,
+                        workers=WHISPER_WORKERS, threads_per_worker=WHISPER_THREADS_PER_WORKER,
+                        download_root=None, audio=None):
+    """
+    Splits the audio at silences and transcribes the segments in parallel.
+    `audio` is the file's AudioBuffer; without one the file is decoded to
+    a temporary buffer first. Workers memory-map their segment of the
+    buffer's file, so no samples are pickled to them.
+    Returns (words, language, duration) with words as (start, end, text)
+    in global time.
+    """
+    if audio is None:
+        temp_dir = tempfile.mkdtemp(prefix="whisper_pcm_")
+        try:
+            return transcribe_parallel(audio_path, model_size, beam_size, language, workers,
+                                       threads_per_worker, download_root,
+                                       audio=AudioBuffer.prepare(audio_path, temp_dir))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    samples = audio.samples
+    bounds = split_at_silence(samples)
+    pad = int(EDGE_PAD_SECONDS * SAMPLE_RATE)
+
+    tasks = []
+    for i in range(len(bounds) - 1):
+        end = min(bounds[i + 1] + pad, samples.size)
+        tasks.append((bounds[i] / SAMPLE_RATE, (audio.path, bounds[i], end - bounds[i]),
+                      beam_size, language))
+    print(f"🧵 Transcribing {len(tasks)} segments across {workers} workers...")
+    sys.stdout.flush()
+
+    pool = get_worker_pool(model_size, workers, threads_per_worker, download_root)
+    results = list(pool.map(_transcribe_segment, tasks))
+
+    if language is None:
+        # Segments detect independently; go with the language most of the audio agrees on.
+        votes = Counter()
+        for (detected, _), task in zip(results, tasks):
+            votes[detected] += task[1][2]
+        language = votes.most_common(1)[0][0] if votes else None
+
+    return merge_words(bounds, results), language, samples.size / SAMPLE_RATE
@@ -0,0 +1,228 @@
+import os
+import sys
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from tracing import tracer
+
+
+INDEX_WIDTH = 160
+# Frames are scored at this rate, like detect_scenes_fast's proxy mode
+# (0 scores every frame). SCENE_KEYFRAMES_ONLY=1 decodes I-frames only.
+INDEX_FPS = float(os.getenv("SCENE_INDEX_FPS", 5))
+INDEX_KEYFRAMES_ONLY = os.getenv("SCENE_KEYFRAMES_ONLY", "0") == "1"
+# Sharded builds: one ffmpeg per time shard, each re-reading a little
+# before its start so the first frame in the shard still gets a scene score.
+SCENE_SHARDS = int(os.getenv("SCENE_SHARDS", os.cpu_count() or 1))
+SCENE_SHARD_OVERLAP = 1.0
+SCENE_MIN_SHARD_SECONDS = 60
+# Column layout of the index array.
+TIME, SCORE, LUMA, MOTION = range(4)
+
+_METADATA_KEYS = {
+    "lavfi.scene_score": SCORE,
+    "lavfi.signalstats.YAVG": LUMA,
+    "lavfi.signalstats.YDIF": MOTION,
+}
+
+
+def index_path(video_path, width=INDEX_WIDTH, fps=INDEX_FPS, keyframes_only=INDEX_KEYFRAMES_ONLY,
+               directory=None):
+    # Not "<video>.scenes.npy": MediaStore treats "video.*" names as the video.
+    # The decode options are in the name, so changing them builds a new index.
+    video_dir, name = os.path.split(video_path)
+    directory = directory or video_dir
+    if keyframes_only:
+        options = f"w{width}-key"
+    else:
+        options = f"w{width}-fps{fps:g}" if fps else f"w{width}-all"
+    return os.path.join(directory, f"scenes-{name}-{options}.npy")
+
+
+def probe_duration(video_path):
+    """
+    Returns the container duration in seconds, or None if ffprobe can't tell.
+    """
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", video_path],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        return float(result.stdout.strip())
+    except (OSError, ValueError):
+        return None
+
+
+def build_index(video_path, width=INDEX_WIDTH, fps=INDEX_FPS, keyframes_only=INDEX_KEYFRAMES_ONLY,
+                start=None, duration=None, threads=None):
+    """
+    Decodes the video (or `duration` seconds of it from `start`) at low
+    resolution and records, for every frame: pts_time, ffmpeg scene
+    score, mean luminance (YAVG) and motion energy (YDIF, mean absolute
+    luma change from the previous frame).
+    Metadata is parsed from ffmpeg's stdout line by line.
+    Returns a float32 array of shape (frames, 4).
+    """
+    video_filter = f"scale={width}:-2,signalstats,select='gte(scene\\,0)',metadata=mode=print:file=-"
+    if fps and not keyframes_only:      # resampling I-frames would only repeat them
+        video_filter = f"fps={fps}," + video_filter
+
+    cmd = ["ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error"]
+    if keyframes_only:
+        cmd += ["-skip_frame", "nokey"]
+    if threads:
+        cmd += ["-threads", str(threads), "-filter_threads", str(threads)]
+    if start is not None:
+        # Input seeking; -copyts keeps pts_time on the source's timeline.
+        cmd += ["-ss", f"{start:.3f}", "-copyts"]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    cmd += [
+        "-i", video_path, "-an",
+        "-vf", video_filter,
+        "-f", "null", "-"
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+    rows = []
+    row = None
+    try:
+        for line in proc.stdout:
+            if line.startswith("frame:"):
+                pts_time = line.rsplit("pts_time:", 1)[-1].strip()
+                row = [float(pts_time), 0.0, 0.0, 0.0]
+                rows.append(row)
+            elif row is not None and "=" in line:
+                key, value = line.strip().split("=", 1)
+                column = _METADATA_KEYS.get(key)
+                if column is not None:
+                    row[column] = float(value)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 4)
+
+
+def build_index_sharded(video_path, shards=None, overlap=SCENE_SHARD_OVERLAP,
+                        min_shard_seconds=SCENE_MIN_SHARD_SECONDS, threads_per_shard=None,
+                        **decode_options):
+    """
+    build_index split into time shards, each decoded by its own ffmpeg
+    process. A shard keeps only the frames in its own time range, so the
+    concatenated rows match a single pass. Falls back to one pass for
+    short videos or when the duration is unknown.
+    """
+    duration = probe_duration(video_path)
+    shards = shards or SCENE_SHARDS
+    if duration:
+        shards = min(shards, int(duration // min_shard_seconds))
+    if not duration or shards <= 1:
+        return build_index(video_path, **decode_options)
+
+    shard_len = duration / shards
+
+    def scan(i):
+        own_start = i * shard_len
+        own_end = (i + 1) * shard_len if i < shards - 1 else float("inf")
+        seek = max(0.0, own_start - overlap) if i > 0 else None
+        length = own_end - (seek or 0.0) if i < shards - 1 else None
+        rows = build_index(video_path, start=seek, duration=length,
+                           threads=threads_per_shard, **decode_options)
+        times = rows[:, TIME]
+        return rows[(times >= own_start) & (times < own_end)]
+
+    with ThreadPoolExecutor(max_workers=shards) as pool:
+        return np.concatenate(list(pool.map(tracer.bind(scan), range(shards))))
+
+
+class SceneIndex:
+    """
+    Per-frame scene scores and features for one video. Once built, any
+    threshold can be applied with vectorized operations, no re-decode.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.times = data[:, TIME]
+        self.scores = data[:, SCORE]
+        self.luma = data[:, LUMA]
+        self.motion = data[:, MOTION]
+        # Prefix sums make per-scene means O(1) per scene.
+        self._luma_sum = np.concatenate([[0.0], np.cumsum(self.luma, dtype=np.float64)])
+        self._motion_sum = np.concatenate([[0.0], np.cumsum(self.motion, dtype=np.float64)])
+
+    @classmethod
+    def load_or_build(cls, video_path, shards=None, directory=None, **decode_options):
+        """
+        Loads the index stored next to the video (or in `directory`),
+        building it on first use in parallel time shards.
+        """
+        path = index_path(video_path, directory=directory, **decode_options)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(video_path):
+            return cls(np.load(path))
+
+        print(f"📇 Building scene index for {video_path}...", flush=True)
+        with tracer.span("scene_index", **decode_options) as span:
+            data = build_index_sharded(video_path, shards=shards, **decode_options)
+            span.set(bytes_in=os.path.getsize(video_path),
+                     media_seconds=float(data[-1, TIME]) if len(data) else None,
+                     frames=len(data))
+        tmp_path = f"{path[:-len('.npy')]}.tmp.npy"
+        np.save(tmp_path, data)
+        os.replace(tmp_path, path)
+        print(f"📇 Indexed {len(data)} frames.")
+        sys.stdout.flush()
+        return cls(data)
+
+    def cut_times(self, threshold):
+        return self.times[self.scores > threshold]
+
+    def scenes(self, threshold=0.4):
+        """
+        Same (start, end) list detect_scenes_fast would return for this
+        threshold, or [] when no frame passes it.
+        """
+        cuts = self.cut_times(threshold)
+        starts = np.concatenate([[0.0], cuts[:-1]])
+        return list(zip(starts.tolist(), cuts.tolist()))
+
+    def scene_features(self, scenes):
+        """
+        Returns arrays (duration, mean_luma, mean_motion, cut_strength) for
+        a list of (start, end) scenes.
+        """
+        bounds = np.asarray(scenes, dtype=np.float64).reshape(-1, 2)
+        lo = np.searchsorted(self.times, bounds[:, 0], side="left")
+        hi = np.maximum(np.searchsorted(self.times, bounds[:, 1], side="left"), lo + 1)
+        hi = np.minimum(hi, len(self.times))
+        frames = np.maximum(hi - lo, 1)
+
+        duration = bounds[:, 1] - bounds[:, 0]
+        mean_luma = (self._luma_sum[hi] - self._luma_sum[lo]) / frames
+        mean_motion = (self._motion_sum[hi] - self._motion_sum[lo]) / frames
+        cut_strength = self.scores[np.minimum(lo, len(self.scores) - 1)]
+        return duration, mean_luma, mean_motion, cut_strength
+
+    def score_scenes(self, scenes, weights=(0.5, 0.3, 0.2)):
+        """
+        Importance of each scene: a weighted mix of duration, on-screen
+        motion and how sharply it starts, each normalized to [0, 1].
+        Near-black scenes (fades, blank slides) are pushed to the bottom.
+        """
+        if not scenes or not len(self.times):
+            return np.zeros(len(scenes))
+
+        duration, mean_luma, mean_motion, cut_strength = self.scene_features(scenes)
+
+        def normalize(values):
+            span = values.max() - values.min()
+            return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+        w_duration, w_motion, w_cut = weights
+        score = (w_duration * normalize(duration)
+                 + w_motion * normalize(mean_motion)
+                 + w_cut * normalize(cut_strength))
+        return np.where(mean_luma < 20, score - 1.0, score)
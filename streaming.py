@@ -0,0 +1,162 @@
+import sys
+import shutil
+import subprocess
+import threading
+import numpy as np
+
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2            # s16le
+READ_BLOCK_SECONDS = 1
+
+
+def is_url(source):
+    return isinstance(source, str) and source.startswith(("http://", "https://"))
+
+
+class PCMStream:
+    """
+    Decodes a source to 16 kHz mono PCM with ffmpeg while it is still
+    arriving, so transcription can start before the download finishes.
+
+    `source` may be:
+      - a URL: yt-dlp writes the audio to stdout, piped into ffmpeg
+      - a local file path
+      - a readable binary file object (e.g. sys.stdin.buffer)
+
+    Leaving the block after reading to the end raises RuntimeError if
+    yt-dlp or ffmpeg failed, so a cut-off download isn't mistaken for
+    the whole recording.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.bytes_in = 0
+        self._procs = []
+        self._feeder = None
+        self._eof = False
+
+    def __enter__(self):
+        ffmpeg_cmd = [
+            "ffmpeg", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-f", "s16le", "pipe:1"
+        ]
+
+        if is_url(self.source):
+            ydl_cmd = [
+                sys.executable, "-m", "yt_dlp",
+                # webm/opus is streamable; m4a may put its index at the end.
+                "-f", "bestaudio[ext=webm]/bestaudio/best",
+                "--no-playlist", "--quiet", "-o", "-", self.source
+            ]
+            ydl = subprocess.Popen(ydl_cmd, stdout=subprocess.PIPE)
+            ffmpeg = subprocess.Popen(ffmpeg_cmd, stdin=ydl.stdout,
+                                      stdout=subprocess.PIPE)
+            # Let ffmpeg own the read end so yt-dlp gets SIGPIPE if ffmpeg dies.
+            ydl.stdout.close()
+            self._procs = [("yt-dlp", ydl), ("ffmpeg", ffmpeg)]
+
+        elif isinstance(self.source, str):
+            ffmpeg_cmd[ffmpeg_cmd.index("pipe:0")] = self.source
+            ffmpeg = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.PIPE)
+            self._procs = [("ffmpeg", ffmpeg)]
+
+        else:
+            ffmpeg = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE)
+            self._feeder = threading.Thread(
+                target=self._feed, args=(self.source, ffmpeg.stdin), daemon=True
+            )
+            self._feeder.start()
+            self._procs = [("ffmpeg", ffmpeg)]
+
+        self._ffmpeg = ffmpeg
+        return self
+
+    def _feed(self, fileobj, pipe):
+        try:
+            shutil.copyfileobj(fileobj, pipe, 64 * 1024)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def __exit__(self, exc_type, exc, tb):
+        # Only a stream read to the end is expected to exit on its own;
+        # otherwise the reader gave up and the processes are stopped.
+        finished = exc_type is None and self._eof
+        for _, proc in self._procs:
+            if not finished and proc.poll() is None:
+                proc.kill()
+            proc.wait()
+        if self._ffmpeg.stdout:
+            self._ffmpeg.stdout.close()
+        if finished:
+            failed = [f"{name} exited with code {proc.returncode}"
+                      for name, proc in self._procs if proc.returncode != 0]
+            if failed:
+                raise RuntimeError(f"Audio stream ended early: {', '.join(failed)}.")
+        return False
+
+    def _read_block(self):
+        block = self._ffmpeg.stdout.read(SAMPLE_RATE * BYTES_PER_SAMPLE * READ_BLOCK_SECONDS)
+        self.bytes_in += len(block)
+        if not block:
+            self._eof = True
+        if len(block) % BYTES_PER_SAMPLE:
+            block = block[:-(len(block) % BYTES_PER_SAMPLE)]
+        return np.frombuffer(block, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def windows(self, window_seconds=30, search_seconds=2):
+        """
+        Yields (offset_seconds, float32 samples) windows of roughly
+        `window_seconds`. Each window is cut at the quietest 20 ms frame
+        within its last `search_seconds`, so words are rarely split; the
+        remainder is carried into the next window.
+        """
+        window_len = int(window_seconds * SAMPLE_RATE)
+        search_len = int(search_seconds * SAMPLE_RATE)
+        frame = SAMPLE_RATE // 50
+
+        buffered = []
+        buffered_len = 0
+        offset = 0
+
+        while True:
+            block = self._read_block()
+            if block.size:
+                buffered.append(block)
+                buffered_len += block.size
+
+            if buffered_len >= window_len or (not block.size and buffered_len):
+                audio = np.concatenate(buffered)
+
+                cut = audio.size
+                if block.size and audio.size > search_len:
+                    tail = audio[window_len - search_len:window_len]
+                    n_frames = tail.size // frame
+                    energy = np.square(tail[:n_frames * frame]).reshape(n_frames, frame).mean(axis=1)
+                    cut = window_len - search_len + int(np.argmin(energy)) * frame + frame // 2
+
+                yield offset / SAMPLE_RATE, audio[:cut]
+
+                rest = audio[cut:]
+                buffered = [rest] if rest.size else []
+                buffered_len = rest.size
+                offset += cut
+
+            if not block.size:
+                break
+
+
+if __name__ == "__main__":
+    # Smoke test: `cat some_audio.mp3 | python streaming.py`
+    with PCMStream(sys.stdin.buffer) as stream:
+        for start, window in stream.windows():
+            print(f"🔊 window @ {start:8.2f}s  {window.size / SAMPLE_RATE:6.2f}s")
+    print(f"✅ Decoded {stream.bytes_in} PCM bytes")
@@ -1,63 +1,330 @@
 import streamlit as st
 import os
-from faster_whisper import WhisperModel
-import torch 
-from transformers import pipeline 
-import sys 
-from elevenlabs import save
-from groq import Groq
-from elevenlabs.client import ElevenLabs
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
-from PIL import Image
-import numpy as np
+import sys
 import subprocess
+import tempfile
+import threading
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from cache import ArtifactCache, file_hash, text_hash, make_key
+from streaming import PCMStream, is_url
+from llm import chat, chat_stream, map_ordered, MAX_CONCURRENCY
+from translation import TranslationRegistry, candidate_models, backend_id
+from tracing import tracer
+from tts import create_backend, synthesize_to_file
+from whisper_engine import WhisperEngine, WhisperConfig, choose_config, thread_settings
+from chunking import chunk_text, counter_for, ChunkAccumulator
+from audio_buffer import SILENCE_DB
+from extractive import extract
+from scene_index import probe_duration
+from parallel_transcribe import (
+    transcribe_parallel, get_worker_pool, WHISPER_WORKERS, WHISPER_THREADS_PER_WORKER
+)
 
 
 load_dotenv()
 HF_TOKEN = os.getenv("HUGGINGFACE_ACCESS_TOKEN")
 
+# ---- Stage parameters (part of every cache key) ----
+# Streaming and parallel transcription; transcribe_audio picks its own (see choose_config).
+WHISPER_MODEL_SIZE = "tiny"
+WHISPER_BEAM_SIZE = 5
+SUMMARY_MODEL = "llama-3.3-70b-versatile"
+COMBINE_MODEL = "llama-3.1-8b-instant"
+# Bump whenever the summarization prompts change so cached summaries are rebuilt.
+PROMPT_VERSION = 2
+STREAM_WINDOW_SECONDS = 30
+# Split long audio at silences and transcribe it on a pool of Whisper workers.
+WHISPER_PARALLEL = os.getenv("WHISPER_PARALLEL", "0") == "1"
+# Reduce tree: at most REDUCE_FAN_IN partial summaries (and roughly
+# REDUCE_TOKEN_BUDGET tokens) go into a single combine request.
+REDUCE_FAN_IN = int(os.getenv("REDUCE_FAN_IN", 8))
+REDUCE_TOKEN_BUDGET = int(os.getenv("REDUCE_TOKEN_BUDGET", 4000))
+# Tokens of transcript per map request, and how many to repeat from the previous chunk.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 6000))
+SUMMARY_CHUNK_OVERLAP = int(os.getenv("SUMMARY_CHUNK_OVERLAP", 0))
+# Shrink transcripts longer than this many tokens with local extractive
+# summarization before the LLM sees them (0 = send everything).
+SUMMARY_EXTRACT_TOKENS = int(os.getenv("SUMMARY_EXTRACT_TOKENS", 0))
+# Hugging Face tokenizer matching SUMMARY_MODEL for exact counts; estimated when unset.
+LLM_TOKENIZER = os.getenv("LLM_TOKENIZER")
+# Load Whisper on a background thread at server start (see warm_up_models).
+WHISPER_WARMUP = os.getenv("WHISPER_WARMUP", "1") == "1"
+# Audio length the warm-up prepares for: it loads the model choose_config
+# picks for this duration, the one a typical file transcription will use.
+WHISPER_WARMUP_SECONDS = float(os.getenv("WHISPER_WARMUP_SECONDS", 600))
+
+
+def report(progress, level, message):
+    """
+    Passes a user-facing status message ("info", "warning" or "error") to
+    the caller's progress callback. Backend code never touches the UI, so
+    it can run on worker threads.
+    """
+    if progress is not None:
+        progress(level, message)
+
 
 # ---- Load model only once ----
 @st.cache_resource
+def get_whisper_engine():
+    """
+    Process-wide Whisper engine; each model is loaded once and shared.
+    """
+    return WhisperEngine()
+
+
 def load_whisper_model():
-    download_path = os.path.join(os.getcwd(), "models_cache")
-    os.makedirs(download_path, exist_ok=True)
+    """
+    The model used for streaming transcription.
+    """
+    cpu_threads, num_workers = thread_settings()
+    return get_whisper_engine().model(WhisperConfig(WHISPER_MODEL_SIZE, WHISPER_BEAM_SIZE,
+                                                    cpu_threads=cpu_threads, num_workers=num_workers))
+
+
+def _warm_up():
+    try:
+        if WHISPER_PARALLEL:
+            pool = get_worker_pool(WHISPER_MODEL_SIZE, WHISPER_WORKERS, WHISPER_THREADS_PER_WORKER,
+                                   os.path.join(os.getcwd(), "models_cache"))
+            # Each worker loads its model in its initializer; a no-op task starts them.
+            list(pool.map(abs, range(WHISPER_WORKERS)))
+        else:
+            config = choose_config(WHISPER_WARMUP_SECONDS)
+            get_whisper_engine().warm_up(config)
+            print(f"🔥 Warmed up {config}")
+        print("🔥 Whisper warm-up finished.")
+    except Exception as e:
+        print(f"⚠️ Whisper warm-up failed: {e}")
+    sys.stdout.flush()
+
+
+def warm_up_models():
+    """
+    Loads the Whisper model on a daemon thread so the server can render
+    the page meanwhile. A request that arrives first simply waits for the
+    same load. Returns the thread, or None if WHISPER_WARMUP is off.
+    """
+    if not WHISPER_WARMUP:
+        return None
+    thread = threading.Thread(target=_warm_up, name="whisper-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def get_artifact_cache():
+    """
+    Process-wide cache of transcripts, translations and summaries.
+    """
+    return ArtifactCache()
+
+
+@st.cache_resource
+def get_tts_backend():
+    """
+    Process-wide text-to-speech backend (TTS_BACKEND, default ElevenLabs).
+    """
+    return create_backend()
+
+
+@st.cache_resource
+def get_translation_registry():
+    """
+    Process-wide registry of resident translation models.
+    """
+    return TranslationRegistry()
+
+
+class TranscriptStream:
+    """
+    Transcript segments of a file (or, with stream=True, a URL or pipe
+    decoded while it downloads), yielded as (start, end, text) while
+    Whisper decodes them so summarization can start before transcription
+    ends. `language` is set before the first segment; `transcript` and
+    `segments` once iteration finishes. The result is cached like the
+    other transcripts, and a cached one is replayed.
+
+    Pass the source's AudioBuffer as `audio` to have Whisper read the
+    decoded samples instead of decoding the file again.
+    """
+
+    def __init__(self, source, stream=False, window_seconds=STREAM_WINDOW_SECONDS, audio=None):
+        self.source = source
+        self.stream = stream
+        self.audio = audio
+        self.window_seconds = window_seconds
+        self.language = None
+        self.segments = []
+        self.transcript = None
+        self.config = None
+        self.cache_key = None
+
+        if stream:
+            if is_url(source):
+                # Content is unknown until downloaded, so key URLs by the URL itself.
+                content_id = text_hash(f"url:{source}")
+            elif isinstance(source, str):
+                content_id = file_hash(source)
+            else:
+                content_id = None
+            if content_id is not None:
+                self.cache_key = make_key("transcript", content_id,
+                                          model=WHISPER_MODEL_SIZE, beam_size=WHISPER_BEAM_SIZE)
+        else:
+            duration = audio.duration if audio is not None else probe_duration(source)
+            self.config = choose_config(duration)
+            self.cache_key = make_key("transcript", file_hash(source), **self.config.cache_params())
+
+        self.cached = get_artifact_cache().get("transcript", self.cache_key) if self.cache_key else None
+
+    def _decode_file(self):
+        print(f"🎤 Transcribing file: {self.source} ({self.config})")
+        sys.stdout.flush()
+        with tracer.span("transcribe", parallel=False, **self.config.cache_params()) as span:
+            if self.audio is not None:
+                segments, info = get_whisper_engine().iter_segments(self.audio.samples, self.config)
+                span.set(bytes_in=self.audio.samples.nbytes)
+            else:
+                segments, info = get_whisper_engine().iter_segments(self.source, self.config)
+                span.set(bytes_in=os.path.getsize(self.source))
+            self.language = info.language
+            yield from segments
+            span.set(media_seconds=info.duration)
+
+    def _decode_stream(self):
+        model = load_whisper_model()
+        print("🎤 Streaming transcription started...")
+        sys.stdout.flush()
+        with tracer.span("transcribe_stream", model=WHISPER_MODEL_SIZE) as span:
+            with PCMStream(self.source) as stream:
+                for offset, window in stream.windows(self.window_seconds):
+                    window_segments, info = model.transcribe(
+                        window,
+                        beam_size=WHISPER_BEAM_SIZE,
+                        word_timestamps=False,
+                        language=self.language
+                    )
+                    # Detect once on the first window, then pin it for the rest.
+                    if self.language is None:
+                        self.language = info.language
+                    for segment in window_segments:
+                        yield round(offset + segment.start, 2), round(offset + segment.end, 2), segment.text
+
+                    print(f"🎤 Transcribed window at {offset:.0f}s")
+                    sys.stdout.flush()
+            span.set(bytes_in=stream.bytes_in, media_seconds=stream.bytes_in / (2 * 16000))
+
+    def __iter__(self):
+        if self.cached is not None:
+            print(f"⚡ Transcript cache hit for: {self.source}")
+            sys.stdout.flush()
+            self.language = self.cached["language"]
+            self.segments = self.cached["segments"]
+            self.transcript = self.cached["transcript"]
+            yield from self.segments
+            return
 
-    print("🔄 Loading Whisper Model... (only once)")
-    model = WhisperModel("tiny", device="cpu", compute_type="int8",
-                         download_root=download_path)
-    return model
+        for start, end, text in self._decode_stream() if self.stream else self._decode_file():
+            self.segments.append([start, end, text])
+            yield start, end, text
 
+        if self.language is None:
+            raise RuntimeError("No audio was received.")
 
-def transcribe_audio(audio_path, temp_dir):
+        result_text = " ".join(text.strip() for _, _, text in self.segments)
+        print(f"🏁 Transcription complete. Detected language: {self.language}")
+        sys.stdout.flush()
+
+        self.transcript = f"\nTHE TRANSCRIPT IS:\n\n{result_text.strip()}"
+        # Only reached when decoding finished cleanly: PCMStream raises when
+        # yt-dlp or ffmpeg failed, so a cut-off download is never cached.
+        if self.cache_key is not None:
+            get_artifact_cache().put("transcript", self.cache_key, {
+                "transcript": self.transcript, "language": self.language, "segments": self.segments
+            })
+
+
+def transcribe_audio(audio_path, temp_dir, parallel=None, with_segments=False, audio=None):
     """
     Transcribes a given audio file using faster-whisper.
+    Model, beam width and batch size are chosen from the audio duration,
+    core count and WHISPER_LATENCY_TARGET (see whisper_engine.choose_config).
+    With parallel=True (default: WHISPER_PARALLEL) the audio is split at
+    silences and transcribed across a pool of Whisper worker processes.
+    with_segments=True also returns the (start, end, text) segments.
+    `audio`, the file's AudioBuffer, saves decoding it again.
     """
+    parallel = WHISPER_PARALLEL if parallel is None else parallel
+    failed = (None, None, None) if with_segments else (None, None)
     try:
-        model = load_whisper_model()  
+        if not parallel:
+            stream = TranscriptStream(audio_path, audio=audio)
+            for _ in stream:
+                pass
+            result = (stream.transcript, stream.language)
+            return result + (stream.segments,) if with_segments else result
+
+        cache = get_artifact_cache()
+        params = {"model": WHISPER_MODEL_SIZE, "beam_size": WHISPER_BEAM_SIZE, "parallel": True}
+        cache_key = make_key("transcript", file_hash(audio_path), **params)
+        cached = cache.get("transcript", cache_key)
+        if cached is not None:
+            print(f"⚡ Transcript cache hit for: {audio_path}")
+            sys.stdout.flush()
+            result = (cached["transcript"], cached["language"])
+            return result + (cached["segments"],) if with_segments else result
 
-        print(f"🎤 Transcribing file: {audio_path}")
+        print(f"🎤 Transcribing file: {audio_path} (parallel)")
         sys.stdout.flush()
 
-        segments, info = model.transcribe(
-            audio_path,
-            beam_size=5,
-            word_timestamps=False
-        )
-
-        result_text = " ".join([segment.text for segment in segments])
+        with tracer.span("transcribe", parallel=parallel, **params) as span:
+            segments, language, duration = transcribe_parallel(
+                audio_path,
+                model_size=WHISPER_MODEL_SIZE,
+                beam_size=WHISPER_BEAM_SIZE,
+                workers=WHISPER_WORKERS,
+                threads_per_worker=WHISPER_THREADS_PER_WORKER,
+                download_root=os.path.join(os.getcwd(), "models_cache"),
+                audio=audio
+            )
+            # Word-level segments; the words carry their own spacing.
+            result_text = "".join(text for _, _, text in segments)
+            span.set(bytes_in=os.path.getsize(audio_path), media_seconds=duration)
 
-        print(f"🏁 Transcription complete. Detected language: {info.language}")
+        print(f"🏁 Transcription complete. Detected language: {language}")
         sys.stdout.flush()
 
         transcript = f"\nTHE TRANSCRIPT IS:\n\n{result_text.strip()}"
-        return transcript, info.language
+        segments = [list(segment) for segment in segments]
+        cache.put("transcript", cache_key,
+                  {"transcript": transcript, "language": language, "segments": segments})
+        return (transcript, language, segments) if with_segments else (transcript, language)
 
     except Exception as e:
         print(f"❌ Error during transcription: {e}")
         sys.stdout.flush()
+        return failed
+
+
+def transcribe_stream(source, window_seconds=STREAM_WINDOW_SECONDS):
+    """
+    Transcribes a URL, local file or binary pipe while it is still being
+    downloaded/decoded. Audio is decoded to 16 kHz PCM by ffmpeg and fed
+    to Whisper window by window, so decoding overlaps the network transfer.
+    Returns the same (transcript, language) pair as transcribe_audio.
+    """
+    try:
+        stream = TranscriptStream(source, stream=True, window_seconds=window_seconds)
+        for _ in stream:
+            pass
+        return stream.transcript, stream.language
+
+    except Exception as e:
+        print(f"❌ Error during streaming transcription: {e}")
+        sys.stdout.flush()
         return None, None
 
 
@@ -65,95 +332,229 @@ def transcribe_audio(audio_path, temp_dir):
 
 # --- THIS IS THE UPDATED FUNCTION ---
 
-def translate_text(text, source_lang):
+def translate_text(text, source_lang, progress=None):
     """
-    Translates text from a source language to English using m2m100_418M
+    Translates text from a source language to English with a resident,
+    language-pair specific model, batching all chunks.
     FORCING CPU to avoid VRAM conflicts with Whisper.
     """
     
     clean_text = text.replace("THE TRANSCRIPT IS:", "").strip()
+
+    cache = get_artifact_cache()
+    cache_key = make_key(
+        "translation", text_hash(clean_text),
+        models=candidate_models(source_lang, "en"), source_lang=source_lang, target_lang="en",
+        chunking="tokens", backend=backend_id()
+    )
+    cached = cache.get("translation", cache_key)
+    if cached is not None:
+        print("⚡ translate_text: Translation cache hit.")
+        sys.stdout.flush()
+        return cached
     
     print(f"✅ translate_text: Starting translation from '{source_lang}' to 'en'...")
-    st.info(f"1b/3 - Translating text from '{source_lang}' to 'en'...")
-    
-
-    device = "cpu"
-    print(f"✅ translate_text: Forcing device '{device}' to ensure stability.")
-    st.warning("Translation is running on CPU to prevent crashes. This step may be slow...")
-
+    report(progress, "info", f"1b/3 - Translating text from '{source_lang}' to 'en'...")
     sys.stdout.flush()
-    
-    translator_pipeline = None
-    model_name = "Helsinki-NLP/opus-mt-hi-en"
 
     try:
-        print(f"✅ translate_text: Attempting to load model '{model_name}' onto device '{device}'...")
-        sys.stdout.flush()
-        
-        translator_pipeline = pipeline(
-            "translation",
-            model=model_name,
-            device=device  
-        )
-        
-        print(f"✅ translate_text: Model loaded successfully onto '{device}'.")
+        resident_model = get_translation_registry().get(source_lang, "en")
+        print(f"✅ translate_text: Using model '{resident_model.name}' ({resident_model.backend}).")
         sys.stdout.flush()
+        if resident_model.backend == "torch":
+            report(progress, "warning", "Translation is running on CPU to prevent crashes. This step may be slow...")
 
     except Exception as e:
         print(f"⚠️ translate_text: CRITICAL ERROR loading model: {e}")
         sys.stdout.flush()
-        st.error(f"Failed to load translation model: {e}")
+        report(progress, "error", f"Failed to load translation model: {e}")
         return None
     
 
     # IF MODEL LOADED, PROCEED 
     try:
-        max_chunk_size = 400 
-        words = clean_text.split()
-        chunks = [" ".join(words[i:i+max_chunk_size]) for i in range(0, len(words), max_chunk_size)]
+        # Chunks are packed to the model's input limit, counted with its own tokenizer.
+        chunks = chunk_text(clean_text, resident_model.counter, resident_model.max_input_tokens)
         
-        translated_chunks = []
-        print(f"✅ translate_text: Starting translation of {len(chunks)} chunks...")
+        print(f"✅ translate_text: Starting batched translation of {len(chunks)} chunks...")
         sys.stdout.flush()
-        
-        for i, chunk in enumerate(chunks, 1):
-            print(f"Translating chunk {i}/{len(chunks)}...")
-            sys.stdout.flush()
-            
-            result = translator_pipeline(chunk, src_lang=source_lang, tgt_lang="en")
-            
-            translated_chunks.append(result[0]['translation_text'])
+
+        with tracer.span("translate", model=resident_model.name, backend=resident_model.backend,
+                         chunks=len(chunks)) as span:
+            translated_chunks = resident_model.translate(chunks, source_lang, "en")
+            span.set(bytes_in=len(clean_text.encode("utf-8")),
+                     bytes_out=sum(len(chunk.encode("utf-8")) for chunk in translated_chunks))
         
         translated_text = " ".join(translated_chunks)
         print("✅ Translation complete.")
         sys.stdout.flush()
+        cache.put("translation", cache_key, translated_text)
         return translated_text
 
     except Exception as e:
         print(f"⚠️ translate_text: Error *during* translation: {e}")
         sys.stdout.flush()
-        st.error(f"Error during translation process: {e}")
+        report(progress, "error", f"Error during translation process: {e}")
         return None
-    finally:
-        # --- Cleanup ---
-        if translator_pipeline:
-            print("✅ translate_text: Cleaning up translation model...")
-            sys.stdout.flush()
-            del translator_pipeline
-            print("✅ translate_text: Cleanup complete.")
-            sys.stdout.flush()
 
     
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+def build_chunk_prompt(chunk):
+    return f"""
+        You are a professional summarizer. Your job is to summarize the given transcript.
+        Rules:
+        - Create a clean bullet point summary.
+        - Remove filler words & repetitions.
+        - Maintain the original meaning
+        - Final summary must be in English.
+        - 200 to 250 words max.
 
+        Text to summarize:
+        {chunk}
 
-def summarize_text(text, source_lang="en"):
+        Now produce the summary:
+        """
+
+
+def build_merge_prompt(partials):
+    return f"""
+        Merge these partial summaries of consecutive parts of one transcript.
+        - Remove duplicates & repetition
+        - Keep clean bullet points in the original order
+        - 200 to 250 words max.
+
+        Partial summaries:
+        {partials}
+
+        Merged Summary:
+        """
+
+
+def build_final_prompt(partials):
+    return f"""
+        Combine these partial summaries into a cohesive summary.
+        - Remove duplicates & repetition
+        - Produce clean formatted bullet points
+        - Limit final answer to 8-10 lines and remove bullets
+
+        Partial summaries:
+        {partials}
+
+        Final Combined Summary:
+        """
+
+
+def estimate_tokens(text):
+    """
+    Token count of `text` for the summary models (exact if LLM_TOKENIZER is set).
+    """
+    return int(counter_for(LLM_TOKENIZER).count_batch([text])[0])
+
+
+def group_for_reduce(summaries, fan_in=REDUCE_FAN_IN, token_budget=REDUCE_TOKEN_BUDGET):
+    """
+    Splits consecutive summaries into groups of at most `fan_in` items
+    and roughly `token_budget` tokens each.
+    """
+    groups = []
+    current, used = [], 0
+    for summary, tokens in zip(summaries, counter_for(LLM_TOKENIZER).count_batch(summaries)):
+        if current and (len(current) >= fan_in or used + tokens > token_budget):
+            groups.append(current)
+            current, used = [], 0
+        current.append(summary)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def reduce_summaries(summaries, fan_in=REDUCE_FAN_IN, token_budget=REDUCE_TOKEN_BUDGET, on_text=None):
+    """
+    Combines partial summaries with a multi-level reduce tree. Each level
+    merges groups that fit the token budget, and the merges within a level
+    run in parallel. The number of levels grows with log(len(summaries)).
+    With on_text, the final merge is streamed to it as it is generated.
+    """
+    fan_in = max(2, fan_in)
+    level = 1
+
+    while True:
+        groups = group_for_reduce(summaries, fan_in, token_budget)
+        if len(groups) == 1:
+            prompt = build_final_prompt(" ".join(groups[0]))
+            if on_text is not None:
+                return chat_stream(prompt, COMBINE_MODEL, on_text)
+            return chat(prompt, COMBINE_MODEL)
+
+        if len(groups) == len(summaries):
+            # Every partial is over half the budget; pair them up anyway.
+            print("⚠️ reduce_summaries: Partials exceed token budget, forcing fan-in.")
+            groups = [summaries[i:i + fan_in] for i in range(0, len(summaries), fan_in)]
+
+        print(f"🌲 reduce_summaries: Level {level}: {len(summaries)} -> {len(groups)} summaries")
+        sys.stdout.flush()
+
+        summaries = map_ordered(
+            lambda group: chat(build_merge_prompt(" ".join(group)), COMBINE_MODEL),
+            groups
+        )
+        level += 1
+
+
+def summary_cache_key(text, source_lang, extract_tokens=SUMMARY_EXTRACT_TOKENS):
+    return make_key(
+        "summary", text_hash(text),
+        source_lang=source_lang, translation_models=candidate_models(source_lang, "en"),
+        translation_backend=backend_id(),
+        summary_model=SUMMARY_MODEL, combine_model=COMBINE_MODEL,
+        prompt_version=PROMPT_VERSION,
+        reduce_fan_in=REDUCE_FAN_IN, reduce_token_budget=REDUCE_TOKEN_BUDGET,
+        chunk_tokens=SUMMARY_CHUNK_TOKENS, chunk_overlap=SUMMARY_CHUNK_OVERLAP,
+        tokenizer=LLM_TOKENIZER, extract_tokens=extract_tokens
+    )
+
+
+def _no_partial(kind, index, text):
+    pass
+
+
+def _final_text(on_partial):
+    if on_partial is None:
+        return None
+    return lambda text: on_partial("summary", 0, text)
+
+
+def _summarize_chunk(chunk, idx, on_partial=None):
+    """
+    Summarizes one chunk; the reply is streamed to on_partial if given.
+    """
+    prompt = build_chunk_prompt(chunk)
+    if on_partial is None:
+        return chat(prompt, SUMMARY_MODEL)
+    return chat_stream(prompt, SUMMARY_MODEL, lambda text: on_partial("chunk", idx, text))
+
+
+def summarize_text(text, source_lang="en", progress=None, on_partial=None,
+                   extract_tokens=SUMMARY_EXTRACT_TOKENS):
     """
     Summarizes text. If source_lang is not 'en', it translates first.
+    on_partial(kind, index, text), if given, receives the chunk summaries
+    ("chunk") and the final summary ("summary") as they are generated.
+    With extract_tokens > 0, longer text is first cut down to that many
+    tokens of its most central, non-repeated sentences (see extractive.py).
     """
 
     print(f"✅ summarize_text: Received text. Language is '{source_lang}'.")
     sys.stdout.flush()
+
+    cache = get_artifact_cache()
+    cache_key = summary_cache_key(text, source_lang, extract_tokens)
+    cached = cache.get("summary", cache_key)
+    if cached is not None:
+        print("⚡ summarize_text: Summary cache hit.")
+        sys.stdout.flush()
+        return cached
+
     text_to_summarize = ""
 
     # ------- LANGUAGE HANDLING -------
@@ -161,201 +562,385 @@ def summarize_text(text, source_lang="en"):
         try:
             print("✅ summarize_text: Language is not 'en'. Calling translate_text...")
             sys.stdout.flush()
-            translated_text = translate_text(text, source_lang)
+            translated_text = translate_text(text, source_lang, progress)
             if translated_text is None:
                 return None
             text_to_summarize = translated_text
-            st.info("2/3 - Summarizing translated text...")
+            report(progress, "info", "2/3 - Summarizing translated text...")
         except Exception as e:
-            st.error(f"Translation failed: {e}")
+            report(progress, "error", f"Translation failed: {e}")
             return None
     else:
         print("✅ summarize_text: Language is 'en'. Skipping translation...")
         sys.stdout.flush()
         text_to_summarize = text.replace("THE TRANSCRIPT IS:", "").strip()
-        st.info("2/3 - Summarizing English text...")
+        report(progress, "info", "2/3 - Summarizing English text...")
+
+    # ------- LOCAL EXTRACTIVE PRE-REDUCTION -------
+    if extract_tokens > 0:
+        with tracer.span("extract", token_budget=extract_tokens) as span:
+            bytes_in = len(text_to_summarize.encode("utf-8"))
+            text_to_summarize, stats = extract(text_to_summarize, counter_for(LLM_TOKENIZER),
+                                               extract_tokens)
+            span.set(bytes_in=bytes_in, bytes_out=len(text_to_summarize.encode("utf-8")), **stats)
+        if stats["kept"] < stats["sentences"]:
+            print(f"✂️ summarize_text: Kept {stats['kept']}/{stats['sentences']} sentences "
+                  f"({stats['tokens_in']} -> {stats['tokens_out']} tokens, "
+                  f"{stats['duplicates']} repeats dropped)")
+            sys.stdout.flush()
 
     print("✅ summarize_text: Calling Groq LLaMA model for summarization...")
     sys.stdout.flush()
 
     # ------- SPLIT INTO CHUNKS -------
-    max_chunk_size = 500
-    words = text_to_summarize.split()
-    chunks = [" ".join(words[i:i + max_chunk_size]) for i in range(0, len(words), max_chunk_size)]
-
-    summaries = []
-
+    chunks = chunk_text(text_to_summarize, counter_for(LLM_TOKENIZER),
+                        SUMMARY_CHUNK_TOKENS, overlap=SUMMARY_CHUNK_OVERLAP)
 
     # GROQ SUMMARIZATION REQUEST (Text Section)
+    # Chunks are sent concurrently; results come back in chunk order.
 
-    for idx, chunk in enumerate(chunks, 1):
-        summary_prompt = f"""
-        You are a professional summarizer. Your job is to summarize the given transcript.
-        Rules:
-        - Create a clean bullet point summary.
-        - Remove filler words & repetitions.
-        - Maintain the original meaning
-        - Final summary must be in English.
-        - 200 to 250 words max.
-
-        Text to summarize:
-        {chunk}
+    def summarize_chunk(indexed_chunk):
+        idx, chunk = indexed_chunk
+        summary = _summarize_chunk(chunk, idx, on_partial)
+        print(f"✅ summarize_text: Processed chunk {idx}/{len(chunks)}")
+        sys.stdout.flush()
+        return summary
 
-        Now produce the summary:
-        """
+    try:
+        with tracer.span("llm_map", model=SUMMARY_MODEL, chunks=len(chunks)) as span:
+            summaries = map_ordered(summarize_chunk, enumerate(chunks, 1))
+            span.set(bytes_in=len(text_to_summarize.encode("utf-8")),
+                     bytes_out=sum(len(summary.encode("utf-8")) for summary in summaries))
+    except Exception as e:
+        print(f"⚠️ Error during Groq summarization: {e}")
+        report(progress, "error", f"Error during Groq summarization: {e}")
+        return None
 
+    # ------- COMBINE MULTIPLE CHUNKS -------
+    if len(summaries) > 1:
         try:
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": summary_prompt}]
-            )
-
-            summaries.append(response.choices[0].message.content.strip())
-            print(f"✅ summarize_text: Processed chunk {idx}/{len(chunks)}")
-            sys.stdout.flush()
-
+            with tracer.span("llm_reduce", model=COMBINE_MODEL, partials=len(summaries)) as span:
+                final_summary = reduce_summaries(summaries, on_text=_final_text(on_partial))
+                span.set(bytes_out=len(final_summary.encode("utf-8")))
         except Exception as e:
-            print(f"⚠️ Error during Groq summarization: {e}")
-            st.error(f"Error during Groq summarization: {e}")
+            print(f"⚠️ Error while combining summaries: {e}")
+            report(progress, "error", f"Error while combining summaries: {e}")
             return None
+    else:
+        final_summary = summaries[0]
 
-    # ------- COMBINE MULTIPLE CHUNKS -------
-    if len(summaries) > 1:
-        combined = " ".join(summaries)
+    if on_partial is not None:
+        on_partial("summary", 0, final_summary)
+    cache.put("summary", cache_key, final_summary)
+    return final_summary
 
-        final_prompt = f"""
-        Combine these partial summaries into a cohesive summary.
-        - Remove duplicates & repetition
-        - Produce clean formatted bullet points
-        - Limit final answer to 8-10 lines and remove bullets
 
-        Partial summaries:
-        {combined}
+def summarize_incremental(stream, progress=None, on_partial=None):
+    """
+    Summarizes a TranscriptStream while it is still being transcribed.
+    English text is cut into chunks as segments arrive and each chunk is
+    summarized as soon as it is complete, so only the last chunk and the
+    reduce wait for the end of the transcript. on_partial(kind, index,
+    text) receives every transcript segment ("transcript"), the chunk
+    summaries ("chunk") and the final summary ("summary") as they grow.
+
+    Cached transcripts, other languages (which are translated as a whole
+    first) and SUMMARY_EXTRACT_TOKENS (which ranks the whole transcript)
+    go through summarize_text once the transcript is complete.
+    Transcription errors propagate; summarization errors are reported and
+    return None, like summarize_text.
+    """
+    notify = on_partial or _no_partial
+    segments = enumerate(stream)
 
-        Final Combined Summary:
-        """
+    if stream.cached is not None or SUMMARY_EXTRACT_TOKENS > 0:
+        for index, (_, _, text) in segments:
+            notify("transcript", index, text)
+        return summarize_text(stream.transcript, stream.language, progress, on_partial)
 
-        final_response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": final_prompt}]
-        )
+    accumulator = ChunkAccumulator(counter_for(LLM_TOKENIZER), SUMMARY_CHUNK_TOKENS,
+                                   overlap=SUMMARY_CHUNK_OVERLAP)
+    futures = []
+
+    def summarize_chunk(idx, chunk):
+        summary = _summarize_chunk(chunk, idx, on_partial)
+        print(f"✅ summarize_incremental: Processed chunk {idx}")
+        sys.stdout.flush()
+        return summary
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="llm") as pool:
+        def submit(chunks):
+            for chunk in chunks:
+                futures.append(pool.submit(tracer.bind(summarize_chunk), len(futures) + 1, chunk))
+
+        for index, (_, _, text) in segments:
+            notify("transcript", index, text)
+            if stream.language not in ("en", None):
+                break
+            submit(accumulator.feed(text.strip()))
+
+        if stream.language not in ("en", None):
+            # Other languages are translated as a whole, so finish the transcript first.
+            for index, (_, _, text) in segments:
+                notify("transcript", index, text)
+            return summarize_text(stream.transcript, stream.language, progress, on_partial)
+
+        submit(accumulator.finish())
+        if not futures:
+            report(progress, "error", "The transcript is empty.")
+            return None
+
+        try:
+            with tracer.span("llm_map", model=SUMMARY_MODEL, chunks=len(futures), incremental=True) as span:
+                summaries = [future.result() for future in futures]
+                span.set(bytes_in=len(stream.transcript.encode("utf-8")),
+                         bytes_out=sum(len(summary.encode("utf-8")) for summary in summaries))
+        except Exception as e:
+            print(f"⚠️ Error during Groq summarization: {e}")
+            report(progress, "error", f"Error during Groq summarization: {e}")
+            return None
 
-        return final_response.choices[0].message.content.strip()
+    if len(summaries) > 1:
+        try:
+            with tracer.span("llm_reduce", model=COMBINE_MODEL, partials=len(summaries)) as span:
+                final_summary = reduce_summaries(summaries, on_text=_final_text(on_partial))
+                span.set(bytes_out=len(final_summary.encode("utf-8")))
+        except Exception as e:
+            print(f"⚠️ Error while combining summaries: {e}")
+            report(progress, "error", f"Error while combining summaries: {e}")
+            return None
+    else:
+        final_summary = summaries[0]
 
-    return summaries[0]
+    notify("summary", 0, final_summary)
+    get_artifact_cache().put("summary", summary_cache_key(stream.transcript, stream.language),
+                             final_summary)
+    return final_summary
 
 
 # Audio Section
 
-def text_to_audio(text, audio_path):
+def text_to_audio(text, audio_path, progress=None, on_sentence=None):
     """
-    Converts text to speech using ElevenLabs (High Quality) and saves it as an MP3 file.
+    Converts text to speech (ElevenLabs by default, see TTS_BACKEND) and
+    saves it as an MP3 file. Sentences are synthesized concurrently,
+    written in order as they finish, and cached individually; each one's
+    MP3 is also passed to on_sentence(index, audio) when it is written.
     """
-    print("✅ text_to_audio: Converting final summary to speech with ElevenLabs...")
-    sys.stdout.flush()
-    st.info("3/3 - Generating realistic AI voice... 🔉")
+    report(progress, "info", "3/3 - Generating realistic AI voice... 🔉")
 
     try:
-        api_key = "sk_e86cfb4b60786fefc126afd8567c0e5bb227e3f7e60568fd" 
-
-        clean_summary = text.replace(".", "").strip().replace("\n\n", "\n")
-
-        client = ElevenLabs(api_key=api_key)
-
-        audio = client.text_to_speech.convert(
-            text=clean_summary,
-            voice_id="21m00Tcm4TlvDq8ikWAM", 
-            model_id="eleven_multilingual_v2",
-            output_format="mp3_44100_128"
-            
-        )
-
-        # Save the audio file
-        save(audio, audio_path)
+        backend = get_tts_backend()
+        print(f"✅ text_to_audio: Converting final summary to speech with {backend.name}...")
+        sys.stdout.flush()
+        with tracer.span("tts", provider=backend.name) as span:
+            stats = synthesize_to_file(text, audio_path, backend, cache=get_artifact_cache(),
+                                       on_sentence=on_sentence)
+            span.set(bytes_in=len(text.encode("utf-8")), bytes_out=stats["bytes"],
+                     sentences=stats["sentences"], cache_hits=stats["cache_hits"])
         print("✅ text_to_audio: MP3 file saved.")
         sys.stdout.flush()
         return True
     except Exception as e:
         print(f"⚠️ Error during Text-to-Speech conversion: {e}")
         sys.stdout.flush()
-        st.error(f"Error during Text-to-Speech conversion: {e}")
+        report(progress, "error", f"Error during Text-to-Speech conversion: {e}")
         return False
 
 
 
 # FAST SCENE DETECTION USING FFMPEG (Video Section)
 
-def detect_scenes_fast(video_path, threshold=0.4):
+# Proxy mode: scene scores are computed on a small, low frame rate copy.
+SCENE_PROXY_WIDTH = 320
+SCENE_PROXY_FPS = 5
+
+SHOWINFO_PTS = re.compile(r"pts_time:(\d+(?:\.\d+)?)")
+
+
+def iter_showinfo_times(cmd):
     """
-    Detects scene boundaries using FFmpeg's built-in scene change detector.
-    Returns list of (start_seconds, end_seconds)
+    Runs an ffmpeg command and yields the pts_time of every frame reported
+    by its showinfo filter, parsing stderr line by line as it arrives so
+    memory stays flat on long videos.
     """
-    cmd = [
-        "ffmpeg",
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, errors="replace")
+    try:
+        for line in proc.stderr:
+            if "showinfo" in line:
+                match = SHOWINFO_PTS.search(line)
+                if match:
+                    yield float(match.group(1))
+    finally:
+        proc.stderr.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+
+def build_scene_command(video_path, threshold=0.4, proxy=False, keyframes_only=False,
+                        proxy_width=SCENE_PROXY_WIDTH, proxy_fps=SCENE_PROXY_FPS):
+    scene_filter = f"select='gt(scene,{threshold})',showinfo"
+    if proxy:
+        scene_filter = f"fps={proxy_fps},scale={proxy_width}:-2," + scene_filter
+
+    cmd = ["ffmpeg", "-hide_banner", "-nostats"]
+    if keyframes_only:
+        # Only decode I-frames: far less work, coarser boundaries.
+        cmd += ["-skip_frame", "nokey"]
+    cmd += [
         "-i", video_path,
-        "-filter_complex", f"select='gt(scene,{threshold})',showinfo",
+        "-an",
+        "-filter_complex", scene_filter,
         "-f", "null", "-"
     ]
+    return cmd
 
-    print("⏳ Detecting scenes...", flush=True)
-    output = subprocess.run(cmd, stderr=subprocess.PIPE, text=True).stderr
 
-    timestamps = re.findall(r"pts_time:(\d+\.\d+)", output)
+def detect_scenes_fast(video_path, threshold=0.4, proxy=False, keyframes_only=False,
+                       proxy_width=SCENE_PROXY_WIDTH, proxy_fps=SCENE_PROXY_FPS):
+    """
+    Detects scene boundaries using FFmpeg's built-in scene change detector.
+    With proxy=True the video is downscaled to `proxy_width` and resampled
+    to `proxy_fps` before scoring; keyframes_only=True decodes I-frames only.
+    Returns list of (start_seconds, end_seconds)
+    """
+    cmd = build_scene_command(video_path, threshold, proxy, keyframes_only,
+                              proxy_width, proxy_fps)
 
-    if not timestamps:
-        print("⚠ No scenes detected. Returning default 60 sec window.")
-        return [(0, 60)]
+    print(f"⏳ Detecting scenes{' (proxy)' if proxy else ''}...", flush=True)
 
     scenes = []
     prev = 0.0
 
-    for ts in timestamps:
-        ts = float(ts)
-        scenes.append((prev, ts))
-        prev = ts
+    with tracer.span("scene_detect", proxy=proxy, keyframes_only=keyframes_only) as span:
+        for ts in iter_showinfo_times(cmd):
+            scenes.append((prev, ts))
+            prev = ts
+        span.set(bytes_in=os.path.getsize(video_path), cuts=len(scenes))
+
+    if not scenes:
+        print("⚠ No scenes detected. Returning default 60 sec window.")
+        return [(0, 60)]
 
     return scenes
 
 
 
-# PICK TOP N LONGEST SCENES
+# PICK TOP N IMPORTANT SCENES
 
-def select_key_scenes(scenes, max_scenes=5):
+def select_key_scenes(scenes, max_scenes=5, index=None, audio=None):
+    """
+    Picks the `max_scenes` most important scenes. Without a SceneIndex
+    the longest scenes win. With one, scenes are ranked by duration,
+    motion and cut strength, and near-black scenes are skipped. With the
+    video's AudioBuffer, silent scenes are skipped as well.
+    """
     print(f"🎯 Selecting top {max_scenes} important scenes...", flush=True)
-    return sorted(scenes, key=lambda x: x[1] - x[0], reverse=True)[:max_scenes]
+    if index is None:
+        return sorted(scenes, key=lambda x: x[1] - x[0], reverse=True)[:max_scenes]
+
+    scores = index.score_scenes(scenes)
+    if audio is not None and scenes:
+        loudness = audio.mean_loudness(scenes)
+        scores = [score - 1.0 if level < SILENCE_DB else score for score, level in zip(scores, loudness)]
+    ranked = sorted(range(len(scenes)), key=lambda i: scores[i], reverse=True)
+    return [scenes[i] for i in ranked[:max_scenes]]
 
 
 
 # SUPER-FAST VIDEO SUMMARY WITH FFMPEG CONCAT + COPY
 
-def create_video_summary_ffmpeg(video_path, scenes, output_path="summary_video.mp4"):
-    print("✂ Creating summary video clips...", flush=True)
-
-    temp_list = "clips.txt"
-    with open(temp_list, "w") as f:
-        for i, (start, end) in enumerate(scenes):
-            clip_path = f"clip{i}.mp4"
-            subprocess.run([
-                "ffmpeg", "-y",
-                "-ss", str(start),
-                "-to", str(end),
-                "-i", video_path,
-                "-c", "copy",      # No re-encoding = super fast
-                clip_path
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-            f.write(f"file '{clip_path}'\n")
-
-    print("🔗 Merging clips...", flush=True)
-    subprocess.run([
-        "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", temp_list,
-        "-c", "copy", output_path
-    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-    # Cleanup temporary files
-    for i in range(len(scenes)):
-        os.remove(f"clip{i}.mp4")
-    os.remove(temp_list)
+def has_audio_stream(video_path):
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a",
+         "-show_entries", "stream=index", "-of", "csv=p=0", video_path],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    return bool(result.stdout.strip())
+
+
+def _concat_list(video_path, scenes):
+    """
+    ffconcat script that plays each scene of the same source back to back.
+    """
+    escaped = os.path.abspath(video_path).replace("'", "'\\''")
+    lines = ["ffconcat version 1.0"]
+    for start, end in scenes:
+        lines += [f"file '{escaped}'", f"inpoint {start:.3f}", f"outpoint {end:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+def _trim_filter_graph(scenes, with_audio):
+    parts = []
+    labels = ""
+    for i, (start, end) in enumerate(scenes):
+        parts.append(f"[0:v]trim=start={start:.3f}:end={end:.3f},setpts=PTS-STARTPTS[v{i}]")
+        labels += f"[v{i}]"
+        if with_audio:
+            parts.append(f"[0:a]atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS[a{i}]")
+            labels += f"[a{i}]"
+    parts.append(f"{labels}concat=n={len(scenes)}:v=1:a={int(with_audio)}"
+                 + ("[v][a]" if with_audio else "[v]"))
+    return ";".join(parts)
+
+
+def _run_ffmpeg(cmd, what):
+    """
+    Runs an ffmpeg command and raises with the tail of its stderr on failure.
+    """
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-20:])
+        raise RuntimeError(f"ffmpeg could not {what} (exit {result.returncode}):\n{tail}")
+
+
+def create_video_summary_ffmpeg(video_path, scenes, output_path="summary_video.mp4", accurate=False):
+    """
+    Joins `scenes` of a video into one summary in a single ffmpeg run,
+    without intermediate clip files.
+    Default: concat demuxer with inpoint/outpoint and stream copy (cuts
+    snap to keyframes). accurate=True: one trim/concat filter graph with
+    a re-encode, for frame-accurate cuts.
+    """
+    print("✂ Creating summary video...", flush=True)
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    with tracer.span("assemble", accurate=accurate, scenes=len(scenes)) as span:
+        if accurate:
+            with_audio = has_audio_stream(video_path)
+            cmd = [
+                "ffmpeg", "-y", "-i", video_path,
+                "-filter_complex", _trim_filter_graph(scenes, with_audio),
+                "-map", "[v]", *(["-map", "[a]"] if with_audio else []),
+                "-fps_mode", "vfr",   # keep source frame timing instead of a default 25 fps
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+                "-c:a", "aac", "-b:a", "128k",
+                output_path
+            ]
+            _run_ffmpeg(cmd, "re-encode the summary video")
+
+        else:
+            # The concat script lives next to this job's output, so concurrent jobs never collide.
+            fd, list_path = tempfile.mkstemp(prefix="clips_", suffix=".txt", dir=output_dir)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(_concat_list(video_path, scenes))
+
+                _run_ffmpeg([
+                    "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy",      # No re-encoding = super fast
+                    "-avoid_negative_ts", "make_zero",
+                    output_path
+                ], "join the summary clips")
+            finally:
+                os.remove(list_path)
+        span.set(bytes_in=os.path.getsize(video_path),
+                 bytes_out=os.path.getsize(output_path) if os.path.exists(output_path) else 0,
+                 media_seconds=sum(end - start for start, end in scenes))
 
     print(f"🎉 Summary video saved as: {output_path}")
     return output_path
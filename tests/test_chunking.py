@@ -0,0 +1,34 @@
+import numpy as np
+
+from chunking import ChunkAccumulator, EstimateCounter, chunk_text
+
+
+def unpunctuated_text(words=20000, seed=0):
+    """ASR-style text with no sentence ends and uneven word lengths."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(2, 14, size=words)
+    return " ".join("x" * int(n) for n in lengths)
+
+
+def accumulate(text, counter, budget, segment_words=20):
+    words = text.split()
+    accumulator = ChunkAccumulator(counter, budget)
+    chunks = []
+    for i in range(0, len(words), segment_words):
+        chunks.extend(accumulator.feed(" ".join(words[i:i + segment_words])))
+    return chunks + accumulator.finish()
+
+
+def test_unpunctuated_text_chunks_the_same_online_and_offline():
+    counter = EstimateCounter()
+    text = unpunctuated_text()
+    offline = chunk_text(text, counter, 1000)
+    assert accumulate(text, counter, 1000) == offline
+
+
+def test_unpunctuated_text_has_no_tiny_leftovers():
+    counter = EstimateCounter()
+    chunks = chunk_text(unpunctuated_text(), counter, 1000)
+    counts = counter.count_batch(chunks)
+    assert (counts <= 950).all()
+    assert (counts[:-1] >= 900).all()
@@ -0,0 +1,48 @@
+import time
+
+import llm
+from benchmarks.mock_services import MockChatServer
+
+
+def mock_client(monkeypatch, server):
+    from groq import Groq
+
+    monkeypatch.setattr(llm, "_client", Groq(api_key="test", base_url=server.base_url, max_retries=0))
+
+
+def test_rate_limited_request_waits_for_retry_after(monkeypatch):
+    with MockChatServer(latency=0, rate_limit_every=2, retry_after=0.3) as server:
+        mock_client(monkeypatch, server)
+        limiter = llm.RateLimiter(6000)
+        assert llm.chat("first words", "mock", limiter=limiter).startswith("- mock summary")
+
+        started = time.monotonic()
+        reply = llm.chat("second prompt here", "mock", limiter=limiter)
+        elapsed = time.monotonic() - started
+
+    assert reply == "- mock summary of 3 words: second prompt here"
+    # Request 2 got a 429; request 3 was sent once Retry-After had passed.
+    assert server.requests == 3
+    assert elapsed >= 0.3
+    assert limiter.paused_until > 0
+
+
+def test_streamed_reply_is_retried_after_a_429(monkeypatch):
+    with MockChatServer(latency=0, rate_limit_every=2, retry_after=0.1, token_interval=0) as server:
+        mock_client(monkeypatch, server)
+        limiter = llm.RateLimiter(6000)
+        llm.chat("warm up", "mock", limiter=limiter)
+        seen = []
+        reply = llm.chat_stream("one two three", "mock", seen.append, limiter=limiter)
+
+    assert server.requests == 3
+    assert reply == "- mock summary of 3 words: one two three"
+    assert seen[-1] == reply
+
+
+def test_map_ordered_keeps_input_order():
+    def work(i):
+        time.sleep((8 - i) * 0.01)   # later items finish first
+        return i * i
+
+    assert llm.map_ordered(work, range(8), max_workers=4) == [i * i for i in range(8)]
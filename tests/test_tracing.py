@@ -0,0 +1,32 @@
+from llm import map_ordered
+from tracing import tracer
+
+
+def test_pool_workers_keep_the_trace(monkeypatch):
+    monkeypatch.setattr(tracer, "path", None)
+
+    def work(i):
+        with tracer.span("pooled_work", item=i):
+            return i
+
+    with tracer.trace("trace-pool"):
+        assert map_ordered(work, range(8), max_workers=4) == list(range(8))
+
+    spans = tracer.spans_for("trace-pool")
+    assert sorted(span["attrs"]["item"] for span in spans if span["name"] == "pooled_work") == list(range(8))
+
+
+def test_span_records_its_own_rss_change(monkeypatch):
+    monkeypatch.setattr(tracer, "path", None)
+
+    with tracer.trace("trace-rss"):
+        with tracer.span("allocate") as span:
+            block = bytearray(64 * 1024 * 1024)
+        del block
+        with tracer.span("idle") as idle:
+            pass
+
+    if span.rss_bytes is None:
+        return
+    assert span.rss_delta_bytes > 32 * 1024 * 1024
+    assert abs(idle.rss_delta_bytes) < 32 * 1024 * 1024
@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from translation import CT2Model, TranslationRegistry, convert_to_ct2, ct2_model_dir, decoding_length
+
+
+class WordTokenizer:
+    """One token per word, like a tokenizer for an echo model."""
+
+    def encode(self, text):
+        return [hash(word) for word in text.split()]
+
+    def convert_ids_to_tokens(self, ids):
+        return [str(i) for i in ids]
+
+    def convert_tokens_to_ids(self, tokens):
+        return [int(token) for token in tokens]
+
+    def decode(self, ids, skip_special_tokens=True):
+        return ids
+
+
+class EchoTranslator:
+    """Copies the source, stopping where CTranslate2 would (default 256 tokens)."""
+
+    def translate_batch(self, sources, max_decoding_length=256, **options):
+        return [SimpleNamespace(hypotheses=[tokens[:max_decoding_length]]) for tokens in sources]
+
+
+def echo_model():
+    model = CT2Model.__new__(CT2Model)
+    model.name = "Helsinki-NLP/opus-mt-de-en"
+    model.beam_size = 1
+    model.translator = EchoTranslator()
+    model.tokenizer = WordTokenizer()
+    model._lock = threading.Lock()
+    return model
+
+
+def test_chunk_near_budget_is_not_truncated():
+    chunk = " ".join(f"w{i}" for i in range(482))
+    (translation,) = echo_model().translate([chunk], "de")
+    assert len(translation) == 482
+
+
+def test_decoding_length_bounds():
+    assert decoding_length([["a"] * 10]) == 512
+    assert decoding_length([["a"] * 300, ["a"] * 5]) == 610
+    assert decoding_length([["a"] * 2000]) == 1024
+
+
+class SlowRegistry(TranslationRegistry):
+    """Loads block until released; names in `broken` fail."""
+
+    def __init__(self, broken=(), **options):
+        super().__init__(**options)
+        self.broken = set(broken)
+        self.loads = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _load(self, name):
+        self.loads.append(name)
+        self.started.set()
+        if name in self.broken:
+            raise OSError("download failed")
+        self.release.wait(5)
+        return SimpleNamespace(name=name, size_bytes=1)
+
+
+def test_slow_load_does_not_block_other_models():
+    registry = SlowRegistry()
+    waiter = threading.Thread(target=registry.get, args=("de",))
+    waiter.start()
+    assert registry.started.wait(5)
+    # Another caller for the same pair waits on the load in flight.
+    second = threading.Thread(target=registry.get, args=("de",))
+    second.start()
+    # The registry lock is free while the model loads.
+    assert registry.stats()["models"] == []
+    registry.release.set()
+    waiter.join(5)
+    second.join(5)
+    assert not waiter.is_alive() and not second.is_alive()
+    assert registry.stats()["models"] == ["Helsinki-NLP/opus-mt-de-en"]
+    assert registry.loads == ["Helsinki-NLP/opus-mt-de-en"]
+
+
+def test_failed_model_is_retried_after_the_retry_window():
+    everything = {"Helsinki-NLP/opus-mt-xx-en", "facebook/m2m100_418M"}
+
+    registry = SlowRegistry(broken=everything, retry_seconds=0)
+    registry.release.set()
+    with pytest.raises(RuntimeError):
+        registry.get("xx")
+    registry.broken.clear()
+    assert registry.get("xx").name == "Helsinki-NLP/opus-mt-xx-en"
+    assert registry.stats()["models"] == ["Helsinki-NLP/opus-mt-xx-en"]
+
+    registry = SlowRegistry(broken=everything, retry_seconds=300)
+    registry.release.set()
+    with pytest.raises(RuntimeError):
+        registry.get("xx")
+    registry.broken.clear()
+    with pytest.raises(RuntimeError):
+        registry.get("xx")
+    assert registry.stats()["models"] == []
+    assert registry.loads.count("Helsinki-NLP/opus-mt-xx-en") == 1
+
+
+def fake_converter(monkeypatch, during_convert=None):
+    """Installs a ctranslate2 whose converter writes model.bin, calling `during_convert` first."""
+
+    class TransformersConverter:
+        def __init__(self, name):
+            self.name = name
+
+        def convert(self, output_dir, quantization=None, force=False):
+            if during_convert is not None:
+                during_convert()
+            with open(os.path.join(output_dir, "model.bin"), "w") as f:
+                f.write(self.name)
+
+    converters = SimpleNamespace(TransformersConverter=TransformersConverter)
+    monkeypatch.setitem(sys.modules, "ctranslate2", SimpleNamespace(converters=converters))
+    monkeypatch.setitem(sys.modules, "ctranslate2.converters", converters)
+
+
+def test_conversion_finished_by_another_process_counts_as_success(monkeypatch, tmp_path):
+    root = str(tmp_path)
+    target = ct2_model_dir("Helsinki-NLP/opus-mt-de-en", "int8", root)
+
+    def other_process_wins():
+        os.makedirs(target)
+        with open(os.path.join(target, "model.bin"), "w") as f:
+            f.write("other")
+
+    fake_converter(monkeypatch, other_process_wins)
+    assert convert_to_ct2("Helsinki-NLP/opus-mt-de-en", "int8", root) == target
+    with open(os.path.join(target, "model.bin")) as f:
+        assert f.read() == "other"
+    # The losing conversion's private directory is cleaned up.
+    assert os.listdir(root) == [os.path.basename(target)]
+
+
+def test_conversion_replaces_an_incomplete_leftover(monkeypatch, tmp_path):
+    root = str(tmp_path)
+    target = ct2_model_dir("Helsinki-NLP/opus-mt-de-en", "int8", root)
+    os.makedirs(os.path.join(target, "partial"))
+
+    fake_converter(monkeypatch)
+    assert convert_to_ct2("Helsinki-NLP/opus-mt-de-en", "int8", root) == target
+    assert os.listdir(target) == ["model.bin"]
+    assert os.listdir(root) == [os.path.basename(target)]
+
+
+def test_collects_garbage_only_after_an_eviction_and_outside_the_lock(monkeypatch):
+    registry = SlowRegistry(memory_budget_mb=1)
+    registry.release.set()
+    collected = []
+
+    def collect():
+        # stats() takes the registry lock; from another thread it only
+        # returns if the lock was released before collecting.
+        reader = threading.Thread(target=registry.stats)
+        reader.start()
+        reader.join(5)
+        collected.append(not reader.is_alive())
+
+    monkeypatch.setattr("translation.gc.collect", collect)
+
+    registry.get("de")
+    assert collected == []
+
+    monkeypatch.setattr(registry, "_load", lambda name: SimpleNamespace(name=name, size_bytes=1024 * 1024))
+    registry.get("fr")
+    assert registry.stats()["models"] == ["Helsinki-NLP/opus-mt-fr-en"]
+    assert collected == [True]
@@ -0,0 +1,46 @@
+import os
+import threading
+import time
+
+from tts import StubBackend, synthesize_to_file
+
+
+class ReversedStub(StubBackend):
+    """Earlier sentences take longer, so they finish after later ones."""
+
+    def __init__(self, sentences):
+        super().__init__()
+        self.delays = {sentence: (len(sentences) - i) * 0.02 for i, sentence in enumerate(sentences)}
+        self.finished = []
+        self._order_lock = threading.Lock()
+
+    def synthesize(self, text):
+        time.sleep(self.delays[text])
+        audio = super().synthesize(text)
+        with self._order_lock:
+            self.finished.append(text)
+        return audio
+
+
+def test_sentences_are_written_in_order_as_they_complete(tmp_path):
+    sentences = [f"Sentence number {i} has {'some ' * i}words" for i in range(6)]
+    backend = ReversedStub(sentences)
+    audio_path = str(tmp_path / "summary.mp3")
+
+    written = []
+
+    def on_sentence(index, audio):
+        # Each sentence is already on disk, after everything before it.
+        written.append((index, len(audio)))
+        assert os.path.getsize(audio_path) == sum(size for _, size in written)
+
+    stats = synthesize_to_file(". ".join(sentences) + ".", audio_path, backend,
+                               max_workers=6, on_sentence=on_sentence)
+
+    assert backend.finished != sentences
+    assert [index for index, _ in written] == list(range(6))
+    expected = b"".join(StubBackend().synthesize(sentence) for sentence in sentences)
+    with open(audio_path, "rb") as f:
+        assert f.read() == expected
+    assert stats == {"sentences": 6, "cache_hits": 0, "bytes": len(expected)}
+    assert backend.calls == 6
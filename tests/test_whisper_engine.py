@@ -0,0 +1,49 @@
+import sys
+import threading
+import types
+
+from whisper_engine import WhisperConfig, WhisperEngine
+
+
+def fake_faster_whisper(monkeypatch, slow=()):
+    """Installs a faster_whisper whose models in `slow` load until released."""
+    release = threading.Event()
+    loads = []
+
+    class WhisperModel:
+        def __init__(self, size, **options):
+            loads.append(size)
+            if size in slow:
+                assert release.wait(5), "slow load was never released"
+            self.size = size
+
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=WhisperModel))
+    return release, loads
+
+
+def test_cold_load_does_not_block_resident_models(monkeypatch, tmp_path):
+    release, loads = fake_faster_whisper(monkeypatch, slow={"small"})
+    engine = WhisperEngine(download_root=str(tmp_path))
+    tiny = engine.model(WhisperConfig("tiny"))
+
+    results = []
+    loaders = [threading.Thread(target=lambda: results.append(engine.model(WhisperConfig("small"))))
+               for _ in range(2)]
+    for loader in loaders:
+        loader.start()
+    # The resident model is served while "small" is still loading.
+    assert engine.model(WhisperConfig("tiny")) is tiny
+    release.set()
+    for loader in loaders:
+        loader.join(5)
+    assert results[0] is results[1]
+    assert loads == ["tiny", "small"]
+
+
+def test_least_recently_used_model_is_unloaded(monkeypatch, tmp_path):
+    _, loads = fake_faster_whisper(monkeypatch)
+    engine = WhisperEngine(download_root=str(tmp_path), max_models=2)
+    for size in ("tiny", "base", "tiny", "small", "tiny"):
+        engine.model(WhisperConfig(size))
+    engine.model(WhisperConfig("base"))
+    assert loads == ["tiny", "base", "small", "base"]
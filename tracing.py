@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import resource
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(os.getcwd(), "traces.jsonl"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+
+# Trace (job) id the current thread is working for; spans are tagged with it.
+_current_trace = contextvars.ContextVar("trace_id", default=None)
+
+
+def _rusage_seconds(usage):
+    return usage.ru_utime + usage.ru_stime
+
+
+def _current_rss_bytes():
+    """
+    Resident set size right now, or None where /proc isn't available.
+    ru_maxrss can't be used per span: it is the process-lifetime peak.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Span:
+    """
+    Timing and resource record for one pipeline stage.
+
+    cpu_seconds is process-wide (it includes every thread, so concurrent
+    jobs inflate it); child_cpu_seconds covers finished subprocesses such
+    as ffmpeg. rss_bytes is the resident set size when the span ends and
+    rss_delta_bytes how much it grew (or shrank) during the span.
+    """
+
+    def __init__(self, name, trace_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.attrs = dict(attrs)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.media_seconds = None
+        self.error = None
+        self.start = time.time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.child_cpu_seconds = 0.0
+        self.rss_bytes = None
+        self.rss_delta_bytes = None
+
+    def set(self, bytes_in=None, bytes_out=None, media_seconds=None, **attrs):
+        if bytes_in is not None:
+            self.bytes_in = bytes_in
+        if bytes_out is not None:
+            self.bytes_out = bytes_out
+        if media_seconds is not None:
+            self.media_seconds = media_seconds
+        self.attrs.update(attrs)
+
+    @property
+    def real_time_factor(self):
+        if not self.media_seconds:
+            return None
+        return self.wall_seconds / self.media_seconds
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": self.start,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "child_cpu_seconds": round(self.child_cpu_seconds, 4),
+            "rss_bytes": self.rss_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "media_seconds": self.media_seconds,
+            "real_time_factor": self.real_time_factor,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Records spans, appends them to a JSON-lines file, keeps the most
+    recent ones in memory for the UI, and aggregates per-stage totals
+    for the Prometheus endpoint.
+    """
+
+    def __init__(self, path=TRACE_FILE, keep=2000):
+        self.path = path
+        self._recent = deque(maxlen=keep)
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, trace_id):
+        """
+        Tags every span opened in this context with `trace_id`.
+        """
+        token = _current_trace.set(trace_id)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+
+    def bind(self, fn):
+        """
+        Wraps `fn` to run in the caller's trace. Thread pools don't copy
+        context variables into their workers, so functions handed to
+        them are wrapped, or their spans would have no trace id.
+        """
+        trace_id = _current_trace.get()
+
+        def run(*args, **kwargs):
+            with self.trace(trace_id):
+                return fn(*args, **kwargs)
+        return run
+
+    @contextmanager
+    def span(self, name, **attrs):
+        span = Span(name, _current_trace.get(), attrs)
+        self_usage = resource.getrusage(resource.RUSAGE_SELF)
+        child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rss_start = _current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall_seconds = time.perf_counter() - started
+            self_end = resource.getrusage(resource.RUSAGE_SELF)
+            child_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+            span.cpu_seconds = _rusage_seconds(self_end) - _rusage_seconds(self_usage)
+            span.child_cpu_seconds = _rusage_seconds(child_end) - _rusage_seconds(child_usage)
+            span.rss_bytes = _current_rss_bytes()
+            if span.rss_bytes is not None and rss_start is not None:
+                span.rss_delta_bytes = span.rss_bytes - rss_start
+            self._record(span)
+
+    def observe(self, name, seconds, trace_id=None, **attrs):
+        """
+        Records a latency measured elsewhere (e.g. time to first content)
+        as a span of `seconds` wall time with no resource figures. Pass
+        `trace_id` when calling from a thread outside the trace context.
+        """
+        span = Span(name, trace_id or _current_trace.get(), attrs)
+        span.start = time.time() - seconds
+        span.wall_seconds = seconds
+        self._record(span)
+
+    def _record(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self._recent.append(record)
+
+            totals = self._totals.setdefault(span.name, {
+                "count": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                "child_cpu_seconds": 0.0, "bytes_in": 0, "bytes_out": 0, "media_seconds": 0.0,
+            })
+            totals["count"] += 1
+            totals["errors"] += int(span.error is not None)
+            totals["wall_seconds"] += span.wall_seconds
+            totals["cpu_seconds"] += span.cpu_seconds
+            totals["child_cpu_seconds"] += span.child_cpu_seconds
+            totals["bytes_in"] += span.bytes_in
+            totals["bytes_out"] += span.bytes_out
+            totals["media_seconds"] += span.media_seconds or 0.0
+
+            if self.path:
+                try:
+                    with open(self.path, "a") as f:
+                        f.write(json.dumps(record) + "\n")
+                except OSError as e:
+                    print(f"⚠️ Could not write trace: {e}")
+                    sys.stdout.flush()
+
+    def spans_for(self, trace_id):
+        with self._lock:
+            return [record for record in self._recent if record["trace_id"] == trace_id]
+
+    def prometheus_text(self):
+        """
+        Per-stage totals in the Prometheus text exposition format.
+        """
+        metrics = [
+            ("count", "pipeline_stage_runs_total", "Completed stage runs."),
+            ("errors", "pipeline_stage_errors_total", "Stage runs that raised."),
+            ("wall_seconds", "pipeline_stage_wall_seconds_total", "Wall time spent in each stage."),
+            ("cpu_seconds", "pipeline_stage_cpu_seconds_total", "Process CPU time during each stage."),
+            ("child_cpu_seconds", "pipeline_stage_child_cpu_seconds_total",
+             "Subprocess (ffmpeg) CPU time during each stage."),
+            ("bytes_in", "pipeline_stage_bytes_in_total", "Bytes consumed by each stage."),
+            ("bytes_out", "pipeline_stage_bytes_out_total", "Bytes produced by each stage."),
+            ("media_seconds", "pipeline_stage_media_seconds_total", "Audio/video seconds processed."),
+        ]
+        with self._lock:
+            totals = {name: dict(values) for name, values in self._totals.items()}
+
+        lines = []
+        for key, metric, help_text in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for stage, values in sorted(totals.items()):
+                lines.append(f'{metric}{{stage="{stage}"}} {values[key]}')
+
+        # ru_maxrss is in kilobytes on Linux.
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        lines.append("# HELP pipeline_process_peak_rss_bytes Peak resident set size of the server.")
+        lines.append("# TYPE pipeline_process_peak_rss_bytes gauge")
+        lines.append(f"pipeline_process_peak_rss_bytes {usage.ru_maxrss * 1024}")
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = tracer.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """
+    Serves tracer.prometheus_text() at http://0.0.0.0:<port>/metrics on a
+    daemon thread. Returns the server, or None if no port is configured.
+    """
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics available at http://0.0.0.0:{port}/metrics")
+    sys.stdout.flush()
+    return server
@@ -0,0 +1,334 @@
+import os
+import gc
+import re
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from chunking import TokenizerCounter
+
+
+# Multilingual fallback for language pairs without a dedicated opus-mt model.
+M2M_MODEL = "facebook/m2m100_418M"
+TRANSLATION_MEMORY_BUDGET_MB = int(os.getenv("TRANSLATION_MEMORY_BUDGET_MB", 2048))
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", 8))
+# A model that failed to load is skipped for this long, then tried again.
+TRANSLATION_RETRY_SECONDS = int(os.getenv("TRANSLATION_RETRY_SECONDS", 300))
+# "ct2": CTranslate2 (installed with faster-whisper), falling back to "torch",
+# the transformers pipeline, for models it can't convert.
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "ct2")
+CT2_COMPUTE_TYPE = os.getenv("CT2_COMPUTE_TYPE", "int8")
+# Batches translated in parallel, and threads per batch (0 = all cores).
+CT2_INTER_THREADS = int(os.getenv("CT2_INTER_THREADS", 1))
+CT2_INTRA_THREADS = int(os.getenv("CT2_INTRA_THREADS", 0))
+# Same beam width the opus-mt generation configs use, so both backends agree.
+CT2_BEAM_SIZE = int(os.getenv("CT2_BEAM_SIZE", 4))
+# CTranslate2 stops decoding at 256 tokens by default, which cuts off the
+# translation of a full-size chunk. Output is allowed about twice the
+# input length, at least 512 and at most this many tokens.
+CT2_MAX_DECODING_LENGTH = int(os.getenv("CT2_MAX_DECODING_LENGTH", 1024))
+CT2_MODELS_DIR = os.path.join(os.getcwd(), "models_cache", "ct2")
+
+
+def candidate_models(source_lang, target_lang="en"):
+    """
+    Models to try for a language pair, most specific first.
+    """
+    return [f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}", M2M_MODEL]
+
+
+def backend_id(backend=TRANSLATION_BACKEND):
+    """
+    Identifies the backend's output for cache keys.
+    """
+    return f"ct2-{CT2_COMPUTE_TYPE}" if backend == "ct2" else backend
+
+
+def max_input_tokens(translator):
+    """
+    Longest input the model accepts without truncation, less room for the
+    special tokens the tokenizer adds (end of sequence, language codes).
+    """
+    return _token_limit(translator.tokenizer, translator.model.config)
+
+
+def _token_limit(tokenizer, config):
+    limit = tokenizer.model_max_length
+    if not limit or limit > 100_000:    # "no limit" sentinel: fall back to the model config
+        limit = getattr(config, "max_position_embeddings", None) or 512
+    return limit - 4
+
+
+def decoding_length(sources, limit=CT2_MAX_DECODING_LENGTH):
+    """
+    max_decoding_length for a batch of tokenized sources.
+    """
+    longest = max((len(tokens) for tokens in sources), default=0)
+    return min(max(2 * longest + 10, 512), limit)
+
+
+def ct2_model_dir(name, compute_type=CT2_COMPUTE_TYPE, root=CT2_MODELS_DIR):
+    return os.path.join(root, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{compute_type}")
+
+
+def convert_to_ct2(name, compute_type=CT2_COMPUTE_TYPE, root=CT2_MODELS_DIR):
+    """
+    Converts a Hugging Face Marian/M2M model to CTranslate2 once and
+    returns the directory. Later calls (and restarts) reuse the converted
+    model, the way Whisper models are kept in models_cache.
+    """
+    target = ct2_model_dir(name, compute_type, root)
+    if os.path.exists(os.path.join(target, "model.bin")):
+        return target
+
+    from ctranslate2.converters import TransformersConverter
+
+    print(f"🔧 Converting '{name}' to CTranslate2 ({compute_type})...")
+    sys.stdout.flush()
+    os.makedirs(root, exist_ok=True)
+    # Each conversion gets its own directory, so processes converting the
+    # same model at once never write into each other's files.
+    tmp_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(target)}.", suffix=".tmp", dir=root)
+    try:
+        TransformersConverter(name).convert(tmp_dir, quantization=compute_type, force=True)
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            # Another process got there first; its copy is as good as ours.
+            if os.path.exists(os.path.join(target, "model.bin")):
+                return target
+            # A leftover without model.bin from an interrupted older run.
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(tmp_dir, target)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return target
+
+
+class ResidentModel:
+    """
+    A loaded translation pipeline plus the metadata the registry needs.
+    """
+
+    def __init__(self, name, translator):
+        self.name = name
+        self.translator = translator
+        self.size_bytes = sum(
+            p.numel() * p.element_size() for p in translator.model.parameters()
+        )
+        self.counter = TokenizerCounter(translator.tokenizer, name)
+        self.max_input_tokens = max_input_tokens(translator)
+        self.backend = "torch"
+        self._lock = threading.Lock()
+
+    def translate(self, chunks, source_lang, target_lang="en", batch_size=TRANSLATION_BATCH_SIZE):
+        """
+        Translates all chunks with batched pipeline calls, keeping order.
+        """
+        kwargs = {}
+        if self.name == M2M_MODEL:
+            kwargs = {"src_lang": source_lang, "tgt_lang": target_lang}
+
+        with self._lock:
+            results = self.translator(chunks, batch_size=batch_size, **kwargs)
+        return [result["translation_text"] for result in results]
+
+
+class CT2Model:
+    """
+    A translation model converted to CTranslate2, with the same interface
+    as ResidentModel. Runs quantized on CPU; `inter_threads` batches are
+    translated in parallel with `intra_threads` threads each, and the
+    translator is safe to call from several threads.
+    """
+
+    def __init__(self, name, compute_type=CT2_COMPUTE_TYPE, inter_threads=CT2_INTER_THREADS,
+                 intra_threads=CT2_INTRA_THREADS, beam_size=CT2_BEAM_SIZE):
+        import ctranslate2
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_dir = convert_to_ct2(name, compute_type)
+        self.name = name
+        self.beam_size = beam_size
+        self.translator = ctranslate2.Translator(
+            model_dir, device="cpu", compute_type=compute_type,
+            inter_threads=inter_threads, intra_threads=intra_threads
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        self.size_bytes = sum(
+            os.path.getsize(os.path.join(model_dir, f)) for f in os.listdir(model_dir)
+        )
+        self.counter = TokenizerCounter(self.tokenizer, name)
+        self.max_input_tokens = _token_limit(self.tokenizer, AutoConfig.from_pretrained(name))
+        self.backend = backend_id("ct2")
+        self._lock = threading.Lock()
+
+    def translate(self, chunks, source_lang, target_lang="en", batch_size=TRANSLATION_BATCH_SIZE):
+        """
+        Translates all chunks with batched CTranslate2 calls, keeping order.
+        """
+        target_prefix = None
+        with self._lock:
+            # M2M's tokenizer prepends the source language code from src_lang.
+            if self.name == M2M_MODEL:
+                self.tokenizer.src_lang = source_lang
+            sources = [self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(chunk))
+                       for chunk in chunks]
+        if self.name == M2M_MODEL:
+            target_prefix = [[self.tokenizer.get_lang_token(target_lang)]] * len(chunks)
+
+        results = self.translator.translate_batch(
+            sources, target_prefix=target_prefix, max_batch_size=batch_size,
+            beam_size=self.beam_size, max_decoding_length=decoding_length(sources)
+        )
+
+        translations = []
+        for result in results:
+            tokens = result.hypotheses[0]
+            if target_prefix is not None:
+                tokens = tokens[1:]         # the target language code
+            translations.append(self.tokenizer.decode(
+                self.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True
+            ))
+        return translations
+
+
+class TranslationRegistry:
+    """
+    Process-wide set of loaded translation models keyed by language pair.
+    Models stay resident between requests. When their total size goes over
+    `memory_budget_mb`, the least recently used ones are dropped.
+
+    With backend="ct2" models run on CTranslate2; one that can't be
+    converted or loaded falls back to the transformers pipeline.
+
+    Loads run outside the registry lock, so a slow download only holds up
+    requests for the same model; those wait for it instead of loading it
+    again. A model that fails to load is skipped for `retry_seconds`.
+    """
+
+    def __init__(self, memory_budget_mb=TRANSLATION_MEMORY_BUDGET_MB, device="cpu",
+                 backend=TRANSLATION_BACKEND, retry_seconds=TRANSLATION_RETRY_SECONDS):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.device = device
+        self.backend = backend
+        self.retry_seconds = retry_seconds
+        self._models = OrderedDict()       # model name -> ResidentModel
+        self._pair_to_model = {}           # (src, tgt) -> model name
+        self._loading = {}                 # model name -> Future of the load in flight
+        self._unavailable = {}             # model name -> (monotonic time, error) of its last failure
+        self._lock = threading.Lock()
+
+    def get(self, source_lang, target_lang="en"):
+        """
+        Returns the ResidentModel for a language pair, loading it if needed.
+        """
+        with self._lock:
+            name = self._pair_to_model.get((source_lang, target_lang))
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+
+        errors = []
+        for name in candidate_models(source_lang, target_lang):
+            try:
+                model = self._acquire(name)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                continue
+            with self._lock:
+                self._pair_to_model[(source_lang, target_lang)] = name
+            return model
+
+        raise RuntimeError(
+            f"No translation model for '{source_lang}' -> '{target_lang}': "
+            + "; ".join(errors)
+        )
+
+    def _acquire(self, name):
+        """
+        Returns the resident model `name`, loading it unless a load is
+        already in flight, in which case it waits for that one.
+        """
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            failure = self._unavailable.get(name)
+            if failure is not None and time.monotonic() - failure[0] < self.retry_seconds:
+                raise RuntimeError(failure[1])
+            future = self._loading.get(name)
+            owner = future is None
+            if owner:
+                future = self._loading[name] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            model = self._load(name)
+        except Exception as e:
+            print(f"⚠️ Could not load '{name}': {e}")
+            sys.stdout.flush()
+            with self._lock:
+                self._unavailable[name] = (time.monotonic(), str(e))
+                del self._loading[name]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._models[name] = model
+            self._unavailable.pop(name, None)
+            del self._loading[name]
+            evicted = self._evict()
+        if evicted:
+            # Free the evicted models' memory now, without holding the lock.
+            del evicted
+            gc.collect()
+        future.set_result(model)
+        return model
+
+    def _load(self, name):
+        if self.backend == "ct2":
+            try:
+                print(f"🔄 Loading translation model '{name}' with CTranslate2...")
+                sys.stdout.flush()
+                return CT2Model(name)
+            except Exception as e:
+                print(f"⚠️ CTranslate2 unavailable for '{name}', using transformers: {e}")
+                sys.stdout.flush()
+
+        # transformers (and torch) are only imported once translation is needed.
+        from transformers import pipeline
+
+        print(f"🔄 Loading translation model '{name}' onto '{self.device}'...")
+        sys.stdout.flush()
+        return ResidentModel(name, pipeline("translation", model=name, device=self.device))
+
+    def _evict(self):
+        """
+        Drops least recently used models until the rest fit the budget.
+        Called with the lock held; returns the evicted models.
+        """
+        evicted = []
+        total = sum(model.size_bytes for model in self._models.values())
+        while total > self.memory_budget and len(self._models) > 1:
+            name, model = self._models.popitem(last=False)
+            evicted.append(model)
+            total -= model.size_bytes
+            print(f"🧹 Evicting translation model '{name}' "
+                  f"({model.size_bytes / (1024 * 1024):.0f} MB)")
+            sys.stdout.flush()
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            return {
+                "models": list(self._models),
+                "bytes": sum(model.size_bytes for model in self._models.values()),
+                "budget_bytes": self.memory_budget,
+            }
@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from cache import text_hash, make_key
+from tracing import tracer
+from chunking import split_sentences as sentences_of
+
+
+TTS_BACKEND = os.getenv("TTS_BACKEND", "elevenlabs")
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", 4))
+# Sentences longer than this are split further at commas, then at spaces.
+TTS_MAX_CHARS = 400
+
+ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_OUTPUT_FORMAT = "mp3_44100_128"
+
+
+def split_sentences(text, max_chars=TTS_MAX_CHARS):
+    """
+    Splits text into sentences, breaking any longer than `max_chars`
+    at commas and then at spaces.
+    """
+    pieces = []
+    for sentence in sentences_of(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(", ", 0, max_chars)
+            if cut <= 0:
+                cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def clean_for_speech(sentence):
+    """
+    Text that is actually voiced: without periods (read as pauses or
+    "dot") and without markdown bullets.
+    """
+    return sentence.replace(".", "").lstrip("-*# ").strip()
+
+
+class ElevenLabsBackend:
+    """
+    Synthesizes speech with the ElevenLabs API. ELEVENLABS_BASE_URL
+    points it at another server, e.g. the benchmark mock.
+    """
+
+    name = "elevenlabs"
+
+    def __init__(self, api_key=None, voice_id=ELEVENLABS_VOICE_ID,
+                 model_id=ELEVENLABS_MODEL_ID, output_format=ELEVENLABS_OUTPUT_FORMAT):
+        from elevenlabs.client import ElevenLabs
+
+        api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
+            raise RuntimeError("ELEVENLABS_API_KEY is not set; add it to the environment or .env, "
+                               "or choose another TTS_BACKEND.")
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.output_format = output_format
+        self.client = ElevenLabs(
+            api_key=api_key,
+            base_url=os.getenv("ELEVENLABS_BASE_URL") or None
+        )
+
+    def cache_params(self):
+        return {"backend": self.name, "voice": self.voice_id,
+                "model": self.model_id, "format": self.output_format}
+
+    def synthesize(self, text):
+        audio = self.client.text_to_speech.convert(
+            text=text,
+            voice_id=self.voice_id,
+            model_id=self.model_id,
+            output_format=self.output_format
+        )
+        return b"".join(audio)
+
+
+class StubBackend:
+    """
+    Offline backend: silent MP3 about as long as the text would take to
+    read. Used by tests and benchmarks that must not call the API.
+    """
+
+    name = "stub"
+    # One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz, ~26 ms).
+    FRAME = b"\xff\xfb\x90\x64" + bytes(413)
+    FRAME_SECONDS = 1152 / 44100
+
+    def __init__(self, words_per_second=2.5):
+        self.words_per_second = words_per_second
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def cache_params(self):
+        return {"backend": self.name, "words_per_second": self.words_per_second}
+
+    def synthesize(self, text):
+        with self._lock:
+            self.calls += 1
+        seconds = len(text.split()) / self.words_per_second
+        return self.FRAME * max(1, int(seconds / self.FRAME_SECONDS))
+
+
+BACKENDS = {
+    ElevenLabsBackend.name: ElevenLabsBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_backend(name=TTS_BACKEND, **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**options)
+
+
+def synthesize_to_file(text, audio_path, backend, cache=None, max_workers=TTS_MAX_CONCURRENCY,
+                       on_sentence=None):
+    """
+    Splits `text` into sentences, synthesizes them concurrently and
+    appends each one's audio to `audio_path` as soon as every sentence
+    before it is done, so the file is playable while later sentences are
+    still being generated. With a cache (an ArtifactCache), sentences are
+    stored by hash of (text, backend settings) and only new or changed
+    sentences reach the backend. on_sentence(index, audio) is called as
+    each sentence is appended, so callers can start playing early.
+    Returns a dict with sentence, cache-hit and byte counts.
+    """
+    sentences = [s for s in (clean_for_speech(s) for s in split_sentences(text)) if s]
+    params = backend.cache_params()
+    keys = [make_key("tts", text_hash(sentence), **params) for sentence in sentences]
+
+    def synthesize(i):
+        if cache is not None:
+            cached = cache.get_bytes("tts", keys[i])
+            if cached is not None:
+                return cached, True
+        audio = backend.synthesize(sentences[i])
+        if cache is not None:
+            cache.put_bytes("tts", keys[i], audio)
+        return audio, False
+
+    stats = {"sentences": len(sentences), "cache_hits": 0, "bytes": 0}
+    os.makedirs(os.path.dirname(os.path.abspath(audio_path)), exist_ok=True)
+
+    with open(audio_path, "wb") as out, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        synthesize_traced = tracer.bind(synthesize)
+        futures = {pool.submit(synthesize_traced, i): i for i in range(len(sentences))}
+        ready = {}
+        next_index = 0
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            try:
+                for future in done:
+                    ready[futures[future]] = future.result()
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+            # Write in sentence order: only the contiguous prefix that is ready.
+            while next_index in ready:
+                audio, hit = ready.pop(next_index)
+                out.write(audio)
+                out.flush()
+                stats["cache_hits"] += int(hit)
+                stats["bytes"] += len(audio)
+                if on_sentence is not None:
+                    on_sentence(next_index, audio)
+                next_index += 1
+
+    print(f"🔉 Synthesized {stats['sentences']} sentences "
+          f"({stats['cache_hits']} from cache) with {backend.name}.")
+    sys.stdout.flush()
+    return stats
@@ -0,0 +1,235 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+# "auto" picks the model per request from duration, cores and the latency target.
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "auto")
+WHISPER_BEAM = os.getenv("WHISPER_BEAM", "auto")
+WHISPER_BATCH_SIZE = os.getenv("WHISPER_BATCH_SIZE", "auto")
+WHISPER_VAD = os.getenv("WHISPER_VAD", "1") == "1"
+# Concurrent transcriptions one loaded model can serve (one per job worker).
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", 2))
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", 0))     # 0 = cores / workers
+# Loaded models kept at once; the least recently used one is dropped beyond this.
+WHISPER_MAX_MODELS = int(os.getenv("WHISPER_MAX_MODELS", 2))
+# How long a transcription may take, in seconds, before a smaller model or beam is chosen.
+WHISPER_LATENCY_TARGET = float(os.getenv("WHISPER_LATENCY_TARGET", 120))
+MODELS_DIR = os.path.join(os.getcwd(), "models_cache")
+
+# Candidate models, most accurate first, with a rough single-core real-time
+# factor at beam 1 (int8, CPU). Tune with benchmarks/bench_whisper.py.
+MODEL_RTF_PER_CORE = {
+    "small": 0.60,
+    "base": 0.20,
+    "tiny": 0.10,
+}
+BEAM_COST = {5: 1.8, 1: 1.0}
+# Batched inference decodes several VAD chunks at once; worth it past a minute of audio.
+BATCH_MIN_SECONDS = 60
+BATCH_SPEEDUP = 2.0
+
+
+class WhisperConfig:
+    """
+    Settings for one transcription. Everything that changes the output is
+    part of cache_params().
+    """
+
+    def __init__(self, model_size="tiny", beam_size=5, batch_size=0, vad_filter=WHISPER_VAD,
+                 cpu_threads=0, num_workers=WHISPER_NUM_WORKERS):
+        self.model_size = model_size
+        self.beam_size = beam_size
+        self.batch_size = batch_size        # 0 = sequential decoding
+        self.vad_filter = vad_filter
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+
+    def cache_params(self):
+        return {"model": self.model_size, "beam_size": self.beam_size,
+                "batch_size": self.batch_size, "vad": self.vad_filter}
+
+    def __repr__(self):
+        return (f"WhisperConfig(model={self.model_size}, beam={self.beam_size}, "
+                f"batch={self.batch_size}, vad={self.vad_filter}, "
+                f"threads={self.cpu_threads}x{self.num_workers})")
+
+
+def estimate_seconds(model_size, beam_size, batch_size, duration, cores):
+    rtf = MODEL_RTF_PER_CORE[model_size] * BEAM_COST.get(beam_size, beam_size / 2.8) / cores
+    if batch_size > 1:
+        rtf /= BATCH_SPEEDUP
+    return rtf * duration
+
+
+def thread_settings(cores=None):
+    """
+    (cpu_threads, num_workers) every model is loaded with, so configs
+    that only differ in beam or batch size share one loaded model.
+    """
+    cores = cores or os.cpu_count() or 1
+    num_workers = max(1, WHISPER_NUM_WORKERS)
+    return WHISPER_CPU_THREADS or max(1, cores // num_workers), num_workers
+
+
+def choose_config(duration, cores=None, latency_target=WHISPER_LATENCY_TARGET):
+    """
+    Picks model, beam width and batch size for `duration` seconds of audio:
+    the most accurate combination whose estimated run time fits
+    `latency_target` on `cores` cores. WHISPER_MODEL / WHISPER_BEAM /
+    WHISPER_BATCH_SIZE pin a setting instead.
+    """
+    cpu_threads, num_workers = thread_settings(cores)
+    duration = duration or 0.0
+
+    if WHISPER_BATCH_SIZE != "auto":
+        batch_size = int(WHISPER_BATCH_SIZE)
+    else:
+        batch_size = min(16, max(4, cpu_threads)) if duration >= BATCH_MIN_SECONDS else 0
+
+    models = list(MODEL_RTF_PER_CORE) if WHISPER_MODEL == "auto" else [WHISPER_MODEL]
+    beams = [5, 1] if WHISPER_BEAM == "auto" else [int(WHISPER_BEAM)]
+
+    for model_size in models:
+        for beam_size in beams:
+            if model_size not in MODEL_RTF_PER_CORE or \
+                    estimate_seconds(model_size, beam_size, batch_size, duration, cpu_threads) <= latency_target:
+                return WhisperConfig(model_size, beam_size, batch_size, WHISPER_VAD,
+                                     cpu_threads, num_workers)
+
+    # Nothing fits: take the fastest option.
+    return WhisperConfig(models[-1], beams[-1], batch_size, WHISPER_VAD, cpu_threads, num_workers)
+
+
+class Transcript:
+    """
+    Result of one transcription: text segments with timestamps (seconds),
+    detected language and the audio duration.
+    """
+
+    def __init__(self, segments, language, duration):
+        self.segments = segments        # [(start, end, text), ...]
+        self.language = language
+        self.duration = duration
+
+    @property
+    def text(self):
+        return " ".join(text.strip() for _, _, text in self.segments)
+
+
+class WhisperEngine:
+    """
+    Loads each Whisper model once (per thread settings) and transcribes
+    with it, sequentially or through faster-whisper's batched pipeline.
+    At most `max_models` stay loaded, least recently used dropped first.
+
+    Models load outside the engine lock: a cold download only holds up
+    requests for that model, which wait for it instead of loading it again.
+    """
+
+    def __init__(self, download_root=MODELS_DIR, max_models=WHISPER_MAX_MODELS):
+        self.download_root = download_root
+        self.max_models = max(1, max_models)
+        self._models = OrderedDict()    # (model_size, cpu_threads, num_workers) -> WhisperModel
+        self._batched = {}      # same key -> BatchedInferencePipeline
+        self._loading = {}      # same key -> Future of the load in flight
+        self._lock = threading.Lock()
+
+    def model(self, config):
+        key = (config.model_size, config.cpu_threads, config.num_workers)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            from faster_whisper import WhisperModel
+
+            os.makedirs(self.download_root, exist_ok=True)
+            print(f"🔄 Loading Whisper '{config.model_size}' "
+                  f"({config.cpu_threads} threads x {config.num_workers} workers)...")
+            sys.stdout.flush()
+            model = WhisperModel(
+                config.model_size, device="cpu", compute_type="int8",
+                cpu_threads=config.cpu_threads, num_workers=config.num_workers,
+                download_root=self.download_root
+            )
+        except Exception as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._models[key] = model
+            del self._loading[key]
+            while len(self._models) > self.max_models:
+                # Transcriptions still using it keep their reference until they finish.
+                old_key, _ = self._models.popitem(last=False)
+                self._batched.pop(old_key, None)
+                print(f"🧹 Unloading Whisper '{old_key[0]}'")
+                sys.stdout.flush()
+        future.set_result(model)
+        return model
+
+    def _batched_pipeline(self, config):
+        """
+        Returns a BatchedInferencePipeline, or None on faster-whisper
+        versions without one.
+        """
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:
+            return None
+        model = self.model(config)
+        key = (config.model_size, config.cpu_threads, config.num_workers)
+        with self._lock:
+            if key not in self._batched:
+                self._batched[key] = BatchedInferencePipeline(model=model)
+            return self._batched[key]
+
+    def warm_up(self, config):
+        """
+        Loads everything a transcription with `config` needs, so the first
+        request doesn't wait for it.
+        """
+        if config.batch_size > 1:
+            self._batched_pipeline(config)
+        else:
+            self.model(config)
+
+    def iter_segments(self, audio, config, language=None):
+        """
+        Starts transcribing a path or 16 kHz float32 array. Returns
+        (segments, info): info (language, duration) is known at once, while
+        `segments` is a lazy iterator of (start, end, text) that decodes as
+        it is consumed.
+        """
+        pipeline = self._batched_pipeline(config) if config.batch_size > 1 else None
+        if pipeline is not None:
+            segments, info = pipeline.transcribe(
+                audio, beam_size=config.beam_size, batch_size=config.batch_size,
+                vad_filter=config.vad_filter, language=language
+            )
+        else:
+            segments, info = self.model(config).transcribe(
+                audio, beam_size=config.beam_size,
+                vad_filter=config.vad_filter, language=language
+            )
+        return ((round(s.start, 2), round(s.end, 2), s.text) for s in segments), info
+
+    def transcribe(self, audio, config, language=None):
+        """
+        Transcribes a path or 16 kHz float32 array and returns a Transcript.
+        """
+        segments, info = self.iter_segments(audio, config, language)
+        return Transcript(list(segments), info.language, info.duration)